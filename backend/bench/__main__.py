@@ -0,0 +1,214 @@
+"""
+Load test / benchmark for the API, fully in-process: main.app is driven over
+httpx's ASGI transport, Supabase is bench.fake_supabase, Redis is fakeredis (or
+a real server via --redis-url) and Anthropic is a stub with a fixed latency.
+
+    cd backend
+    pip install -r bench/requirements.txt
+    python -m bench --users 50 --duration 30 --out results.json
+    python -m bench --compare results.json --threshold 0.2   # exit 1 on a p95 regression
+    python -m bench --abusers 5    # plus clients ignoring rate limits, reported separately
+    python -m bench --viewers 2000 # plus idle clients holding the feed stream open
+    python -m bench --redis-down   # Redis unreachable: every route must still answer
+
+The report is JSON: per-route count, errors, status breakdown, throughput and
+p50/p95/p99 latency, plus totals, the app's own counters and startup times
+(import done, serving and ready, each from the start of the app import). The
+stand-ins share the app's event loop and CPU, so absolute numbers are only
+comparable with a baseline taken on the same machine with the same options.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+from collections import Counter
+
+BENCH_SUPABASE_URL = "http://supabase.bench"
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m bench", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=20, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=15, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=3, help="seconds run before measuring")
+    parser.add_argument("--abusers", type=int, default=0,
+                        help="extra clients hammering boost/summarize/invest with no pauses, reported separately")
+    parser.add_argument("--viewers", type=int, default=0,
+                        help="idle clients holding /feed/stream open; their event counts are reported")
+    parser.add_argument("--think-time", type=float, default=200.0,
+                        help="mean ms each user pauses between actions; 0 for a saturation run")
+    parser.add_argument("--seed-posts", type=int, default=2000)
+    parser.add_argument("--seed-investments", type=int, default=5000)
+    parser.add_argument("--accounts", type=int, default=200, help="distinct users in the seed data")
+    parser.add_argument("--db-latency", type=float, default=2.0, help="ms per Supabase request")
+    parser.add_argument("--anthropic-latency", type=float, default=800.0, help="ms per Anthropic call")
+    parser.add_argument("--anthropic-first-token", type=float, default=200.0,
+                        help="ms before a streamed Anthropic call yields its first text")
+    parser.add_argument("--redis-url", help="use a real Redis (FLUSHDB is run on it) instead of fakeredis")
+    parser.add_argument("--redis-down", action="store_true",
+                        help="leave Redis unreachable, to exercise the fail-open paths (boosts, caches, limits)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="write the JSON report here instead of stdout")
+    parser.add_argument("--compare", help="baseline report to compare p95 latencies against")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed relative p95 increase per route before failing (with --compare)")
+    return parser.parse_args()
+
+
+def _configure_env(args: argparse.Namespace) -> None:
+    # core.config reads these at import time, so they must be set before any app import
+    os.environ["VITE_SUPABASE_URL"] = BENCH_SUPABASE_URL
+    os.environ["SUPABASE_SERVICE_ROLE_KEY"] = "bench-service-key"
+    os.environ["SUPABASE_ANON_KEY"] = "bench-anon-key"
+    os.environ["ANTHROPIC_API_KEY"] = "bench"
+    os.environ["REDIS_URL"] = args.redis_url or "redis://bench.invalid:6379"
+    os.environ["VECTOR_INDEX_DIR"] = tempfile.mkdtemp(prefix="chipn-bench-")
+    os.environ.pop("SUPABASE_JWKS_URL", None)
+    os.environ.pop("SUPABASE_JWKS_KID", None)
+
+
+def compare(report: dict, baseline: dict, threshold: float) -> list[str]:
+    """Routes whose p95 grew by more than `threshold` (relative) over the baseline."""
+    regressions = []
+    for route, stats in report["routes"].items():
+        before = baseline.get("routes", {}).get(route)
+        if not before or not before["p95_ms"]:
+            continue
+        change = stats["p95_ms"] / before["p95_ms"] - 1
+        if change > threshold:
+            regressions.append(f"{route}: p95 {before['p95_ms']}ms -> {stats['p95_ms']}ms (+{change:.0%})")
+    return regressions
+
+
+async def _run(args: argparse.Namespace) -> dict:
+    from core import config
+
+    if args.redis_down:
+        pass    # REDIS_URL points nowhere; every command raises ConnectionError
+    elif args.redis_url:
+        await config.redis_client.flushdb()
+    else:
+        import fakeredis
+        # Lua scripts bind to the client when modules register them, so swap it before they import
+        config.redis_client = fakeredis.FakeAsyncRedis(decode_responses=True)
+
+    from bench.fake_supabase import FakeSupabase
+    from bench.stubs import TokenSigner, install_anthropic
+    from bench.workload import Abuser, Recorder, Viewer, VirtualUser, run_users
+
+    signer = TokenSigner()
+    supabase = FakeSupabase(latency=args.db_latency / 1000, jwks=signer.jwks(), seed=args.seed)
+    accounts = [str(uuid.UUID(int=random.Random(args.seed + i).getrandbits(128))) for i in range(args.accounts)]
+    supabase.seed(args.seed_posts, args.seed_investments, accounts)
+    anthropic = install_anthropic(
+        config, args.anthropic_latency / 1000, args.anthropic_first_token / 1000,
+    )
+
+    import_start = time.perf_counter()
+    from core.db import db
+    db.transport = supabase.transport
+    import main
+    import_seconds = time.perf_counter() - import_start
+
+    import httpx
+    from core import singleflight, startup
+
+    recorder, abuse, streamed = Recorder(), Recorder(), Counter()
+    post_ids = [p["id"] for p in reversed(supabase.tables["posts"])]
+    rng = random.Random(args.seed)
+    async with main.lifespan(main.app):
+        serving_seconds = time.perf_counter() - import_start
+        # Traffic starts once the worker is ready, as behind a readiness-checked load balancer
+        await startup.ready.wait()
+        ready_seconds = startup.ready_at - import_start
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://api.bench", timeout=60) as client:
+            users = [
+                VirtualUser(client, recorder, post_ids, account, signer.token(account),
+                            random.Random(rng.random()), args.think_time / 1000, app=main.app)
+                for account in rng.sample(accounts, min(args.users, len(accounts)))
+                + [str(uuid.uuid4()) for _ in range(max(0, args.users - len(accounts)))]
+            ]
+            abusers = [
+                Abuser(client, abuse, post_ids, account, signer.token(account), random.Random(rng.random()))
+                for account in (str(uuid.uuid4()) for _ in range(args.abusers))
+            ]
+            viewers = [Viewer(main.app, streamed) for _ in range(args.viewers)]
+            deadline = time.perf_counter() + args.warmup + args.duration
+            _, _, measured = await asyncio.gather(
+                asyncio.gather(*(viewer.run(deadline) for viewer in viewers)),
+                run_users(abusers, abuse, args.warmup, args.duration),
+                run_users(users, recorder, args.warmup, args.duration),
+            )
+            app_stats = {"singleflight": singleflight.stats()}
+
+    report = recorder.report(measured)
+    return {
+        "config": {
+            "users": args.users,
+            "abusers": args.abusers,
+            "viewers": args.viewers,
+            "duration_s": round(measured, 3),
+            "warmup_s": args.warmup,
+            "think_time_ms": args.think_time,
+            "seed_posts": args.seed_posts,
+            "seed_investments": args.seed_investments,
+            "db_latency_ms": args.db_latency,
+            "anthropic_latency_ms": args.anthropic_latency,
+            "anthropic_first_token_ms": args.anthropic_first_token,
+            "redis": "down" if args.redis_down else "external" if args.redis_url else "fakeredis",
+            "python": sys.version.split()[0],
+        },
+        "startup": {
+            "import_ms": round(import_seconds * 1000, 3),
+            "serving_ms": round(serving_seconds * 1000, 3),
+            "ready_ms": round(ready_seconds * 1000, 3),
+            "checks": dict(startup.checks),
+        },
+        **report,
+        **({"abusers": abuse.report(measured)} if args.abusers else {}),
+        **({"viewers": dict(sorted(streamed.items()))} if args.viewers else {}),
+        "upstream": {
+            "supabase_requests": dict(sorted(supabase.requests.items())),
+            "anthropic_calls": anthropic.calls,
+            "anthropic_streams_abandoned": anthropic.abandoned,
+        },
+        "app": app_stats,
+    }
+
+
+def main() -> int:
+    args = _parse_args()
+    _configure_env(args)
+    try:
+        report = asyncio.run(_run(args))
+    finally:
+        shutil.rmtree(os.environ["VECTOR_INDEX_DIR"], ignore_errors=True)
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    if args.redis_down and report["total"]["errors"]:
+        failing = [route for route, stats in report["routes"].items() if stats["errors"]]
+        print(f"FAILED with Redis down: {', '.join(failing)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
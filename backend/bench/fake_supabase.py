@@ -0,0 +1,404 @@
+"""
+In-process stand-in for the parts of Supabase the API talks to, served through
+httpx.MockTransport: PostgREST table reads/writes and the RPCs defined in
+init_db.py, Storage TUS uploads and URL signing, and the auth JWKS endpoint.
+
+It implements only the query shapes the repositories generate, against plain
+Python lists, with a configurable per-request latency standing in for the
+network round trip to Supabase.
+"""
+import asyncio
+import base64
+import json
+import random
+import re
+import uuid
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+from urllib.parse import unquote
+
+import httpx
+
+_WORDS = (
+    "drone delivery solar battery farm robot ai tutor health clinic coffee subscription "
+    "marketplace freelance climate carbon ocean cleanup water filter ev charging "
+    "fintech payroll crypto wallet fitness coach pet care recipe kitchen travel booking "
+    "music studio podcast game indie fashion resale textile recycling housing rental "
+    "education language app satellite sensor agriculture insurance legal contract"
+).split()
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _ts(dt: datetime) -> str:
+    # One fixed format, so timestamps order correctly as strings (as they do in Postgres)
+    return dt.strftime("%Y-%m-%dT%H:%M:%S.%f+00:00")
+
+
+def _split_top(expr: str) -> list[str]:
+    """Splits a PostgREST logic-tree body on commas outside quotes and parentheses."""
+    parts, depth, quoted, start = [], 0, False, 0
+    for i, ch in enumerate(expr):
+        if ch == '"':
+            quoted = not quoted
+        elif not quoted and ch == "(":
+            depth += 1
+        elif not quoted and ch == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and ch == ",":
+            parts.append(expr[start:i])
+            start = i + 1
+    parts.append(expr[start:])
+    return parts
+
+
+def _unquote(value: str) -> str:
+    return value[1:-1] if len(value) >= 2 and value[0] == value[-1] == '"' else value
+
+
+_OPS = {
+    "eq": lambda a, b: a == b, "neq": lambda a, b: a != b,
+    "lt": lambda a, b: a < b, "lte": lambda a, b: a <= b,
+    "gt": lambda a, b: a > b, "gte": lambda a, b: a >= b,
+}
+
+
+def _predicate(column: str, op: str, raw: str):
+    """Compiles `column op raw` once; rows are then tested without re-parsing the value."""
+    if op == "is":
+        expected = None if raw == "null" else raw == "true"
+        return lambda row: row.get(column) is expected if expected is None else row.get(column) == expected
+    if op == "in":
+        allowed = {_unquote(v) for v in _split_top(raw[1:-1])}
+        return lambda row: str(row.get(column)) in allowed
+    value, compare = _unquote(raw), _OPS[op]
+
+    def test(row):
+        left = row.get(column)
+        if left is None:
+            return False
+        if isinstance(left, (int, float)) and not isinstance(left, bool):
+            return compare(float(left), float(value))
+        if isinstance(left, bool):
+            return compare(left, value == "true")
+        return compare(left, value)
+    return test
+
+
+def _condition(expr: str):
+    """Compiles one PostgREST condition (`col.op.value`, `and(...)`, `or(...)`) to a predicate."""
+    for logic, combine in (("and(", all), ("or(", any)):
+        if expr.startswith(logic):
+            parts = [_condition(p) for p in _split_top(expr[len(logic):-1])]
+            return lambda row, parts=parts, combine=combine: combine(p(row) for p in parts)
+    return _predicate(*expr.split(".", 2))
+
+
+class FakeSupabase:
+    """Seeded in-memory Supabase. `transport` plugs into core.db.Database.transport."""
+
+    def __init__(self, latency: float = 0.002, jwks: dict | None = None, seed: int = 7):
+        self.latency = latency
+        self.jwks = jwks or {"keys": []}
+        self.rng = random.Random(seed)
+        self.tables: dict[str, list[dict]] = {"posts": [], "investments": []}
+        self.uploads: dict[str, dict] = {}
+        self.objects: dict[str, int] = {}
+        self.boost_flushes: set[str] = set()
+        self.requests: Counter = Counter()
+        self._funding_rows: list[dict] | None = None
+        self.transport = httpx.MockTransport(self.handle)
+        self._rpcs = {
+            "search_posts": self._rpc_search_posts,
+            "increment_boost_counts": self._rpc_increment_boost_counts,
+            "set_ai_summaries": self._rpc_set_ai_summaries,
+            "inbound_investments": self._rpc_inbound_investments,
+            "founder_funding": self._rpc_founder_funding,
+            "update_post_by_author": self._rpc_update_post_by_author,
+            "delete_post_by_author": self._rpc_delete_post_by_author,
+            "submit_due_diligence": self._rpc_submit_due_diligence,
+        }
+
+    # ─── seeding ─────────────────────────────────────────────────
+
+    def seed(self, posts: int, investments: int, users: list[str]) -> None:
+        """Fills posts (spread over the last 30 days) and investments into them."""
+        start = _now() - timedelta(days=30)
+        for i in range(posts):
+            words = self.rng.sample(_WORDS, 6)
+            author = self.rng.choice(users)
+            video = None
+            if self.rng.random() < 0.3:
+                # An uploaded pitch video, stored as a storage reference (core.media)
+                video = f"{author}/{self.rng.getrandbits(256):064x}.mp4"
+                self.objects[f"pitch-videos/{video}"] = 1
+                video = f"storage://pitch-videos/{video}"
+            self.tables["posts"].append({
+                "id": str(uuid.UUID(int=self.rng.getrandbits(128))),
+                "author_id": author,
+                "type": self.rng.choice(["idea", "product", "request"]),
+                "title": " ".join(words[:3]).title(),
+                "description": " ".join(self.rng.choices(_WORDS, k=60)),
+                "content": None,
+                "ai_summary": " ".join(words[3:]) + " for investors",
+                "ai_summary_status": "ready",
+                "video_url": video,
+                "deck_url": None,
+                "product_url": None,
+                "status": "active",
+                "boost_count": self.rng.randint(0, 200),
+                "created_at": _ts(start + timedelta(seconds=i * 30 * 86400 / max(posts, 1))),
+            })
+        for _ in range(investments):
+            self.tables["investments"].append(self.new_investment(
+                self.rng.choice(self.tables["posts"])["id"],
+                self.rng.choice(users),
+                round(self.rng.uniform(50, 25_000), 2),
+            ))
+
+    def new_investment(self, post_id: str, investor_id: str, amount: float) -> dict:
+        return {
+            "id": str(uuid.uuid4()),
+            "post_id": post_id,
+            "investor_id": investor_id,
+            "amount": amount,
+            "due_diligence_doc_url": None,
+            "status": "pending_diligence" if amount > 10000 else "approved",
+            "created_at": _ts(_now()),
+        }
+
+    # ─── transport ───────────────────────────────────────────────
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        path = request.url.path
+        self.requests[f"{request.method} {re.sub(r'/[0-9a-f]{8}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{12}.*$', '/{id}', path)}"] += 1
+        if path.startswith("/rest/v1/rpc/"):
+            fn = self._rpcs.get(path.rsplit("/", 1)[1])
+            if fn is None:
+                return httpx.Response(404, json={"message": f"unknown function {path}"})
+            body = json.loads(request.content or b"{}")
+            return httpx.Response(200, json=fn(**body))
+        if path.startswith("/rest/v1/"):
+            return self._table(request, path.removeprefix("/rest/v1/"))
+        if path.startswith("/storage/v1/"):
+            return self._storage(request, path.removeprefix("/storage/v1/"))
+        if path == "/auth/v1/.well-known/jwks.json":
+            return httpx.Response(200, json=self.jwks)
+        return httpx.Response(404, json={"message": f"no route for {path}"})
+
+    # ─── PostgREST tables ────────────────────────────────────────
+
+    def _rows(self, table: str) -> list[dict]:
+        if table == "post_funding":
+            return self._funding()
+        return self.tables.setdefault(table, [])
+
+    def _table(self, request: httpx.Request, table: str) -> httpx.Response:
+        select, order, limit, predicates = ["*"], [], None, []
+        for key, value in request.url.params.multi_items():
+            if key == "select":
+                select = value.split(",")
+            elif key == "order":
+                order = [part.split(".") for part in value.split(",")]
+            elif key == "limit":
+                limit = int(value)
+            elif key == "or":
+                predicates.append(_condition(f"or{unquote(value)}"))
+            else:
+                predicates.append(_condition(f"{key}.{value}"))
+        rows = self._rows(table)
+        if request.method != "GET" and table == "investments":
+            self._funding_rows = None
+        matched = [r for r in rows if all(p(r) for p in predicates)]
+
+        if request.method == "POST":
+            payload = json.loads(request.content)
+            new = [self._defaults(table, item) for item in (payload if isinstance(payload, list) else [payload])]
+            rows.extend(new)
+            return httpx.Response(201, json=new)
+        if request.method == "PATCH":
+            changes = json.loads(request.content)
+            for row in matched:
+                row.update(changes)
+            return httpx.Response(200, json=matched)
+        if request.method == "DELETE":
+            ids = {id(r) for r in matched}
+            rows[:] = [r for r in rows if id(r) not in ids]
+            return httpx.Response(200, json=matched)
+
+        for column, *direction in reversed(order):
+            desc = "desc" in direction
+            matched.sort(key=lambda r: (r.get(column) is None, r.get(column) or 0), reverse=desc)
+        if limit is not None:
+            matched = matched[:limit]
+        if select != ["*"]:
+            matched = [{c: r.get(c) for c in select} for r in matched]
+        return httpx.Response(200, json=matched)
+
+    def _defaults(self, table: str, item: dict) -> dict:
+        row = {"id": str(uuid.uuid4()), "created_at": _ts(_now()), **item}
+        if table == "posts":
+            row = {"status": "active", "boost_count": 0, "content": None, "ai_summary": None,
+                   "video_url": None, "deck_url": None, "product_url": None, **row}
+        if table == "investments":
+            row = {"due_diligence_doc_url": None, **row}
+        return row
+
+    def _funding(self) -> list[dict]:
+        # What the post_funding trigger maintains, recomputed only after investments change
+        if self._funding_rows is not None:
+            return self._funding_rows
+        funding: dict[str, dict] = {}
+        investors = defaultdict(set)
+        for inv in self.tables["investments"]:
+            f = funding.setdefault(inv["post_id"], {
+                "post_id": inv["post_id"], "total_committed": 0.0, "investment_count": 0,
+                "investor_count": 0, "status_counts": Counter(),
+            })
+            f["total_committed"] += inv["amount"]
+            f["investment_count"] += 1
+            f["status_counts"][inv["status"]] += 1
+            investors[inv["post_id"]].add(inv["investor_id"])
+        for post_id, f in funding.items():
+            f["investor_count"] = len(investors[post_id])
+            f["status_counts"] = dict(f["status_counts"])
+        self._funding_rows = list(funding.values())
+        return self._funding_rows
+
+    # ─── RPCs (see init_db.py for the real SQL) ───────────────────
+
+    def _rpc_search_posts(self, q, deep=False, lim=20, after_rank=None, after_id=None):
+        terms = [t for t in re.findall(r"[a-z0-9]+", q.lower()) if t != "or"]
+        hits = []
+        for post in self.tables["posts"]:
+            fields = [(post["title"], 1.0), (post["description"], 0.4)]
+            if deep:
+                fields.append((post.get("ai_summary") or "", 0.1))
+            rank = sum(w for text, w in fields for t in terms if t in text.lower())
+            rank = round(rank / (1 + len(terms)), 6)
+            if rank <= 0:
+                continue
+            if after_rank is not None and (rank, post["id"]) >= (after_rank, after_id):
+                continue
+            hits.append((rank, post["id"], post))
+        hits.sort(key=lambda h: (h[0], h[1]), reverse=True)
+        return [{"post": post, "rank": rank} for rank, _, post in hits[:lim]]
+
+    def _rpc_increment_boost_counts(self, flush_id, deltas):
+        if flush_id in self.boost_flushes:
+            return False
+        self.boost_flushes.add(flush_id)
+        for post in self.tables["posts"]:
+            if post["id"] in deltas:
+                post["boost_count"] = (post["boost_count"] or 0) + int(deltas[post["id"]])
+        return True
+
+    def _rpc_set_ai_summaries(self, summaries):
+        updated = []
+        for post in self.tables["posts"]:
+            if post["id"] in summaries:
+                post.update(ai_summary=summaries[post["id"]], ai_summary_status="ready")
+                updated.append(post)
+        return updated
+
+    def _rpc_inbound_investments(self, founder, lim=20, after_created=None, after_id=None):
+        titles = {p["id"]: p["title"] for p in self.tables["posts"] if p["author_id"] == founder}
+        rows = [
+            {**inv, "post_title": titles[inv["post_id"]]}
+            for inv in self.tables["investments"]
+            if inv["post_id"] in titles
+            and (after_created is None or (inv["created_at"], inv["id"]) < (after_created, after_id))
+        ]
+        rows.sort(key=lambda r: (r["created_at"], r["id"]), reverse=True)
+        return rows[:lim]
+
+    def _rpc_founder_funding(self, founder):
+        funding = {f["post_id"]: f for f in self._funding()}
+        posts = sorted(
+            (p for p in self.tables["posts"] if p["author_id"] == founder),
+            key=lambda p: (p["created_at"], p["id"]), reverse=True,
+        )
+        empty = {"total_committed": 0, "investment_count": 0, "investor_count": 0, "status_counts": {}}
+        return [{**empty, **funding.get(p["id"], {}), "post_id": p["id"], "post_title": p["title"]} for p in posts]
+
+    def _owned(self, table: str, target: str, owner_column: str, owner: str) -> tuple[str, dict | None]:
+        row = next((r for r in self.tables[table] if r["id"] == target), None)
+        if row is None:
+            return "not_found", None
+        return ("ok", row) if row[owner_column] == owner else ("forbidden", None)
+
+    def _rpc_update_post_by_author(self, target, author, changes):
+        outcome, post = self._owned("posts", target, "author_id", author)
+        if post is None:
+            return {"status": outcome}
+        post.update({k: v for k, v in changes.items()
+                     if k in ("title", "description", "video_url", "deck_url", "product_url", "status")})
+        return {"status": outcome, "post": post}
+
+    def _rpc_delete_post_by_author(self, target, author):
+        outcome, post = self._owned("posts", target, "author_id", author)
+        if post is not None:
+            self.tables["posts"].remove(post)
+            self.tables["investments"][:] = [i for i in self.tables["investments"] if i["post_id"] != target]
+            self._funding_rows = None
+        return outcome
+
+    def _rpc_submit_due_diligence(self, target, investor, notes):
+        outcome, investment = self._owned("investments", target, "investor_id", investor)
+        if investment is not None:
+            investment.update(due_diligence_doc_url=notes, status="in_review")
+            self._funding_rows = None
+        return outcome
+
+    # ─── Storage ─────────────────────────────────────────────────
+
+    def _storage(self, request: httpx.Request, path: str) -> httpx.Response:
+        if path == "upload/resumable" and request.method == "POST":
+            upload_id = uuid.uuid4().hex
+            metadata = dict(item.split(" ") for item in request.headers["Upload-Metadata"].split(","))
+            name = "/".join(base64.b64decode(metadata[k]).decode() for k in ("bucketName", "objectName"))
+            self.uploads[upload_id] = {"offset": 0, "name": name}
+            return httpx.Response(201, headers={"Location": f"/storage/v1/upload/resumable/{upload_id}"})
+        if path.startswith("upload/resumable/"):
+            upload = self.uploads.get(path.rsplit("/", 1)[1])
+            if upload is None:
+                return httpx.Response(404)
+            if request.method == "PATCH":
+                if int(request.headers["Upload-Offset"]) != upload["offset"]:
+                    return httpx.Response(409)
+                upload["offset"] += len(request.content)
+                if int(request.headers.get("Upload-Length", -1)) == upload["offset"]:
+                    self.objects[upload["name"]] = upload["offset"]
+                return httpx.Response(204, headers={"Upload-Offset": str(upload["offset"])})
+            if request.method == "HEAD":
+                return httpx.Response(200, headers={"Upload-Offset": str(upload["offset"])})
+            if request.method == "DELETE":
+                del self.uploads[path.rsplit("/", 1)[1]]
+                return httpx.Response(204)
+        if path == "object/move" and request.method == "POST":
+            body = json.loads(request.content)
+            source, destination = (f"{body['bucketId']}/{body[k]}" for k in ("sourceKey", "destinationKey"))
+            if source not in self.objects or destination in self.objects:
+                return httpx.Response(400, json={"statusCode": "400", "error": "Bad Request", "message": "cannot move"})
+            self.objects[destination] = self.objects.pop(source)
+            return httpx.Response(200, json={"message": "Successfully moved"})
+        if path.startswith("object/sign/"):
+            bucket, _, key = path.removeprefix("object/sign/").partition("/")
+            if key:
+                return httpx.Response(200, json={"signedURL": f"/{path}?token=bench"})
+            paths = json.loads(request.content)["paths"]
+            return httpx.Response(200, json=[
+                {"path": p, "signedURL": f"/object/sign/{bucket}/{p}?token=bench", "error": None} for p in paths
+            ])
+        if path.startswith("object/"):
+            name = path.removeprefix("object/")
+            if request.method == "HEAD":
+                return httpx.Response(200 if name in self.objects else 404)
+            if request.method == "DELETE":
+                removed = [p for p in json.loads(request.content)["prefixes"] if self.objects.pop(f"{name}/{p}", None)]
+                return httpx.Response(200, json=[{"name": p} for p in removed])
+        return httpx.Response(404, json={"message": f"no storage route for {path}"})
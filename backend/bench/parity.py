@@ -0,0 +1,134 @@
+"""
+Opt-in parity check for READ_BACKEND=postgres: runs every hot read against a
+real database both over PostgREST and over the direct asyncpg pool, and fails
+if the rows differ in any way the API would show (columns, values, formatting,
+order, pagination). Read-only; it needs the same settings as the app plus a
+DATABASE_URL for that project's database, and exits 0 without one.
+
+    cd backend
+    pip install -r requirements-postgres.txt
+    DATABASE_URL=postgresql://... python -m bench.parity
+    python -m bench.parity --query "drone delivery"   # search terms to compare
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+
+PAGE      = 5       # small pages, so the walks below cross several cursors
+MAX_PAGES = 4
+
+
+def _same(a, b) -> bool:
+    # Search ranks are float4; allow for the last digit of their JSON rendering
+    if isinstance(a, float) or isinstance(b, float):
+        return isinstance(a, (int, float)) and isinstance(b, (int, float)) and math.isclose(a, b, rel_tol=1e-6)
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_same(a[k], b[k]) for k in a)
+    if isinstance(a, list) and isinstance(b, list):
+        return len(a) == len(b) and all(_same(x, y) for x, y in zip(a, b))
+    return a == b
+
+
+class Parity:
+    def __init__(self, db):
+        self.db = db
+        self.pool = db.pg
+        self.checked = 0
+        self.failures: list[str] = []
+
+    async def both(self, name: str, read, *args, **kwargs):
+        """Runs read over PostgREST, then over the pool; returns the PostgREST result."""
+        self.db.pg = None
+        try:
+            rest = await read(*args, **kwargs)
+        finally:
+            self.db.pg = self.pool
+        direct = await read(*args, **kwargs)
+        self.checked += 1
+        if not _same(rest, direct):
+            self.failures.append(name)
+            print(f"MISMATCH {name}\n  postgrest: {json.dumps(rest, default=str)[:2000]}\n  postgres:  {json.dumps(direct, default=str)[:2000]}")
+        return rest
+
+
+async def _walk(parity: Parity, name: str, read, column: str = "created_at") -> list[dict]:
+    """Pages through read(limit, after) on both paths; returns the rows seen."""
+    from core.pagination import decode_cursor, next_page
+    seen, after = [], None
+    for n in range(MAX_PAGES):
+        rows = await parity.both(f"{name} page {n + 1}", read, PAGE, after)
+        page, cursor = next_page(rows, PAGE, column=column)
+        seen += page
+        if not cursor:
+            break
+        after = decode_cursor(cursor)
+    return seen
+
+
+async def _sorted_many(posts_repo, ids: list[str]) -> list[dict]:
+    # get_many makes no promise about order
+    return sorted(await posts_repo.get_many(ids), key=lambda row: row["id"])
+
+
+async def run(queries: list[str]) -> int:
+    from core.db import db
+    from repositories import investments as investments_repo
+    from repositories import posts as posts_repo
+
+    await db.connect()
+    try:
+        parity = Parity(db)
+        posts = await _walk(parity, "posts.list_page", posts_repo.list_page)
+        await _walk(parity, "posts.list_page (cards)", lambda limit, after: posts_repo.list_page(
+            limit, after, cols=posts_repo.CARD_COLUMNS,
+        ))
+        if not posts:
+            print("no posts to compare; seed the database first")
+            return 1
+
+        authors = list(dict.fromkeys(post["author_id"] for post in posts if post.get("author_id")))[:3]
+        for author in authors:
+            await _walk(parity, f"posts.list_page author={author}", lambda limit, after: posts_repo.list_page(
+                limit, after, author_id=author,
+            ))
+        ids = [post["id"] for post in posts]
+        await parity.both("posts.get", posts_repo.get, ids[0])
+        await parity.both("posts.get (missing)", posts_repo.get, "00000000-0000-0000-0000-000000000000")
+        await parity.both("posts.get_many", _sorted_many, posts_repo, ids)
+
+        terms = queries or [word for word in posts[0]["title"].split() if len(word) > 3][:2] or [posts[0]["title"]]
+        for term in terms:
+            for deep in (False, True):
+                await _walk(parity, f"posts.search {term!r} deep={deep}", lambda limit, after: posts_repo.search(
+                    term, deep, limit, after,
+                ), column="rank")
+
+        investors = set()
+        for author in authors:
+            investors |= {row["investor_id"] for row in await investments_repo.list_inbound(author, 20, None)}
+        for investor in sorted(investors)[:3]:
+            await parity.both(f"investments.list_by_investor {investor}", investments_repo.list_by_investor, investor)
+    finally:
+        await db.close()
+
+    print(f"{parity.checked} reads compared, {len(parity.failures)} mismatched")
+    return 1 if parity.failures else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--query", action="append", default=[], help="search terms to compare (repeatable)")
+    args = parser.parse_args()
+    if not os.environ.get("DATABASE_URL"):
+        print("DATABASE_URL is not set; skipping the READ_BACKEND=postgres parity check")
+        return
+    # Before core.config is imported, so core.db opens the pool
+    os.environ["READ_BACKEND"] = "postgres"
+    sys.exit(asyncio.run(run(args.query)))
+
+
+if __name__ == "__main__":
+    main()
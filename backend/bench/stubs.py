@@ -0,0 +1,94 @@
+"""
+Stand-ins for the remaining external services: an Anthropic messages client with
+configurable response and first-token times, and an ES256 signing key published as the JWKS so
+the benchmark's bearer tokens go through the real verification path.
+"""
+import asyncio
+import json
+import time
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+import jwt
+from cryptography.hazmat.primitives.asymmetric import ec
+
+BENCH_KID = "bench"
+
+
+def _summary(messages: list[dict]) -> str:
+    return "Bench summary: " + " ".join(messages[-1]["content"].split()[-12:])
+
+
+class StubMessages:
+    """
+    Mimics AsyncAnthropic().messages: create sleeps `latency` and returns a canned
+    summary; stream yields the same summary word by word, the first after
+    `first_token` and the last at `latency`. Streams closed early are counted.
+    """
+
+    def __init__(self, latency: float, first_token: float):
+        self.latency = latency
+        self.first_token = min(first_token, latency)
+        self.calls = 0
+        self.abandoned = 0
+
+    async def create(self, *, messages: list[dict], **_kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return SimpleNamespace(content=[SimpleNamespace(type="text", text=_summary(messages))])
+
+    @asynccontextmanager
+    async def stream(self, *, messages: list[dict], **_kwargs):
+        self.calls += 1
+        words = _summary(messages).split(" ")
+        gap = (self.latency - self.first_token) / max(1, len(words) - 1)
+
+        finished = False
+
+        async def text_stream():
+            nonlocal finished
+            await asyncio.sleep(self.first_token)
+            yield words[0]
+            for word in words[1:]:
+                await asyncio.sleep(gap)
+                yield " " + word
+            finished = True
+
+        deltas = text_stream()
+        try:
+            yield SimpleNamespace(text_stream=deltas)
+        finally:
+            if not finished:
+                self.abandoned += 1
+            await deltas.aclose()
+
+
+def install_anthropic(config, latency: float, first_token: float) -> StubMessages:
+    """
+    Makes the stub core.config's Anthropic client, so the SDK is never loaded.
+    Must run before the modules that import get_anthropic_client do.
+    """
+    stub = StubMessages(latency, first_token)
+    client = SimpleNamespace(api_key="bench", messages=stub)
+    config.get_anthropic_client = lambda: client
+    return stub
+
+
+class TokenSigner:
+    """Holds a fresh P-256 key pair; issues Supabase-shaped access tokens signed with it."""
+
+    def __init__(self, kid: str = BENCH_KID):
+        self.kid = kid
+        self._key = ec.generate_private_key(ec.SECP256R1())
+
+    def jwks(self) -> dict:
+        public = json.loads(jwt.algorithms.ECAlgorithm.to_jwk(self._key.public_key()))
+        return {"keys": [{**public, "kid": self.kid, "alg": "ES256", "use": "sig"}]}
+
+    def token(self, user_id: str, ttl: int = 3600) -> str:
+        now = int(time.time())
+        return jwt.encode(
+            {"sub": user_id, "role": "authenticated", "iat": now, "exp": now + ttl},
+            self._key,
+            algorithm="ES256",
+            headers={"kid": self.kid},
+        )
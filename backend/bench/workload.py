@@ -0,0 +1,294 @@
+"""
+Virtual-user scenarios and the latency recorder. Each virtual user loops: pick a
+scenario by weight, run it (one or more requests), repeat until the deadline.
+Requests are recorded under a route template ("GET /posts/{id}") so repeated
+runs stay comparable however ids are chosen. Viewers hold the feed stream open.
+Streamed responses are driven over raw ASGI, as httpx's ASGI transport buffers
+the body before returning.
+"""
+import asyncio
+import json
+import random
+import time
+from collections import defaultdict
+import httpx
+
+# The PDF magic bytes are enough for the deck route's content-type check
+_DECK = b"%PDF-1.4\n" + b"0" * 48_000 + b"\n%%EOF\n"
+
+
+def _scope(method: str, path: str, query: str = "", headers: dict | None = None) -> dict:
+    return {
+        "type": "http", "asgi": {"version": "3.0", "spec_version": "2.3"}, "http_version": "1.1",
+        "method": method, "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": query.encode(), "root_path": "",
+        "headers": [(b"host", b"api.bench"), *((k.lower().encode(), v.encode()) for k, v in (headers or {}).items())],
+        "client": ("10.0.0.1", 0), "server": ("api.bench", 80),
+    }
+
+
+def _percentile(ordered: list[float], p: float) -> float:
+    if not ordered:
+        return 0.0
+    rank = max(0, min(len(ordered) - 1, round(p / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+
+class Recorder:
+    """Per-route latency samples (seconds) and error counts for the measured window."""
+
+    def __init__(self):
+        self.samples: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+        self.statuses: dict[str, dict[int, int]] = defaultdict(lambda: defaultdict(int))
+        self.active = False
+
+    def add(self, route: str, elapsed: float, status: int) -> None:
+        if not self.active:
+            return
+        self.samples[route].append(elapsed)
+        self.statuses[route][status] += 1
+        if status >= 400:
+            self.errors[route] += 1
+
+    def report(self, duration: float) -> dict:
+        routes = {}
+        for route in sorted(self.samples):
+            ordered = sorted(self.samples[route])
+            routes[route] = {
+                "count": len(ordered),
+                "errors": self.errors[route],
+                "statuses": {str(s): n for s, n in sorted(self.statuses[route].items())},
+                "rps": round(len(ordered) / duration, 2),
+                "mean_ms": round(1000 * sum(ordered) / len(ordered), 3),
+                "p50_ms": round(1000 * _percentile(ordered, 50), 3),
+                "p95_ms": round(1000 * _percentile(ordered, 95), 3),
+                "p99_ms": round(1000 * _percentile(ordered, 99), 3),
+                "max_ms": round(1000 * ordered[-1], 3),
+            }
+        every = sorted(s for samples in self.samples.values() for s in samples)
+        total = {
+            "count": len(every),
+            "errors": sum(self.errors.values()),
+            "rps": round(len(every) / duration, 2),
+            "p50_ms": round(1000 * _percentile(every, 50), 3),
+            "p95_ms": round(1000 * _percentile(every, 95), 3),
+            "p99_ms": round(1000 * _percentile(every, 99), 3),
+        }
+        return {"routes": routes, "total": total}
+
+
+class VirtualUser:
+    """One simulated client with its own identity, RNG and feed-scroll state."""
+
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, post_ids: list[str],
+                 user_id: str, token: str, rng: random.Random, think_time: float = 0.0, app=None):
+        self.client = client
+        self.app = app
+        self.recorder = recorder
+        self.post_ids = post_ids
+        self.user_id = user_id
+        self.auth = {"Authorization": f"Bearer {token}"}
+        # Each user gets its own address, as Render's proxy would report it
+        self.forwarded = {"X-Forwarded-For": f"10.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}"}
+        self.rng = rng
+        self.think_time = think_time
+        self.etags: dict[str, str] = {}
+        self.scenarios = [
+            (40, self.scroll_feed),
+            (15, self.view_post),
+            (15, self.boost),
+            (10, self.search),
+            (8,  self.invest),
+            (4,  self.inbound),
+            (4,  self.create_post),
+            (2,  self.upload_deck),
+            (2,  self.summarize),
+        ]
+
+    async def request(self, route: str, method: str, url: str, **kwargs) -> httpx.Response:
+        kwargs["headers"] = {**self.forwarded, **kwargs.get("headers", {})}
+        start = time.perf_counter()
+        resp = await self.client.request(method, url, **kwargs)
+        self.recorder.add(route, time.perf_counter() - start, resp.status_code)
+        return resp
+
+    def popular_post(self) -> str:
+        # Zipf-like skew: a handful of posts take most of the views, like a real feed
+        rank = min(int(self.rng.paretovariate(1.2)) - 1, len(self.post_ids) - 1)
+        return self.post_ids[rank]
+
+    async def run(self, deadline: float) -> None:
+        weights = [w for w, _ in self.scenarios]
+        actions = [a for _, a in self.scenarios]
+        while time.perf_counter() < deadline:
+            await self.rng.choices(actions, weights)[0]()
+            # Exponential pauses between actions; zero drives the app flat out (closed loop)
+            if self.think_time:
+                await asyncio.sleep(self.rng.expovariate(1 / self.think_time))
+
+    # ─── scenarios ───────────────────────────────────────────────
+
+    async def scroll_feed(self) -> None:
+        """
+        Reads one to four feed pages. Anonymous scrolls revalidate the first page with
+        its ETag; signed-in ones (half) skip posts already served to the user.
+        """
+        sort = "hot" if self.rng.random() < 0.25 else "new"
+        signed_in = self.rng.random() < 0.5
+        route = f"GET /feed/?sort={sort}" + (" (signed in)" if signed_in else "")
+        auth = self.auth if signed_in else {}
+        params, headers = {"sort": sort}, dict(auth)
+        if not signed_in and sort in self.etags:
+            headers["If-None-Match"] = self.etags[sort]
+        for page in range(self.rng.randint(1, 4)):
+            resp = await self.request(route, "GET", "/feed/", params=params, headers=headers)
+            if page == 0 and not signed_in and "etag" in resp.headers:
+                self.etags[sort] = resp.headers["etag"]
+            if resp.status_code != 200:
+                return
+            cursor = resp.json().get("next_cursor")
+            if not cursor:
+                return
+            params, headers = {"sort": sort, "cursor": cursor}, dict(auth)
+
+    async def view_post(self) -> None:
+        await self.request("GET /posts/{id}", "GET", f"/posts/{self.popular_post()}")
+
+    async def boost(self) -> None:
+        await self.request("PATCH /posts/{id}/boost", "PATCH", f"/posts/{self.popular_post()}/boost", headers=self.auth)
+
+    async def search(self) -> None:
+        mode = "semantic" if self.rng.random() < 0.3 else "text"
+        words = self.rng.sample(("solar", "robot", "coffee", "fintech", "ocean", "tutor", "drone", "rental"), 2)
+        await self.request(f"GET /search/?mode={mode}", "GET", "/search/", params={"query": " ".join(words), "mode": mode})
+
+    async def invest(self) -> None:
+        body = {"post_id": self.popular_post(), "amount": round(self.rng.uniform(50, 20_000), 2)}
+        await self.request("POST /investments/", "POST", "/investments/", json=body, headers=self.auth)
+
+    async def inbound(self) -> None:
+        resp = await self.request("GET /investments/inbound", "GET", "/investments/inbound", headers=self.auth)
+        cursor = resp.headers.get("x-next-cursor")
+        if cursor:
+            await self.request("GET /investments/inbound", "GET", "/investments/inbound",
+                               params={"cursor": cursor}, headers=self.auth)
+        await self.request("GET /investments/inbound/summary", "GET", "/investments/inbound/summary", headers=self.auth)
+
+    async def create_post(self) -> None:
+        body = {
+            "author_id": self.user_id,
+            "type": self.rng.choice(["idea", "product", "request"]),
+            "title": f"Bench idea {self.rng.getrandbits(32):08x}",
+            "description": "A benchmark post about solar drones delivering coffee to ocean cleanup crews.",
+        }
+        resp = await self.request("POST /posts/", "POST", "/posts/", json=body, headers=self.auth)
+        if resp.status_code == 200:
+            self.post_ids.append(resp.json()["id"])
+
+    async def upload_deck(self) -> None:
+        files = {"file": ("deck.pdf", _DECK, "application/pdf")}
+        await self.request("POST /uploads/deck", "POST", "/uploads/deck", files=files, headers=self.auth)
+
+    async def summarize(self) -> None:
+        # A small content pool, so the cache and single-flight paths are exercised too
+        content = f"Idea {self.rng.randint(0, 50)}: solar-powered drones that deliver coffee."
+        if self.app is not None and self.rng.random() < 0.5:
+            await self.stream_summary(content)
+            return
+        await self.request("POST /ai/summarize", "POST", "/ai/summarize", params={"content": content})
+
+    async def stream_summary(self, content: str) -> None:
+        # Recorded twice: until the first delta (what the reader waits for) and in full
+        route = "POST /ai/summarize/stream"
+        start, first, status = time.perf_counter(), None, 0
+        done = asyncio.Event()
+        requested = False
+
+        async def receive():
+            nonlocal requested
+            if not requested:
+                requested = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await done.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            nonlocal first, status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                if first is None and b'"delta"' in message.get("body", b""):
+                    first = time.perf_counter()
+                if not message.get("more_body"):
+                    done.set()
+
+        query = httpx.QueryParams({"content": content})
+        await self.app(_scope("POST", "/ai/summarize/stream", str(query), self.forwarded), receive, send)
+        done.set()
+        if first is not None:
+            self.recorder.add(f"{route} (first token)", first - start, status)
+        self.recorder.add(route, time.perf_counter() - start, status)
+
+
+class Abuser(VirtualUser):
+    """A misbehaving client: hammers the expensive write and AI routes with no pauses."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.think_time = 0.0
+        self.scenarios = [(3, self.boost), (1, self.summarize), (1, self.invest)]
+
+    async def summarize(self) -> None:
+        # Distinct content every time, so each request would cost an Anthropic call
+        content = f"Spam {self.rng.getrandbits(64):016x}"
+        await self.request("POST /ai/summarize", "POST", "/ai/summarize", params={"content": content})
+
+
+class Viewer:
+    """
+    An idle feed viewer: holds /feed/stream open until the deadline and counts the
+    events it receives. Talks ASGI directly, as httpx's ASGI transport would wait
+    for the never-ending body before returning.
+    """
+
+    def __init__(self, app, counts: dict):
+        self.app = app
+        self.counts = counts
+
+    async def run(self, deadline: float) -> None:
+        requested = False
+
+        async def receive():
+            nonlocal requested
+            if not requested:
+                requested = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await asyncio.sleep(max(0.0, deadline - time.perf_counter()))
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                self.counts[f"status {message['status']}"] += 1
+            for frame in message.get("body", b"").decode().split("\n\n"):
+                if frame.startswith("data: "):
+                    self.counts[json.loads(frame[6:])["type"]] += 1
+                elif frame.startswith(":"):
+                    self.counts["keepalive"] += 1
+
+        await self.app(_scope("GET", "/feed/stream"), receive, send)
+
+
+async def run_users(users: list[VirtualUser], recorder: Recorder, warmup: float, duration: float) -> float:
+    """Runs every user for warmup + duration seconds; returns the measured window's length."""
+    start = time.perf_counter()
+    deadline = start + warmup + duration
+
+    async def measure():
+        await asyncio.sleep(warmup)
+        recorder.active = True
+
+    marker = asyncio.create_task(measure())
+    await asyncio.gather(*(user.run(deadline) for user in users))
+    await marker
+    return time.perf_counter() - start - warmup
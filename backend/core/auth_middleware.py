@@ -1,64 +1,140 @@
+import asyncio
+import hashlib
+import logging
+import time
 import jwt
-import requests
-from functools import lru_cache
+from cachetools import TLRUCache
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from core.config import SUPABASE_JWKS_URL, SUPABASE_JWKS_KID
+from core.db import db
+from core.metrics import span
+
+logger = logging.getLogger(__name__)
 
 _bearer = HTTPBearer(auto_error=False)
 
+JWKS_REFRESH_INTERVAL = 600     # seconds between background JWKS refreshes
+JWKS_MIN_REFETCH      = 30      # unknown kids trigger at most one refetch per this many seconds
+TOKEN_CACHE_SIZE      = 10_000
+TOKEN_CACHE_TTL       = 300     # verified tokens are re-checked at least this often
+
 
-@lru_cache(maxsize=1)
-def _get_public_key() -> jwt.PyJWK:
+class JWKSStore:
     """
-    Fetches the Supabase JWKS endpoint and returns the matching PyJWK key object.
-    Cached after the first successful fetch — restart the server to refresh.
+    Supabase signing keys indexed by kid. Refreshed in the background so key
+    rotation is picked up without a restart; a token signed with an unknown kid
+    triggers one immediate, rate-limited refetch. A failed fetch keeps the old keys.
     """
-    try:
-        resp = requests.get(SUPABASE_JWKS_URL, timeout=5)
-        resp.raise_for_status()
-        jwks = resp.json()
-    except Exception as e:
-        raise RuntimeError(f"Failed to fetch JWKS from {SUPABASE_JWKS_URL}: {e}")
 
-    keys = jwks.get("keys", [])
-    if not keys:
-        raise RuntimeError("JWKS response contained no keys")
+    def __init__(self, url: str, default_kid: str = ""):
+        self.url = url
+        self.default_kid = default_kid
+        self._keys: dict[str, jwt.PyJWK] = {}
+        self._first_kid: str | None = None
+        self._fetched_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def refresh(self) -> None:
+        """Fetches the JWKS endpoint and replaces the key set."""
+        self._fetched_at = time.monotonic()
+        try:
+            resp = await db.http.get(self.url, timeout=5)
+            resp.raise_for_status()
+            keys = resp.json().get("keys", [])
+        except Exception as e:
+            raise RuntimeError(f"Failed to fetch JWKS from {self.url}: {e}")
+        if not keys:
+            raise RuntimeError("JWKS response contained no keys")
+        self._keys = {k.get("kid", ""): jwt.PyJWK(k) for k in keys}
+        self._first_kid = keys[0].get("kid", "")
+
+    async def _refetch(self, stale_at: float) -> None:
+        async with self._lock:
+            # Somebody else refreshed while we waited for the lock
+            if self._fetched_at > stale_at or time.monotonic() - self._fetched_at < JWKS_MIN_REFETCH:
+                return
+            # Anyone can send an unknown kid, so an outage must not turn it into a 500:
+            # keep the cached keys and let the lookup report the kid as unknown
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.warning("JWKS refetch failed: %s", e)
 
-    # If a specific KID is configured, find that key. Otherwise use the first.
-    if SUPABASE_JWKS_KID:
-        matches = [k for k in keys if k.get("kid") == SUPABASE_JWKS_KID]
-        if not matches:
-            raise RuntimeError(f"KID '{SUPABASE_JWKS_KID}' not found in JWKS")
-        key_data = matches[0]
-    else:
-        key_data = keys[0]
+    async def get(self, kid: str | None) -> jwt.PyJWK:
+        """
+        Returns the key for a token's kid. Tokens without a kid use the configured
+        SUPABASE_JWKS_KID, or the first key in the set. Raises ValueError if there
+        is no such key, including while the JWKS cannot be fetched.
+        """
+        kid = kid or self.default_kid or None
+        key = self._lookup(kid)
+        if key is None:
+            await self._refetch(self._fetched_at)
+            key = self._lookup(kid)
+        if key is None:
+            if not self._keys:
+                raise ValueError("Invalid token: signing keys are unavailable")
+            raise ValueError(f"Invalid token: unknown signing key '{kid}'")
+        return key
 
-    return jwt.PyJWK(key_data)
+    def _lookup(self, kid: str | None) -> jwt.PyJWK | None:
+        if kid is None:
+            return self._keys.get(self._first_kid) if self._first_kid is not None else None
+        return self._keys.get(kid)
 
+    async def run_refresher(self) -> None:
+        """Background loop re-fetching the key set every JWKS_REFRESH_INTERVAL seconds."""
+        while True:
+            try:
+                # Under the lock, so a request that finds no key waits for this fetch
+                async with self._lock:
+                    await self.refresh()
+            except Exception as e:
+                logger.warning("JWKS refresh failed: %s", e)
+            await asyncio.sleep(JWKS_REFRESH_INTERVAL)
 
-def _verify_token(token: str) -> str:
+
+jwks = JWKSStore(SUPABASE_JWKS_URL, SUPABASE_JWKS_KID)
+
+# sha256(token) -> (sub, exp). Each entry lives until the token expires, capped at
+# TOKEN_CACHE_TTL, so repeat requests skip the ES256 verification.
+_verified: TLRUCache = TLRUCache(
+    maxsize=TOKEN_CACHE_SIZE,
+    ttu=lambda _key, value, now: min(value[1], now + TOKEN_CACHE_TTL),
+    timer=time.time,
+)
+
+
+async def _verify_token(token: str) -> str:
     """
     Verifies a Supabase-issued JWT (ES256) using the JWKS public key.
     Returns the authenticated user UUID.
     Raises ValueError on invalid or expired token.
     """
+    cache_key = hashlib.sha256(token.encode()).digest()
+    cached = _verified.get(cache_key)
+    if cached is not None:
+        return cached[0]
     try:
-        jwk = _get_public_key()
-        payload = jwt.decode(
-            token,
-            jwk.key,
-            algorithms=["ES256"],
-            options={"verify_aud": False},  # Supabase JWTs don't always set aud
-        )
+        jwk = await jwks.get(jwt.get_unverified_header(token).get("kid"))
+        with span("jwt", "verify"):
+            payload = jwt.decode(
+                token,
+                jwk.key,
+                algorithms=["ES256"],
+                options={"verify_aud": False},  # Supabase JWTs don't always set aud
+            )
         sub = payload.get("sub")
         if not sub:
             raise ValueError("Token has no 'sub' claim")
-        return str(sub)
     except jwt.ExpiredSignatureError:
         raise ValueError("Token has expired")
     except jwt.InvalidTokenError as e:
         raise ValueError(f"Invalid token: {e}")
+    if "exp" in payload:
+        _verified[cache_key] = (str(sub), float(payload["exp"]))
+    return str(sub)
 
 
 async def get_current_user(
@@ -75,7 +151,7 @@ async def get_current_user(
             detail="Authorization header required",
         )
     try:
-        return _verify_token(credentials.credentials)
+        return await _verify_token(credentials.credentials)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -93,6 +169,6 @@ async def get_optional_user(
     if not credentials:
         return None
     try:
-        return _verify_token(credentials.credentials)
+        return await _verify_token(credentials.credentials)
     except ValueError:
         return None
@@ -0,0 +1,95 @@
+import asyncio
+import logging
+import uuid
+from core.config import redis_client
+from core.feed_cache import POST_KEY, BOOSTS_PENDING_KEY, BOOSTS_FLUSHING_KEY, decode_post
+from repositories import posts as posts_repo
+
+logger = logging.getLogger(__name__)
+
+PENDING_TOTAL_KEY = "boosts:pending:total"
+FLUSH_ID_KEY      = "boosts:flushing:id"    # identifies the batch in BOOSTS_FLUSHING_KEY to the RPC
+FLUSH_LOCK        = "boosts:flush:lock"
+
+FLUSH_INTERVAL    = 5       # seconds between write-behind flushes
+FLUSH_THRESHOLD   = 500     # pending boosts that trigger an early flush
+FLUSH_LOCK_TTL    = 30
+
+# Atomically bumps the live count on the cached post and records the delta for
+# the next flush. Returns nil when the post is not cached, otherwise
+# {pending total, HGETALL of the post hash...}.
+_RECORD_BOOST = redis_client.register_script("""
+if redis.call('EXISTS', KEYS[1]) == 0 then return false end
+redis.call('HINCRBY', KEYS[1], 'boost_count', 1)
+redis.call('HINCRBY', KEYS[2], ARGV[1], 1)
+local total = redis.call('INCR', KEYS[3])
+local result = redis.call('HGETALL', KEYS[1])
+table.insert(result, 1, total)
+return result
+""")
+
+_flush_requested = asyncio.Event()
+
+
+async def record_boost(post_id: str) -> dict | None:
+    """
+    Records one boost in Redis and returns the post row with its live boost_count.
+    Returns None if the post is not in the cache; the caller should load it and retry.
+    Raises RedisError if Redis is unavailable.
+    """
+    result = await _RECORD_BOOST(
+        keys=[POST_KEY.format(post_id), BOOSTS_PENDING_KEY, PENDING_TOTAL_KEY],
+        args=[post_id],
+    )
+    if result is None:
+        return None
+    total, fields = result[0], result[1:]
+    if total >= FLUSH_THRESHOLD:
+        _flush_requested.set()
+    return decode_post(dict(zip(fields[::2], fields[1::2])))
+
+
+async def flush() -> int:
+    """
+    Writes accumulated boost deltas to posts.boost_count in one RPC.
+    The pending hash is renamed aside first so new boosts keep accumulating;
+    a failed write leaves it in place to be retried by the next flush. The batch
+    carries a flush id the RPC applies only once, so a retry after a write that
+    committed (but whose cleanup failed) does not count the boosts twice.
+    Returns the number of boosts flushed.
+    """
+    if not await redis_client.set(FLUSH_LOCK, 1, nx=True, ex=FLUSH_LOCK_TTL):
+        return 0  # another worker is flushing
+    try:
+        if not await redis_client.exists(BOOSTS_FLUSHING_KEY):
+            if not await redis_client.exists(BOOSTS_PENDING_KEY):
+                return 0
+            pipe = redis_client.pipeline(transaction=True)
+            pipe.rename(BOOSTS_PENDING_KEY, BOOSTS_FLUSHING_KEY)
+            pipe.set(FLUSH_ID_KEY, str(uuid.uuid4()))
+            pipe.set(PENDING_TOTAL_KEY, 0)
+            await pipe.execute()
+        # A batch set aside before flush ids existed gets one now
+        await redis_client.set(FLUSH_ID_KEY, str(uuid.uuid4()), nx=True)
+
+        flush_id = await redis_client.get(FLUSH_ID_KEY)
+        deltas = {post_id: int(n) for post_id, n in (await redis_client.hgetall(BOOSTS_FLUSHING_KEY)).items()}
+        applied = bool(deltas) and await posts_repo.increment_boosts(flush_id, deltas)
+        await redis_client.delete(BOOSTS_FLUSHING_KEY, FLUSH_ID_KEY)
+        return sum(deltas.values()) if applied else 0
+    finally:
+        await redis_client.delete(FLUSH_LOCK)
+
+
+async def run_flusher() -> None:
+    """Background loop: flush every FLUSH_INTERVAL seconds, or sooner past FLUSH_THRESHOLD."""
+    while True:
+        try:
+            await asyncio.wait_for(_flush_requested.wait(), FLUSH_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+        _flush_requested.clear()
+        try:
+            await flush()
+        except Exception as e:
+            logger.warning("boost flush failed: %s", e)
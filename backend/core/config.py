@@ -1,9 +1,7 @@
 import os
 from dotenv import load_dotenv
-from supabase import create_client, Client
-from anthropic import AsyncAnthropic
-import redis.asyncio as redis
 from pathlib import Path
+from core.metrics import TimedRedis
 
 # Explicitly load backend/.env — not the frontend one
 _env_path = Path(__file__).parent.parent / ".env"
@@ -16,12 +14,32 @@ SUPABASE_JWKS_URL    = os.environ.get("SUPABASE_JWKS_URL", f"{SUPABASE_URL}/auth
 SUPABASE_JWKS_KID    = os.environ.get("SUPABASE_JWKS_KID", "")
 REDIS_URL            = os.environ.get("REDIS_URL", "redis://localhost:6379")
 ANTHROPIC_API_KEY    = os.environ["ANTHROPIC_API_KEY"]
+EMBEDDER             = os.environ.get("EMBEDDER", "hashing")                # or "package.module:factory"
+VECTOR_INDEX_DIR     = os.environ.get("VECTOR_INDEX_DIR", str(Path(__file__).parent.parent / ".vector_index"))
+TRUSTED_PROXY_HOPS   = int(os.environ.get("TRUSTED_PROXY_HOPS", "1"))  # proxies appending to X-Forwarded-For (Render: 1)
+# "postgrest" (default) or "postgres": hot reads straight from DATABASE_URL over an
+# asyncpg pool (pip install -r requirements-postgres.txt). Use a direct or
+# session-pooler connection (port 5432); the transaction pooler cannot keep
+# prepared statements. `python -m bench.parity` checks both paths return the same rows.
+READ_BACKEND         = os.environ.get("READ_BACKEND", "postgrest")
+DATABASE_URL         = os.environ.get("DATABASE_URL", "")
 
-# Public client (anon/publishable key) — for client-context auth flows
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_ANON_KEY or SUPABASE_SERVICE_KEY)
+# Supabase PostgREST/Storage clients are async and live on core.db.db,
+# opened by the app lifespan over one pooled HTTP client.
 
-# Admin client (secret key) — bypasses RLS for all server-side writes
-supabase_admin: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+# Connects on first command; modules bind Lua scripts to this instance at import
+redis_client = TimedRedis.from_url(REDIS_URL, decode_responses=True)
 
-redis_client     = redis.from_url(REDIS_URL, decode_responses=True)
-anthropic_client = AsyncAnthropic(api_key=ANTHROPIC_API_KEY)
+_anthropic_client = None
+
+
+def get_anthropic_client():
+    """
+    The shared Anthropic client, built on first use: the SDK takes about half a
+    second to import, which stays off cold starts (core.startup loads it later).
+    """
+    global _anthropic_client
+    if _anthropic_client is None:
+        from anthropic import AsyncAnthropic
+        _anthropic_client = AsyncAnthropic(api_key=ANTHROPIC_API_KEY)
+    return _anthropic_client
@@ -0,0 +1,136 @@
+import httpx
+from postgrest import AsyncPostgrestClient
+from postgrest.constants import DEFAULT_POSTGREST_CLIENT_HEADERS
+from pydantic_core import from_json
+from core.config import SUPABASE_URL, SUPABASE_ANON_KEY, SUPABASE_SERVICE_KEY, READ_BACKEND, DATABASE_URL
+from core.metrics import TimedTransport, span
+
+# One pooled HTTP/2 client is shared by every PostgREST and Storage call in a worker
+HTTP_MAX_CONNECTIONS = 100
+HTTP_MAX_KEEPALIVE   = 20
+HTTP_TIMEOUT         = httpx.Timeout(10.0, connect=5.0)
+
+# Direct Postgres pool for hot reads when READ_BACKEND=postgres
+PG_POOL_MIN          = 2
+PG_POOL_MAX          = 20
+PG_COMMAND_TIMEOUT   = 10.0
+
+
+def _auth_headers(key: str) -> dict:
+    return {"apikey": key, "Authorization": f"Bearer {key}"}
+
+
+def _rest_headers(key: str) -> dict:
+    return {**DEFAULT_POSTGREST_CLIENT_HEADERS, **_auth_headers(key)}
+
+
+def _classify(request: httpx.Request) -> tuple[str, str]:
+    """Metrics labels for a Supabase call: which API/key, and a bounded operation name."""
+    path = request.url.path
+    if path.startswith("/rest/v1/"):
+        target = path.removeprefix("/rest/v1/").replace("rpc/", "rpc ")
+        dependency = "supabase_admin" if request.headers.get("apikey") == SUPABASE_SERVICE_KEY else "supabase"
+        return dependency, f"{request.method} {target}"
+    if path.startswith("/storage/v1/"):
+        # Object keys and upload ids follow the first two segments
+        return "storage", f"{request.method} {'/'.join(path.split('/')[3:5])}"
+    return "supabase_auth", f"{request.method} {path}"
+
+
+class Database:
+    """
+    Holds the shared async HTTP connection pool and the PostgREST/Storage clients
+    built on top of it. Opened and closed by the app lifespan in main.py.
+
+      public  — anon/publishable key, for public reads (RLS applies)
+      admin   — secret key, bypasses RLS for server-side writes
+      storage — Storage API with the secret key, built on first use
+      pg      — asyncpg pool for the hot reads, only with READ_BACKEND=postgres
+    """
+
+    storage_url     = f"{SUPABASE_URL}/storage/v1"
+    service_headers = _auth_headers(SUPABASE_SERVICE_KEY)
+    # Set before connect() to route every call elsewhere (the benchmark's in-process fake)
+    transport: httpx.AsyncBaseTransport | None = None
+
+    def __init__(self):
+        self.http: httpx.AsyncClient | None = None
+        self.public: AsyncPostgrestClient | None = None
+        self.admin: AsyncPostgrestClient | None = None
+        self._storage = None
+        self.pg = None
+
+    async def connect(self) -> None:
+        if self.http is not None:
+            return
+        transport = self.transport or httpx.AsyncHTTPTransport(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+            ),
+        )
+        self.http = httpx.AsyncClient(
+            timeout=HTTP_TIMEOUT,
+            follow_redirects=True,
+            transport=TimedTransport(transport, _classify),
+        )
+        rest_url = f"{SUPABASE_URL}/rest/v1"
+        self.public = AsyncPostgrestClient(
+            rest_url,
+            headers=_rest_headers(SUPABASE_ANON_KEY or SUPABASE_SERVICE_KEY),
+            http_client=self.http,
+        )
+        self.admin = AsyncPostgrestClient(
+            rest_url,
+            headers=_rest_headers(SUPABASE_SERVICE_KEY),
+            http_client=self.http,
+        )
+        if READ_BACKEND == "postgres":
+            if not DATABASE_URL:
+                raise RuntimeError("READ_BACKEND=postgres needs DATABASE_URL")
+            try:
+                import asyncpg      # optional; only needed for the direct read path
+            except ImportError:
+                raise RuntimeError("READ_BACKEND=postgres needs asyncpg (pip install -r requirements-postgres.txt)")
+            # asyncpg prepares each distinct query once per connection and reuses it
+            self.pg = await asyncpg.create_pool(
+                DATABASE_URL,
+                min_size=PG_POOL_MIN,
+                max_size=PG_POOL_MAX,
+                command_timeout=PG_COMMAND_TIMEOUT,
+                server_settings={"application_name": "chipn-api", "timezone": "UTC"},
+            )
+
+    async def close(self) -> None:
+        if self.http is not None:
+            await self.http.aclose()
+        if self.pg is not None:
+            await self.pg.close()
+        self.http = self.public = self.admin = self._storage = self.pg = None
+
+    @property
+    def storage(self):
+        # storage3 pulls in pyiceberg and takes over half a second to import, so
+        # the client is built on first use (core.startup does so after startup)
+        if self._storage is None:
+            from storage3 import AsyncStorageClient
+            self._storage = AsyncStorageClient(
+                f"{self.storage_url}/",
+                headers=self.service_headers,
+                http_client=self.http,
+            )
+        return self._storage
+
+    async def fetch_json(self, operation: str, sql: str, *args) -> list[dict]:
+        """
+        Runs a read on the direct pool and returns its rows the way PostgREST does:
+        Postgres itself aggregates them to JSON, so uuids, timestamps and numerics
+        come back formatted exactly as over the REST path. RLS does not apply here.
+        """
+        with span("postgres", operation):
+            raw = await self.pg.fetchval(f"SELECT coalesce(json_agg(r), '[]') FROM ({sql}) r", *args)
+        return from_json(raw)
+
+
+db = Database()
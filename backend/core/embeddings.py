@@ -0,0 +1,67 @@
+import importlib
+import math
+import re
+from functools import lru_cache
+import mmh3
+import numpy as np
+from core.config import EMBEDDER
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+class HashingEmbedder:
+    """
+    Dependency-free local embedder: unigrams and bigrams are feature-hashed into a
+    fixed number of signed buckets, weighted by sublinear term frequency and
+    L2-normalised, so cosine similarity is a plain dot product.
+    Swap in a real model via the EMBEDDER setting; anything with `dim` and
+    `embed(texts) -> float32 array (len(texts), dim)` works.
+    """
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+
+    @staticmethod
+    def _normalise(token: str) -> str:
+        # Crude plural folding so "drones" and "drone" share a bucket
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            return token[:-1]
+        return token
+
+    def _features(self, text: str) -> dict[int, float]:
+        tokens = [self._normalise(t) for t in _TOKEN_RE.findall(text.lower())]
+        grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        counts: dict[int, float] = {}
+        for gram in grams:
+            h = mmh3.hash(gram, signed=False)
+            bucket = h % self.dim                    # low bits pick the bucket,
+            sign = -1.0 if h >> 31 else 1.0          # the top bit the sign
+            counts[bucket] = counts.get(bucket, 0.0) + sign
+        return counts
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for bucket, count in self._features(text).items():
+                out[row, bucket] = math.copysign(1.0 + math.log(abs(count)), count) if count else 0.0
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        np.divide(out, norms, out=out, where=norms > 0)
+        return out
+
+
+def post_text(row: dict) -> str:
+    """The text a post is embedded from. The title is repeated to weight it up."""
+    parts = [row.get("title") or "", row.get("title") or "", row.get("description") or "", row.get("ai_summary") or ""]
+    return "\n".join(p for p in parts if p)
+
+
+@lru_cache(maxsize=1)
+def get_embedder():
+    """
+    Returns the configured embedder: "hashing" (default) or a "package.module:attr"
+    path to a class or factory taking no arguments.
+    """
+    if EMBEDDER in ("", "hashing"):
+        return HashingEmbedder()
+    module_name, _, attr = EMBEDDER.partition(":")
+    return getattr(importlib.import_module(module_name), attr)()
@@ -0,0 +1,207 @@
+import json
+import logging
+from datetime import datetime
+from redis.exceptions import RedisError
+from core.config import redis_client
+
+logger = logging.getLogger(__name__)
+
+# Newest TIMELINE_SIZE post ids, scored by created_at (epoch seconds)
+TIMELINE_KEY   = "feed:timeline"
+# Present while the timeline mirrors Postgres; expiry forces a periodic refill
+READY_KEY      = "feed:timeline:ready"
+REFILL_LOCK    = "feed:timeline:refill"
+POST_KEY       = "post:{}"
+# Boost deltas accepted but not yet written to posts.boost_count (see core.boosts).
+# Cached boost_count values are live: Postgres count plus these deltas.
+BOOSTS_PENDING_KEY  = "boosts:pending"
+BOOSTS_FLUSHING_KEY = "boosts:flushing"
+
+TIMELINE_SIZE  = 500
+TIMELINE_TTL   = 300        # seconds between forced refills
+POST_TTL       = 86_400     # per-post hash expiry
+REFILL_LOCK_TTL = 10
+TIE_SLACK      = 16         # extra ids fetched to skip same-timestamp rows before the cursor
+
+
+def _score(created_at: str) -> float:
+    return datetime.fromisoformat(created_at).timestamp()
+
+
+def _encode(row: dict) -> dict:
+    # Each column is stored JSON-encoded so types survive the round trip;
+    # integers stay plain digits, which keeps HINCRBY usable on counters.
+    return {k: json.dumps(v) for k, v in row.items()}
+
+
+def _decode(fields: dict) -> dict:
+    return {k: json.loads(v) for k, v in fields.items()}
+
+
+# Replaces a post hash and re-applies unflushed boost deltas in one atomic step,
+# so a refill from Postgres never rolls the live boost count backwards.
+_WRITE_POST = redis_client.register_script("""
+redis.call('DEL', KEYS[1])
+redis.call('HSET', KEYS[1], unpack(ARGV, 3))
+local delta = tonumber(redis.call('HGET', KEYS[2], ARGV[1]) or '0')
+    + tonumber(redis.call('HGET', KEYS[3], ARGV[1]) or '0')
+if delta ~= 0 then redis.call('HINCRBY', KEYS[1], 'boost_count', delta) end
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+""")
+
+
+async def _write_post(pipe, row: dict) -> None:
+    # Queues the script on the pipeline; awaiting only buffers the command
+    row = {**row, "boost_count": row.get("boost_count") or 0}
+    fields = [item for pair in _encode(row).items() for item in pair]
+    await _WRITE_POST(
+        keys=[POST_KEY.format(row["id"]), BOOSTS_PENDING_KEY, BOOSTS_FLUSHING_KEY],
+        args=[row["id"], POST_TTL, *fields],
+        client=pipe,
+    )
+
+
+def decode_post(fields: dict) -> dict | None:
+    """Decodes a raw post hash (e.g. from HGETALL); None for a missing hash."""
+    return _decode(fields) if fields else None
+
+
+async def get_post(post_id: str) -> dict | None:
+    """Returns the cached row for a post, or None if it is not cached."""
+    try:
+        return decode_post(await redis_client.hgetall(POST_KEY.format(post_id)))
+    except RedisError as e:
+        logger.warning("feed cache get failed for %s: %s", post_id, e)
+        return None
+
+
+async def get_page(limit: int, after: tuple | None) -> list[dict] | None:
+    """
+    Returns up to limit+1 rows strictly after the (created_at, id) keyset position,
+    newest first — the same shape as a PostgREST keyset probe.
+    Returns None on a cache miss: timeline not loaded, the page runs past the cached
+    window, or a post hash has expired. Callers then fall back to Postgres.
+    """
+    want = limit + 1
+    max_score = "+inf" if after is None else _score(after[0])
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.exists(READY_KEY)
+        pipe.zcard(TIMELINE_KEY)
+        pipe.zrevrangebyscore(TIMELINE_KEY, max_score, "-inf", start=0, num=want + TIE_SLACK, withscores=True)
+        ready, size, entries = await pipe.execute()
+        if not ready:
+            return None
+        fetched = len(entries)
+
+        if after is not None:
+            cursor_score, cursor_id = max_score, after[1]
+            entries = [
+                (pid, score) for pid, score in entries
+                if score < cursor_score or pid < cursor_id
+            ]
+        ids = [pid for pid, _ in entries[:want]]
+
+        if len(ids) < want and (fetched == want + TIE_SLACK or size >= TIMELINE_SIZE):
+            # Either the tie slack was exhausted or older posts exist beyond the cached window
+            return None
+
+        pipe = redis_client.pipeline(transaction=False)
+        for pid in ids:
+            pipe.hgetall(POST_KEY.format(pid))
+        hashes = await pipe.execute()
+        if not all(hashes):
+            return None
+        return [_decode(h) for h in hashes]
+    except RedisError as e:
+        logger.warning("feed cache read failed: %s", e)
+        return None
+
+
+async def get_posts(post_ids: list[str]) -> dict[str, dict]:
+    """Returns {id: row} for whichever of the posts are cached."""
+    if not post_ids:
+        return {}
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        for pid in post_ids:
+            pipe.hgetall(POST_KEY.format(pid))
+        hashes = await pipe.execute()
+    except RedisError as e:
+        logger.warning("feed cache multi-get failed: %s", e)
+        return {}
+    return {pid: _decode(h) for pid, h in zip(post_ids, hashes) if h}
+
+
+async def begin_refill() -> bool:
+    """
+    Returns True if the timeline needs reloading and this caller won the refill lock.
+    Losers keep serving from Postgres instead of stampeding it with full reloads.
+    """
+    try:
+        if await redis_client.exists(READY_KEY):
+            return False
+        return bool(await redis_client.set(REFILL_LOCK, 1, nx=True, ex=REFILL_LOCK_TTL))
+    except RedisError as e:
+        logger.warning("feed cache refill check failed: %s", e)
+        return False
+
+
+async def refill(rows: list[dict]) -> None:
+    """Replaces the timeline with the newest rows from Postgres (newest first)."""
+    try:
+        pipe = redis_client.pipeline(transaction=True)
+        pipe.delete(TIMELINE_KEY)
+        if rows:
+            pipe.zadd(TIMELINE_KEY, {r["id"]: _score(r["created_at"]) for r in rows})
+        for row in rows:
+            await _write_post(pipe, row)
+        pipe.set(READY_KEY, 1, ex=TIMELINE_TTL)
+        pipe.delete(REFILL_LOCK)
+        await pipe.execute()
+    except RedisError as e:
+        logger.warning("feed cache refill failed: %s", e)
+
+
+async def add_post(row: dict) -> None:
+    """Write-through for a newly created post: cache it and push it onto the timeline."""
+    try:
+        pipe = redis_client.pipeline(transaction=True)
+        await _write_post(pipe, row)
+        pipe.zadd(TIMELINE_KEY, {row["id"]: _score(row["created_at"])})
+        pipe.zremrangebyrank(TIMELINE_KEY, 0, -(TIMELINE_SIZE + 1))
+        await pipe.execute()
+    except RedisError as e:
+        logger.warning("feed cache add failed for %s: %s", row.get("id"), e)
+        await invalidate()
+
+
+async def update_post(row: dict) -> None:
+    """Write-through for an edited or boosted post: overwrite its cached hash."""
+    try:
+        pipe = redis_client.pipeline(transaction=True)
+        await _write_post(pipe, row)
+        await pipe.execute()
+    except RedisError as e:
+        logger.warning("feed cache update failed for %s: %s", row.get("id"), e)
+        await invalidate()
+
+
+async def remove_post(post_id: str) -> None:
+    """Drops a deleted post from the timeline and the hash store."""
+    try:
+        pipe = redis_client.pipeline(transaction=True)
+        pipe.zrem(TIMELINE_KEY, post_id)
+        pipe.delete(POST_KEY.format(post_id))
+        await pipe.execute()
+    except RedisError as e:
+        logger.warning("feed cache remove failed for %s: %s", post_id, e)
+        await invalidate()
+
+
+async def invalidate() -> None:
+    """Forces the next feed read to reload the timeline from Postgres."""
+    try:
+        await redis_client.delete(READY_KEY)
+    except RedisError as e:
+        logger.warning("feed cache invalidate failed: %s", e)
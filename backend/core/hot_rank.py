@@ -0,0 +1,206 @@
+import asyncio
+import logging
+import math
+import time
+from datetime import datetime
+from redis.exceptions import RedisError
+from core.config import redis_client
+from repositories import posts as posts_repo, investments as investments_repo
+
+logger = logging.getLogger(__name__)
+
+# Post id -> hot score. Every event adds weight * e^((t - epoch) / TAU), so older
+# events are worth exponentially less than new ones without touching them; the
+# rebalance job periodically rescales everything to a fresh epoch so the numbers
+# stay small, and trims posts that have cooled off.
+HOT_KEY       = "feed:hot"
+HOT_EPOCH_KEY = "feed:hot:epoch"
+HOT_READY_KEY = "feed:hot:ready"
+REBUILD_LOCK  = "feed:hot:rebuild"
+
+HALF_LIFE       = 12 * 3600               # an event's weight halves every 12 hours
+TAU             = HALF_LIFE / math.log(2)
+CREATE_WEIGHT   = 3.0                     # a new post starts level with three fresh boosts
+BOOST_WEIGHT    = 1.0
+INVEST_WEIGHT   = 5.0                     # per investment...
+VOLUME_WEIGHT   = 2.0                     # ...plus this per order of magnitude committed
+HOT_SIZE        = 2000                    # posts kept ranked
+MIN_SCORE       = 0.01                    # posts below this after a rebalance drop out
+REBALANCE_INTERVAL = 3600
+REBUILD_LOCK_TTL   = 30
+
+# Adds ARGV[1] * e^((ARGV[2] - epoch) / ARGV[3]) to ARGV[4]'s score
+_BUMP = redis_client.register_script("""
+local epoch = tonumber(redis.call('GET', KEYS[2]))
+if not epoch then
+    epoch = tonumber(ARGV[2])
+    redis.call('SET', KEYS[2], ARGV[2])
+end
+return redis.call('ZINCRBY', KEYS[1], tonumber(ARGV[1]) * math.exp((tonumber(ARGV[2]) - epoch) / tonumber(ARGV[3])), ARGV[4])
+""")
+
+# Rescales every score to a new epoch ARGV[1], then trims cold and surplus posts
+_REBALANCE = redis_client.register_script("""
+local epoch = tonumber(redis.call('GET', KEYS[2]))
+if epoch and redis.call('EXISTS', KEYS[1]) == 1 then
+    local factor = math.exp((epoch - tonumber(ARGV[1])) / tonumber(ARGV[2]))
+    redis.call('ZUNIONSTORE', KEYS[1], 1, KEYS[1], 'WEIGHTS', factor)
+    redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', '(' .. ARGV[3])
+    redis.call('ZREMRANGEBYRANK', KEYS[1], 0, -(tonumber(ARGV[4]) + 1))
+end
+redis.call('SET', KEYS[2], ARGV[1])
+""")
+
+
+def _timestamp(created_at: str) -> float:
+    return datetime.fromisoformat(created_at).timestamp()
+
+
+def investment_weight(amount: float) -> float:
+    """Score for one investment: a flat count term plus log-scaled volume."""
+    return INVEST_WEIGHT + VOLUME_WEIGHT * math.log10(1 + max(amount, 0))
+
+
+def encode_position(score: float, epoch: float) -> str:
+    """Cursor sort key for a hot page: the score and the epoch it is expressed in."""
+    return f"{score!r}@{epoch!r}"
+
+
+def is_hot_position(sort_key) -> bool:
+    return isinstance(sort_key, str) and "@" in sort_key
+
+
+def parse_position(sort_key: str) -> tuple[float, float]:
+    """Splits a hot cursor sort key into (score, epoch). Raises ValueError if malformed."""
+    try:
+        score, epoch = (float(part) for part in sort_key.split("@"))
+    except ValueError:
+        raise ValueError("Invalid cursor")
+    if not (math.isfinite(score) and math.isfinite(epoch)):
+        raise ValueError("Invalid cursor")
+    return score, epoch
+
+
+async def record(post_id: str, weight: float, at: float | None = None) -> None:
+    """Adds an event of the given weight (at `at`, default now) to the post's hot score."""
+    try:
+        await _BUMP(keys=[HOT_KEY, HOT_EPOCH_KEY], args=[weight, at or time.time(), TAU, post_id])
+    except RedisError as e:
+        logger.warning("hot rank update failed for %s: %s", post_id, e)
+
+
+async def add_post(row: dict) -> None:
+    await record(row["id"], CREATE_WEIGHT, _timestamp(row["created_at"]))
+
+
+async def remove_post(post_id: str) -> None:
+    try:
+        await redis_client.zrem(HOT_KEY, post_id)
+    except RedisError as e:
+        logger.warning("hot rank remove failed for %s: %s", post_id, e)
+
+
+async def get_page(limit: int, after: tuple | None) -> list[tuple[str, str]] | None:
+    """
+    Returns up to limit+1 (post id, cursor sort key) pairs strictly after the
+    (score, id) position, hottest first, ties broken by id descending — the same
+    limit+1 probe as feed_cache.get_page.
+    Returns None when the ranking has not been built yet or Redis is unavailable.
+    Scores keep moving between requests, so a post boosted mid-scroll may
+    reappear or be skipped; the cursor itself never becomes invalid.
+    """
+    want = limit + 1
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.exists(HOT_READY_KEY)
+        pipe.get(HOT_EPOCH_KEY)
+        ready, epoch = await pipe.execute()
+        if not ready or epoch is None:
+            return None
+        epoch = float(epoch)
+
+        max_score, cursor_id = "+inf", None
+        if after is not None:
+            score, cursor_epoch = parse_position(after[0])
+            # Re-express the cursor score in the current epoch; a rebalance may have run since
+            max_score = score * math.exp((cursor_epoch - epoch) / TAU)
+            cursor_id = after[1]
+        entries, offset = [], 0
+        while len(entries) < want:
+            batch = await redis_client.zrevrangebyscore(
+                HOT_KEY, max_score, "-inf", start=offset, num=want, withscores=True,
+            )
+            offset += len(batch)
+            entries += [
+                (pid, score) for pid, score in batch
+                if cursor_id is None or score < max_score or pid < cursor_id
+            ]
+            if len(batch) < want:
+                break
+    except RedisError as e:
+        logger.warning("hot rank read failed: %s", e)
+        return None
+
+    # ZREVRANGEBYSCORE breaks score ties by member descending, matching the cursor order
+    return [(pid, encode_position(score, epoch)) for pid, score in entries[:want]]
+
+
+async def begin_rebuild() -> bool:
+    """True if the ranking needs building and this caller won the rebuild lock."""
+    try:
+        if await redis_client.exists(HOT_READY_KEY):
+            return False
+        return bool(await redis_client.set(REBUILD_LOCK, 1, nx=True, ex=REBUILD_LOCK_TTL))
+    except RedisError as e:
+        logger.warning("hot rank rebuild check failed: %s", e)
+        return False
+
+
+async def rebuild() -> None:
+    """
+    Seeds the ranking from Postgres for the newest HOT_SIZE posts. Per-event
+    timestamps are not stored, so each post's boosts and funding aggregates are
+    counted as of its creation time; live events take over from there.
+    """
+    rows = await posts_repo.list_page(HOT_SIZE - 1, None)
+    funding = await investments_repo.funding_for_posts([r["id"] for r in rows])
+    invested = {
+        f["post_id"]: INVEST_WEIGHT * f["investment_count"] + VOLUME_WEIGHT * math.log10(1 + max(float(f["total_committed"]), 0))
+        for f in funding
+    }
+    now = time.time()
+    scores = {
+        r["id"]: (CREATE_WEIGHT + BOOST_WEIGHT * (r.get("boost_count") or 0) + invested.get(r["id"], 0.0))
+        * math.exp((_timestamp(r["created_at"]) - now) / TAU)
+        for r in rows
+    }
+    try:
+        pipe = redis_client.pipeline(transaction=True)
+        pipe.delete(HOT_KEY)
+        if scores:
+            pipe.zadd(HOT_KEY, scores)
+        pipe.set(HOT_EPOCH_KEY, repr(now))
+        pipe.set(HOT_READY_KEY, 1)
+        pipe.delete(REBUILD_LOCK)
+        await pipe.execute()
+    except RedisError as e:
+        logger.warning("hot rank rebuild failed: %s", e)
+
+
+async def rebalance() -> None:
+    """Rescales scores to the current time and drops cold posts."""
+    if not await redis_client.exists(HOT_READY_KEY):
+        if await begin_rebuild():
+            await rebuild()
+        return
+    await _REBALANCE(keys=[HOT_KEY, HOT_EPOCH_KEY], args=[repr(time.time()), TAU, MIN_SCORE, HOT_SIZE])
+
+
+async def run_rebalancer() -> None:
+    """Background loop: rebalance every REBALANCE_INTERVAL seconds."""
+    while True:
+        try:
+            await rebalance()
+        except Exception as e:
+            logger.warning("hot rank rebalance failed: %s", e)
+        await asyncio.sleep(REBALANCE_INTERVAL)
@@ -0,0 +1,45 @@
+import hashlib
+from fastapi import Request, Response
+from pydantic_core import to_json
+
+# Cache-Control for public reads: shared caches (the CDN in front of Render) may
+# serve a copy for max-age seconds, then keep serving it while they revalidate
+FEED_CACHE_CONTROL    = "public, max-age=5, stale-while-revalidate=30"
+LIST_CACHE_CONTROL    = "public, max-age=10, stale-while-revalidate=60"
+POST_CACHE_CONTROL    = "public, max-age=30, stale-while-revalidate=300"
+# Personalized responses: only the caller's own browser may keep a copy, and it revalidates
+PRIVATE_CACHE_CONTROL = "private, no-cache"
+
+
+def etag(body: bytes) -> str:
+    """Strong validator for a response body: a content hash, identical bytes only."""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def _matches(if_none_match: str | None, tag: str) -> bool:
+    # If-None-Match uses weak comparison, so W/"x" matches "x"
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(candidate.strip().removeprefix("W/") == tag for candidate in if_none_match.split(","))
+
+
+def cached_json(
+    request: Request,
+    content,
+    cache_control: str,
+    headers: dict | None = None,
+) -> Response:
+    """
+    Serializes trusted rows to JSON (as core.projection.json_response does) and tags
+    the body with an ETag. Returns 304 Not Modified with no body when the client's
+    If-None-Match already names this representation. The body is built from whatever
+    the route read, so a page served from the Redis cache revalidates without Postgres.
+    """
+    body = to_json(content)
+    tag = etag(body)
+    headers = {**(headers or {}), "ETag": tag, "Cache-Control": cache_control}
+    if _matches(request.headers.get("if-none-match"), tag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,99 @@
+import logging
+import re
+from urllib.parse import unquote
+from redis.exceptions import RedisError
+from core.config import redis_client
+from core.db import db
+from repositories import storage as storage_repo
+
+logger = logging.getLogger(__name__)
+
+# Files in private buckets are stored on posts as "storage://<bucket>/<key>" and
+# handed to clients as short-lived signed URLs, minted on read
+STORAGE_SCHEME = "storage://"
+PRIVATE_BUCKETS = {"pitch-videos"}
+# Columns that may hold a storage reference
+MEDIA_COLUMNS = ("video_url",)
+
+SIGNED_URL_KEY    = "signed-url:{}"
+SIGNED_URL_TTL    = 3600        # lifetime of a minted URL
+SIGNED_URL_MARGIN = 600         # cached until this long before expiry, so every URL served has at least this left
+
+_SIGNED_PATH = re.compile(r"/object/sign/([^/]+)/([^?]+)")
+
+
+def storage_ref(bucket: str, key: str) -> str:
+    return f"{STORAGE_SCHEME}{bucket}/{key}"
+
+
+def parse_ref(value: str | None) -> tuple[str, str] | None:
+    """(bucket, key) for a storage reference, None for any other value."""
+    if not value or not value.startswith(STORAGE_SCHEME):
+        return None
+    bucket, _, key = value.removeprefix(STORAGE_SCHEME).partition("/")
+    return (bucket, key) if bucket and key else None
+
+
+def normalize(value: str | None, owner: str) -> str | None:
+    """
+    The value to store for a media column written by `owner`. A URL signed by this
+    project's Storage (as clients receive them) is turned back into its reference,
+    so a post re-saved by a client never persists an expiring URL.
+    Raises ValueError for a reference to a file outside the owner's folder.
+    """
+    if value and value.startswith(f"{db.storage_url}/object/sign/"):
+        match = _SIGNED_PATH.match(value.removeprefix(db.storage_url))
+        if match and match.group(1) in PRIVATE_BUCKETS:
+            value = storage_ref(match.group(1), unquote(match.group(2)))
+    ref = parse_ref(value)
+    if ref is not None and (ref[0] not in PRIVATE_BUCKETS or not ref[1].startswith(f"{owner}/")):
+        raise ValueError("Storage references must point to your own uploads")
+    return value
+
+
+async def _signed_urls(refs: set[str]) -> dict[str, str]:
+    urls: dict[str, str] = {}
+    ordered = list(refs)
+    try:
+        cached = await redis_client.mget([SIGNED_URL_KEY.format(ref) for ref in ordered])
+        urls = {ref: url for ref, url in zip(ordered, cached) if url}
+    except RedisError as e:
+        logger.warning("signed URL cache read failed: %s", e)
+
+    by_bucket: dict[str, list[str]] = {}
+    for ref in refs - urls.keys():
+        bucket, key = parse_ref(ref)
+        by_bucket.setdefault(bucket, []).append(key)
+    minted: dict[str, str] = {}
+    for bucket, keys in by_bucket.items():
+        try:
+            signed = await storage_repo.signed_urls(bucket, keys, SIGNED_URL_TTL)
+        except Exception as e:
+            logger.warning("signing %d %s URLs failed: %s", len(keys), bucket, e)
+            continue
+        minted.update((storage_ref(bucket, key), url) for key, url in signed.items())
+    if minted:
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            for ref, url in minted.items():
+                pipe.set(SIGNED_URL_KEY.format(ref), url, ex=SIGNED_URL_TTL - SIGNED_URL_MARGIN)
+            await pipe.execute()
+        except RedisError as e:
+            logger.warning("signed URL cache write failed: %s", e)
+    return {**urls, **minted}
+
+
+async def sign_rows(rows: list[dict]) -> list[dict]:
+    """
+    Copies of the rows with storage references in MEDIA_COLUMNS replaced by signed
+    URLs. URLs are shared by every reader until re-minted, so the browser and CDN
+    can cache the file. A reference that cannot be signed comes back as None.
+    """
+    refs = {row[c] for row in rows for c in MEDIA_COLUMNS if parse_ref(row.get(c))}
+    if not refs:
+        return rows
+    urls = await _signed_urls(refs)
+    return [
+        {**row, **{c: urls.get(row[c]) for c in MEDIA_COLUMNS if parse_ref(row.get(c))}}
+        for row in rows
+    ]
@@ -0,0 +1,276 @@
+import contextvars
+import logging
+import os
+import random
+import time
+from contextlib import contextmanager
+from pathlib import Path
+import anyio.to_thread
+import httpx
+import redis.asyncio as redis
+from redis.asyncio.client import Pipeline
+from redis.exceptions import NoScriptError
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from starlette.datastructures import MutableHeaders
+from core import singleflight
+
+logger = logging.getLogger(__name__)
+
+# Opt-in sampling profiler (pip install pyinstrument): a PROFILE_SAMPLE_RATE fraction
+# of requests whose path starts with one of PROFILE_PATHS (e.g. "/feed/,/search/") is
+# profiled, one at a time, and the report is written to PROFILE_DIR as HTML.
+PROFILE_PATHS       = [p for p in os.environ.get("PROFILE_PATHS", "").split(",") if p]
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", "0.01"))
+PROFILE_DIR         = os.environ.get("PROFILE_DIR", str(Path(__file__).parent.parent / ".profiles"))
+PROFILE_INTERVAL    = 0.001
+
+_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+REQUEST_LATENCY = Histogram(
+    "chipn_http_request_duration_seconds", "Request latency by route template and status.",
+    ["method", "route", "status"], buckets=_LATENCY_BUCKETS,
+)
+REQUESTS_IN_FLIGHT = Gauge("chipn_http_requests_in_flight", "Requests currently being handled.")
+# Server-Sent Events responses stay open for minutes, so once their headers are
+# sent they move out of the two metrics above into these
+STREAM_DURATION = Histogram(
+    "chipn_http_stream_duration_seconds", "How long event streams stayed open, by route template.",
+    ["route"], buckets=(1, 5, 15, 60, 300, 900, 3600, 14400),
+)
+STREAMS_OPEN = Gauge("chipn_http_streams_open", "Event streams currently open.")
+DEPENDENCY_LATENCY = Histogram(
+    "chipn_dependency_duration_seconds",
+    "Time spent in calls to Supabase, Redis, Anthropic and in JWT verification.",
+    ["dependency", "operation"], buckets=_LATENCY_BUCKETS,
+)
+DEPENDENCY_ERRORS = Counter(
+    "chipn_dependency_errors_total", "Dependency calls that raised or returned a 5xx.",
+    ["dependency", "operation"],
+)
+DEPENDENCY_IN_FLIGHT = Gauge("chipn_dependency_in_flight", "Dependency calls currently awaiting a reply.", ["dependency"])
+
+# dependency -> calls awaiting a reply in this worker, read by load shedding (core.rate_limit)
+_in_flight: dict[str, int] = {}
+
+# dependency -> seconds spent in it by the current request, for Server-Timing.
+# Tasks spawned by the request inherit the same dict, so concurrent calls add up.
+_timings: contextvars.ContextVar[dict[str, float] | None] = contextvars.ContextVar("timings", default=None)
+
+
+@contextmanager
+def span(dependency: str, operation: str, expected: tuple[type[Exception], ...] = ()):
+    """
+    Times one call to a dependency: histogram, in-flight gauge, errors and Server-Timing.
+    Exceptions other than `expected` count as errors; cancellation does not.
+    """
+    DEPENDENCY_IN_FLIGHT.labels(dependency).inc()
+    _in_flight[dependency] = _in_flight.get(dependency, 0) + 1
+    start = time.perf_counter()
+    try:
+        yield
+    except expected:
+        raise
+    except Exception:
+        DEPENDENCY_ERRORS.labels(dependency, operation).inc()
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        DEPENDENCY_IN_FLIGHT.labels(dependency).dec()
+        _in_flight[dependency] -= 1
+        DEPENDENCY_LATENCY.labels(dependency, operation).observe(elapsed)
+        timings = _timings.get()
+        if timings is not None:
+            timings[dependency] = timings.get(dependency, 0.0) + elapsed
+
+
+def in_flight(dependency: str) -> int:
+    """Calls to the dependency currently awaiting a reply in this worker."""
+    return _in_flight.get(dependency, 0)
+
+
+def server_timing(timings: dict[str, float], total: float) -> str:
+    """
+    Server-Timing value: time per dependency, `app` for the remainder (routing,
+    validation, serialization) and `total`. Concurrent calls are summed, so on
+    pages that fan out the parts can add up to more than the total.
+    """
+    parts = [f"{name};dur={1000 * seconds:.1f}" for name, seconds in sorted(timings.items())]
+    parts.append(f"app;dur={1000 * max(total - sum(timings.values()), 0.0):.1f}")
+    parts.append(f"total;dur={1000 * total:.1f}")
+    return ", ".join(parts)
+
+
+# ─── instrumented clients ──────────────────────────────────────
+
+
+class TimedTransport(httpx.AsyncBaseTransport):
+    """Wraps an httpx transport; `classify(request)` names the (dependency, operation)."""
+
+    def __init__(self, inner: httpx.AsyncBaseTransport, classify):
+        self.inner = inner
+        self.classify = classify
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        dependency, operation = self.classify(request)
+        with span(dependency, operation):
+            response = await self.inner.handle_async_request(request)
+        if response.status_code >= 500:
+            DEPENDENCY_ERRORS.labels(dependency, operation).inc()
+        return response
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+class TimedPipeline(Pipeline):
+    async def execute(self, raise_on_error: bool = True):
+        with span("redis", "pipeline"):
+            return await super().execute(raise_on_error)
+
+
+class TimedRedis(redis.Redis):
+    """redis.asyncio client whose commands, scripts and pipelines are timed per command name."""
+
+    async def execute_command(self, *args, **options):
+        # NoScriptError is routine: registered scripts fall back to SCRIPT LOAD
+        with span("redis", str(args[0]).lower(), expected=(NoScriptError,)):
+            return await super().execute_command(*args, **options)
+
+    def pipeline(self, transaction: bool = True, shard_hint: str | None = None) -> TimedPipeline:
+        return TimedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+
+# ─── scrape-time collectors ────────────────────────────────────
+
+
+def _threadpool_usage() -> tuple[float, float]:
+    # Sync routes, file I/O and storage calls share anyio's default thread limiter
+    try:
+        limiter = anyio.to_thread.current_default_thread_limiter()
+    except RuntimeError:        # no event loop (scraped outside the app)
+        return float("nan"), float("nan")
+    return float(limiter.borrowed_tokens), float(limiter.total_tokens)
+
+
+class _AppCollector:
+    """Exports the single-flight counters and threadpool occupancy on each scrape."""
+
+    def collect(self):
+        calls = CounterMetricFamily("chipn_singleflight_calls", "Calls made through a SingleFlight.", labels=["name"])
+        executed = CounterMetricFamily("chipn_singleflight_executed", "Operations actually started.", labels=["name"])
+        coalesced = CounterMetricFamily("chipn_singleflight_coalesced", "Calls that joined one in flight.", labels=["name"])
+        for name, stats in singleflight.stats().items():
+            calls.add_metric([name], stats["calls"])
+            executed.add_metric([name], stats["executed"])
+            coalesced.add_metric([name], stats["coalesced"])
+        yield from (calls, executed, coalesced)
+
+        busy, size = _threadpool_usage()
+        yield GaugeMetricFamily("chipn_threadpool_busy", "Worker threads in use.", value=busy)
+        yield GaugeMetricFamily("chipn_threadpool_size", "Worker thread limit.", value=size)
+
+
+REGISTRY.register(_AppCollector())
+
+
+def render() -> tuple[bytes, str]:
+    """The Prometheus text exposition of this worker's metrics, and its content type."""
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+# ─── middleware ────────────────────────────────────────────────
+
+
+class _Profiler:
+    """Samples requests for pyinstrument; at most one profile is taken at a time."""
+
+    def __init__(self, paths: list[str], rate: float, out_dir: str):
+        from pyinstrument import Profiler      # optional; only needed when PROFILE_PATHS is set
+        self._cls = Profiler
+        self.paths = tuple(paths)
+        self.rate = rate
+        self.out_dir = Path(out_dir)
+        self.busy = False
+
+    def start(self, scope):
+        if self.busy or not scope["path"].startswith(self.paths) or random.random() >= self.rate:
+            return None
+        self.busy = True
+        profiler = self._cls(interval=PROFILE_INTERVAL, async_mode="enabled")
+        profiler.start()
+        return profiler
+
+    async def finish(self, profiler, scope, route: str) -> None:
+        profiler.stop()
+        self.busy = False
+        name = f"{time.strftime('%Y%m%dT%H%M%S')}-{scope['method']}-{route.strip('/').replace('/', '_') or 'root'}.html"
+        html = profiler.output_html()
+        path = self.out_dir / name
+
+        def write():
+            self.out_dir.mkdir(parents=True, exist_ok=True)
+            path.write_text(html)
+        await anyio.to_thread.run_sync(write)
+        logger.info("wrote profile %s", path)
+
+
+def _is_stream(message) -> bool:
+    return any(
+        name == b"content-type" and value.startswith(b"text/event-stream")
+        for name, value in message.get("headers", ())
+    )
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording per-route latency and in-flight requests, adding a
+    Server-Timing header to every response, and running the opt-in profiler.
+    Routes are labelled by template (/posts/{post_id}) so label cardinality stays fixed.
+    Event streams (/feed/stream, /ai/summarize/stream) are counted as requests until
+    their headers go out, then as open streams with their own duration histogram.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.profiler = _Profiler(PROFILE_PATHS, PROFILE_SAMPLE_RATE, PROFILE_DIR) if PROFILE_PATHS else None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        timings: dict[str, float] = {}
+        token = _timings.set(timings)
+        profiler = self.profiler.start(scope) if self.profiler else None
+        start = time.perf_counter()
+        status = 500
+        streaming = False
+
+        async def send_with_timing(message):
+            nonlocal status, streaming
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                MutableHeaders(scope=message).append(
+                    "Server-Timing", server_timing(timings, time.perf_counter() - start),
+                )
+                if _is_stream(message):
+                    streaming = True
+                    REQUESTS_IN_FLIGHT.dec()
+                    STREAMS_OPEN.inc()
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            elapsed = time.perf_counter() - start
+            _timings.reset(token)
+            route = getattr(scope.get("route"), "path", "unmatched")
+            if streaming:
+                STREAMS_OPEN.dec()
+                STREAM_DURATION.labels(route).observe(elapsed)
+            else:
+                REQUESTS_IN_FLIGHT.dec()
+                REQUEST_LATENCY.labels(scope["method"], route, str(status)).observe(elapsed)
+            if profiler is not None:
+                await self.profiler.finish(profiler, scope, route)
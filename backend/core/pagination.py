@@ -0,0 +1,111 @@
+import base64
+import json
+import math
+import uuid
+from datetime import datetime
+from fastapi import HTTPException
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE     = 100
+
+
+def encode_cursor(sort_key, row_id: str) -> str:
+    """
+    Encodes a (sort_key, id) keyset position as an opaque, URL-safe cursor.
+    Clients must treat the value as a token and pass it back unchanged.
+    """
+    raw = json.dumps([sort_key, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """
+    Decodes a cursor produced by encode_cursor back into (sort_key, id).
+    Raises ValueError on a malformed or tampered cursor.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_key, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(row_id, str) or not isinstance(sort_key, (str, int, float)):
+        raise ValueError("Invalid cursor")
+    # Cursor values are interpolated into quoted PostgREST filters
+    if any(c in str(v) for v in (sort_key, row_id) for c in '"\\'):
+        raise ValueError("Invalid cursor")
+    return sort_key, row_id
+
+
+def keyset_filter(column: str, sort_key, row_id: str, desc: bool = True) -> str:
+    """
+    Builds the PostgREST or=() filter selecting rows strictly after
+    (sort_key, id) in `column DESC, id DESC` order (or ASC with desc=False):
+
+        column < sort_key OR (column = sort_key AND id < row_id)
+
+    Values are double-quoted so timestamps with ':' / '+' survive PostgREST parsing.
+    """
+    op = "lt" if desc else "gt"
+    return f'{column}.{op}."{sort_key}",and({column}.eq."{sort_key}",id.{op}."{row_id}")'
+
+
+def is_timestamp(sort_key) -> bool:
+    """Sort key of a (created_at, id) cursor: an ISO 8601 timestamp."""
+    if not isinstance(sort_key, str):
+        return False
+    try:
+        datetime.fromisoformat(sort_key)
+    except ValueError:
+        return False
+    return True
+
+
+def is_rank(sort_key) -> bool:
+    """Sort key of a search (rank, id) cursor: a finite number."""
+    return isinstance(sort_key, (int, float)) and not isinstance(sort_key, bool) and math.isfinite(sort_key)
+
+
+def _is_uuid(value: str) -> bool:
+    try:
+        uuid.UUID(value)
+    except ValueError:
+        return False
+    return True
+
+
+def parse_cursor(cursor: str | None, accepts=is_timestamp) -> tuple | None:
+    """
+    Decodes an optional query-string cursor, raising 400 if it is malformed or
+    its sort key is not one `accepts` allows, e.g. a cursor from another endpoint.
+    """
+    if not cursor:
+        return None
+    try:
+        sort_key, row_id = decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not accepts(sort_key) or not _is_uuid(row_id):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return sort_key, row_id
+
+
+def paginate(query, limit: int, after: tuple | None, column: str = "created_at", desc: bool = True):
+    """
+    Applies keyset ordering, the optional after-cursor filter and a limit+1 probe
+    to a PostgREST select builder. Pair with next_page() on the result rows.
+    """
+    if after:
+        query = query.or_(keyset_filter(column, *after, desc=desc))
+    return query.order(column, desc=desc).order("id", desc=desc).limit(limit + 1)
+
+
+def next_page(rows: list, limit: int, column: str = "created_at") -> tuple[list, str | None]:
+    """
+    Splits the limit+1 probe result into (page rows, next cursor).
+    next cursor is None when there are no further rows.
+    """
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    last = page[-1]
+    return page, encode_cursor(last[column], last["id"])
@@ -0,0 +1,42 @@
+from typing import Type
+from fastapi import HTTPException, Response
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+
+def columns(model: Type[BaseModel]) -> list[str]:
+    """The model's field names, in declaration order."""
+    return list(model.model_fields)
+
+
+def parse_fields(fields: str | None, model: Type[BaseModel]) -> list[str]:
+    """
+    Resolves a sparse `?fields=a,b` selection against the fields the endpoint's
+    model exposes. Returns every field when none is given; raises 400 on unknown names.
+    """
+    allowed = columns(model)
+    if not fields:
+        return allowed
+    wanted = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in wanted if f not in allowed]
+    if unknown or not wanted:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}" if unknown else "No fields selected",
+        )
+    return list(dict.fromkeys(wanted))
+
+
+def project(rows: list[dict], fields: list[str]) -> list[dict]:
+    """Keeps only the selected fields of each row (missing columns come back as null)."""
+    return [{f: row.get(f) for f in fields} for row in rows]
+
+
+def json_response(content, headers: dict | None = None) -> Response:
+    """
+    Serializes trusted rows straight to JSON (pydantic-core, in Rust), skipping the
+    per-row model validation FastAPI would otherwise run on the return value.
+    Only for data already shaped by the database; the route's response_model
+    still documents the schema.
+    """
+    return Response(content=to_json(content), media_type="application/json", headers=headers)
@@ -0,0 +1,114 @@
+import logging
+import math
+import time
+from fastapi import Depends, HTTPException, Request
+from redis.exceptions import RedisError
+from core import metrics
+from core.auth_middleware import get_current_user
+from core.config import redis_client, TRUSTED_PROXY_HOPS
+
+logger = logging.getLogger(__name__)
+
+# Token bucket per (budget, caller): hash {tokens, ts}, shared by every worker
+BUCKET_KEY = "ratelimit:{}:{}"
+
+# budget -> (tokens refilled per second, burst). One request costs one token.
+BUDGETS = {
+    "summarize": (5 / 60, 5),      # per IP; a miss costs an Anthropic call
+    "boost":     (2.0, 20),        # per user
+    "invest":    (10 / 60, 5),     # per user
+    "upload":    (6 / 60, 3),      # per user; up to 150 MB through the Storage uplink each
+}
+
+# Load shedding: dependency -> calls in flight in this worker above which new
+# requests that need it are turned away with 503 instead of queueing behind them
+SHED_THRESHOLDS = {
+    "supabase_admin": 80,          # of the 100 pooled connections (core.db)
+    "storage":        16,
+}
+SHED_RETRY_AFTER = 2
+
+# Refills the bucket for the time elapsed since ARGV[3]'s last visit, then takes
+# ARGV[4] tokens if there are enough. Returns {1, 0} or {0, seconds until enough}.
+_TAKE = redis_client.register_script("""
+local rate, burst = tonumber(ARGV[1]), tonumber(ARGV[2])
+local now, cost = tonumber(ARGV[3]), tonumber(ARGV[4])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or burst
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local allowed, wait = 0, (cost - tokens) / rate
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed, wait = 1, 0
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', ARGV[3])
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return {allowed, tostring(wait)}
+""")
+
+
+def client_ip(request: Request) -> str:
+    """
+    The caller's address: the entry TRUSTED_PROXY_HOPS from the right of
+    X-Forwarded-For (earlier entries are client-supplied and can be forged),
+    or the socket peer when the header is absent.
+    """
+    forwarded = [h.strip() for h in request.headers.get("x-forwarded-for", "").split(",") if h.strip()]
+    if TRUSTED_PROXY_HOPS and len(forwarded) >= TRUSTED_PROXY_HOPS:
+        return forwarded[-TRUSTED_PROXY_HOPS]
+    return request.client.host if request.client else "unknown"
+
+
+async def take(budget: str, caller: str) -> float:
+    """
+    Spends one token from the caller's bucket for the budget. Returns 0 when
+    allowed, otherwise the seconds until a token is available.
+    Fails open (allows) when Redis is unavailable.
+    """
+    rate, burst = BUDGETS[budget]
+    try:
+        allowed, wait = await _TAKE(
+            keys=[BUCKET_KEY.format(budget, caller)],
+            args=[rate, burst, repr(time.time()), 1],
+        )
+    except RedisError as e:
+        logger.warning("rate limit check failed for %s: %s", budget, e)
+        return 0.0
+    return 0.0 if allowed else float(wait)
+
+
+def _shed(dependencies: tuple[str, ...]) -> None:
+    for dependency in dependencies:
+        if metrics.in_flight(dependency) >= SHED_THRESHOLDS[dependency]:
+            raise HTTPException(
+                status_code=503,
+                detail=f"Server busy ({dependency}), retry shortly",
+                headers={"Retry-After": str(SHED_RETRY_AFTER)},
+            )
+
+
+async def _admit(budget: str, caller: str, shed_on: tuple[str, ...]) -> None:
+    # Shedding is checked first so overloaded requests don't spend the caller's tokens
+    _shed(shed_on)
+    wait = await take(budget, caller)
+    if wait:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many requests",
+            headers={"Retry-After": str(max(1, math.ceil(wait)))},
+        )
+
+
+def per_user(budget: str, shed_on: tuple[str, ...] = ()):
+    """Route dependency: the authenticated user's budget, plus load shedding on `shed_on`."""
+    async def dependency(user_id: str = Depends(get_current_user)) -> None:
+        await _admit(budget, f"user:{user_id}", shed_on)
+    return dependency
+
+
+def per_ip(budget: str, shed_on: tuple[str, ...] = ()):
+    """Route dependency for public routes: the caller IP's budget, plus load shedding."""
+    async def dependency(request: Request) -> None:
+        await _admit(budget, f"ip:{client_ip(request)}", shed_on)
+    return dependency
@@ -0,0 +1,154 @@
+import asyncio
+import json
+import logging
+from contextlib import contextmanager
+from prometheus_client import Counter, Gauge
+from redis.exceptions import RedisError
+from core.config import redis_client
+
+logger = logging.getLogger(__name__)
+
+# Every worker publishes feed deltas here and fans them out to its own stream clients
+CHANNEL = "feed:events"
+
+QUEUE_SIZE        = 64      # frames buffered per client before it is told to resync
+MAX_CONNECTIONS   = 5000    # stream clients per worker
+KEEPALIVE         = 15      # seconds of silence before a comment frame keeps proxies from timing out
+ACTIVITY_INTERVAL = 0.5     # new posts, boosts and investments are coalesced and published at most this often
+RECONNECT_DELAY   = 1
+RETRY_MS          = 3000    # client reconnect delay, sent in the stream's first frame
+
+CONNECTIONS = Gauge("chipn_realtime_connections", "Feed stream clients connected to this worker.")
+RESYNCS = Counter("chipn_realtime_resyncs_total", "Stream clients told to resync after falling behind or a missed event.")
+
+RETRY_FRAME     = f"retry: {RETRY_MS}\n\n"
+KEEPALIVE_FRAME = ": keepalive\n\n"
+
+
+def _frame(data: str) -> str:
+    return f"data: {data}\n\n"
+
+
+def _encode(event: dict) -> str:
+    return json.dumps(event, separators=(",", ":"), default=str)
+
+
+RESYNC_FRAME = _frame(_encode({"type": "resync"}))
+
+
+class Hub:
+    """
+    This worker's stream clients, each with a bounded queue of SSE frames.
+    A frame is encoded once and shared by every queue. A client that falls
+    QUEUE_SIZE frames behind has its backlog dropped and gets a single resync
+    frame instead, so one slow reader never holds up the others or grows memory.
+    """
+
+    def __init__(self):
+        self._queues: set[asyncio.Queue] = set()
+
+    def __len__(self) -> int:
+        return len(self._queues)
+
+    @contextmanager
+    def connect(self):
+        queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self._queues.add(queue)
+        CONNECTIONS.inc()
+        try:
+            yield queue
+        finally:
+            self._queues.discard(queue)
+            CONNECTIONS.dec()
+
+    def broadcast(self, frame: str) -> None:
+        for queue in self._queues:
+            try:
+                queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC_FRAME)
+                RESYNCS.inc()
+
+
+hub = Hub()
+
+# Activity since the last coalesced event, published by run_publisher: new post
+# cards, post_id -> latest live boost_count, and post_id -> new investments
+_posts: list[dict] = []
+_boost_counts: dict[str, int] = {}
+_investments: dict[str, int] = {}
+_activity_pending = asyncio.Event()
+
+
+async def publish(event: dict) -> None:
+    """
+    Publishes a feed delta to every worker. If Redis is unavailable the event
+    still reaches this worker's own clients; the others resync on reconnect.
+    """
+    data = _encode(event)
+    try:
+        await redis_client.publish(CHANNEL, data)
+    except RedisError as e:
+        logger.warning("realtime publish failed: %s", e)
+        hub.broadcast(_frame(data))
+
+
+def post_created(card: dict) -> None:
+    """Queues a new post's feed card for the next "activity" event, so clients can show it without a fetch."""
+    _posts.append(card)
+    _activity_pending.set()
+
+
+def boost_recorded(post_id: str, boost_count: int) -> None:
+    """
+    Queues a post's live boost count for the next "activity" event.
+    Counts are absolute, so clients keep the highest one they have seen.
+    """
+    _boost_counts[post_id] = max(boost_count, _boost_counts.get(post_id, 0))
+    _activity_pending.set()
+
+
+def investment_recorded(post_id: str) -> None:
+    """Queues an investment for the next "activity" event; amounts are private to the founder."""
+    _investments[post_id] = _investments.get(post_id, 0) + 1
+    _activity_pending.set()
+
+
+async def run_publisher() -> None:
+    """
+    Background loop publishing this worker's new posts, boosts and investments as
+    one coalesced event every ACTIVITY_INTERVAL at most, however many arrive in
+    between. Each stream client then wakes at most once per interval per worker.
+    """
+    global _posts, _boost_counts, _investments
+    while True:
+        await _activity_pending.wait()
+        await asyncio.sleep(ACTIVITY_INTERVAL)
+        _activity_pending.clear()
+        posts, _posts = _posts, []
+        boosts, _boost_counts = _boost_counts, {}
+        investments, _investments = _investments, {}
+        await publish({"type": "activity", "posts": posts, "boosts": boosts, "investments": investments})
+
+
+async def run_subscriber() -> None:
+    """
+    Background loop holding this worker's one subscription to CHANNEL and
+    fanning each message out to the connected clients. After a lost
+    subscription clients are told to resync, as events may have been missed.
+    """
+    while True:
+        pubsub = redis_client.pubsub()
+        try:
+            await pubsub.subscribe(CHANNEL)
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    hub.broadcast(_frame(message["data"]))
+        except RedisError as e:
+            logger.warning("realtime subscription lost: %s", e)
+            hub.broadcast(RESYNC_FRAME)
+        finally:
+            await pubsub.aclose()
+        await asyncio.sleep(RECONNECT_DELAY)
@@ -0,0 +1,99 @@
+import hashlib
+import logging
+from redis.exceptions import RedisError
+from core.config import redis_client
+
+logger = logging.getLogger(__name__)
+
+# Per-user Bloom filters of post ids served in the feed, one Redis bitmap each.
+# A filter takes SEEN_CAPACITY posts, then becomes the previous generation and a
+# fresh one starts; lookups check both. With 2^16 bits and 4 hashes a full filter
+# wrongly skips about 0.5% of unseen posts, so never more than about 1% in total
+# however far a user scrolls, at a fixed 16 KB per user. Posts served more than
+# one to two generations ago may be served again.
+SEEN_KEY       = "seen:{}"
+SEEN_PREV_KEY  = "seen:{}:prev"
+SEEN_COUNT_KEY = "seen:{}:count"   # posts added to the current generation
+SEEN_BITS      = 1 << 16
+SEEN_HASHES    = 4
+SEEN_CAPACITY  = 5_000
+SEEN_TTL       = 14 * 86_400       # refreshed on each write to the current generation; idle users start over
+
+# KEYS = current, previous. ARGV holds SEEN_HASHES bit offsets per post.
+# Returns 1 per post whose bits are all set in either generation.
+_CONTAINS = redis_client.register_script("""
+local k, result = tonumber(ARGV[1]), {}
+for i = 2, #ARGV, k do
+    local hit = 0
+    for _, key in ipairs(KEYS) do
+        hit = 1
+        for j = i, i + k - 1 do
+            if redis.call('GETBIT', key, ARGV[j]) == 0 then hit = 0 break end
+        end
+        if hit == 1 then break end
+    end
+    result[#result + 1] = hit
+end
+return result
+""")
+
+# KEYS = current, previous, count. ARGV = ttl, capacity, hashes, then offsets per post.
+# The previous generation keeps the TTL it had as current, so it expires first.
+_ADD = redis_client.register_script("""
+local ttl, capacity, k = ARGV[1], tonumber(ARGV[2]), tonumber(ARGV[3])
+local count = tonumber(redis.call('GET', KEYS[3]) or '0')
+for i = 4, #ARGV, k do
+    if count >= capacity then
+        if redis.call('EXISTS', KEYS[1]) == 1 then
+            redis.call('RENAME', KEYS[1], KEYS[2])
+        else
+            redis.call('DEL', KEYS[2])
+        end
+        count = 0
+    end
+    for j = i, i + k - 1 do redis.call('SETBIT', KEYS[1], ARGV[j], 1) end
+    count = count + 1
+end
+redis.call('SET', KEYS[3], count, 'EX', ttl)
+redis.call('EXPIRE', KEYS[1], ttl)
+""")
+
+
+def _offsets(post_id: str) -> list[int]:
+    # Double hashing: k positions from two halves of one digest
+    digest = hashlib.blake2b(post_id.encode(), digest_size=8).digest()
+    h1, h2 = int.from_bytes(digest[:4], "big"), int.from_bytes(digest[4:], "big") | 1
+    return [(h1 + i * h2) % SEEN_BITS for i in range(SEEN_HASHES)]
+
+
+async def contains(user_id: str, post_ids: list[str]) -> list[bool]:
+    """
+    Whether the user has probably been served each post; false positives are
+    possible, false negatives are not. Reports nothing as seen if Redis is unavailable.
+    """
+    if not post_ids:
+        return []
+    offsets = [o for pid in post_ids for o in _offsets(pid)]
+    try:
+        hits = await _CONTAINS(
+            keys=[SEEN_KEY.format(user_id), SEEN_PREV_KEY.format(user_id)],
+            args=[SEEN_HASHES, *offsets],
+        )
+    except RedisError as e:
+        logger.warning("seen-set read failed: %s", e)
+        return [False] * len(post_ids)
+    return [bool(hit) for hit in hits]
+
+
+async def add(user_id: str, post_ids: list[str]) -> None:
+    """Records posts as served to the user."""
+    if not post_ids:
+        return
+    offsets = [o for pid in post_ids for o in _offsets(pid)]
+    try:
+        await _ADD(
+            keys=[SEEN_KEY.format(user_id), SEEN_PREV_KEY.format(user_id), SEEN_COUNT_KEY.format(user_id)],
+            args=[SEEN_TTL, SEEN_CAPACITY, SEEN_HASHES, *offsets],
+        )
+    except RedisError as e:
+        logger.warning("seen-set write failed: %s", e)
@@ -0,0 +1,148 @@
+import asyncio
+import hashlib
+import logging
+import time
+from pathlib import Path
+from redis.exceptions import RedisError
+from starlette.concurrency import run_in_threadpool
+from core.config import redis_client, VECTOR_INDEX_DIR
+from core.embeddings import get_embedder, post_text
+from core.vector_index import VectorIndex
+from repositories import posts as posts_repo
+
+logger = logging.getLogger(__name__)
+
+# post id -> time of last create/edit/delete; every worker's sync loop replays it,
+# so edits made on one worker reach the in-process index of all the others
+DIRTY_KEY       = "search:dirty"
+DIRTY_RETENTION = 86_400
+SYNC_INTERVAL   = 10
+BUILD_PAGE_SIZE = 500
+
+_index: VectorIndex | None = None
+# Background rewrite of the base matrix, at most one at a time; held so it is not collected
+_compaction: asyncio.Task | None = None
+
+
+def _content_hash(row: dict) -> str:
+    return hashlib.sha1(post_text(row).encode()).hexdigest()
+
+
+def get_index() -> VectorIndex:
+    global _index
+    if _index is None:
+        _index = VectorIndex(Path(VECTOR_INDEX_DIR), get_embedder().dim)
+        _index.load()
+    return _index
+
+
+async def _index_rows(rows: list[dict]) -> None:
+    """Embeds rows whose text changed since they were last indexed."""
+    index = get_index()
+    stale = [r for r in rows if index.hashes.get(r["id"]) != _content_hash(r)]
+    if not stale:
+        return
+    texts = [post_text(r) for r in stale]
+    # Embedding is CPU-bound; the index itself is only touched from the event loop
+    vectors = await run_in_threadpool(get_embedder().embed, texts)
+    index.upsert([r["id"] for r in stale], vectors, [_content_hash(r) for r in stale])
+    if index.needs_compaction:
+        _start_compaction(index)
+
+
+async def _compact(index: VectorIndex) -> None:
+    # Rewriting the base file is disk-bound; the loop keeps serving meanwhile
+    snapshot = index.snapshot()
+    index.install(await run_in_threadpool(index.write, snapshot), snapshot)
+
+
+def _compaction_done(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception():
+        logger.warning("semantic index compaction failed: %s", task.exception())
+
+
+def _start_compaction(index: VectorIndex) -> None:
+    """Starts a compaction in the background unless one is running; callers never wait for it."""
+    global _compaction
+    if _compaction is None or _compaction.done():
+        _compaction = asyncio.create_task(_compact(index))
+        _compaction.add_done_callback(_compaction_done)
+
+
+async def _mark_dirty(post_id: str) -> None:
+    try:
+        await redis_client.zadd(DIRTY_KEY, {post_id: time.time()})
+    except RedisError as e:
+        logger.warning("semantic index dirty mark failed for %s: %s", post_id, e)
+
+
+async def index_post(row: dict) -> None:
+    """Indexes a created or edited post now and flags it for the other workers."""
+    try:
+        await _index_rows([row])
+    except Exception as e:
+        logger.warning("semantic indexing failed for %s: %s", row.get("id"), e)
+    await _mark_dirty(row["id"])
+
+
+async def remove_post(post_id: str) -> None:
+    get_index().remove(post_id)
+    await _mark_dirty(post_id)
+
+
+async def search(query: str, k: int, after: tuple | None = None) -> list[tuple[str, float]]:
+    """Nearest posts to the query text as (id, cosine score), best first."""
+    vector = get_embedder().embed([query])[0]
+    return get_index().search(vector, k, after)
+
+
+async def sync_once() -> None:
+    """
+    Brings the index up to date: posts created since the stored watermark are
+    embedded in (created_at, id) order, then posts flagged dirty since the last
+    sync are re-read (and dropped if deleted). The first run builds from scratch.
+    """
+    index = get_index()
+    if "dirty_since" not in index.meta:
+        index.meta["dirty_since"] = time.time()
+
+    after = tuple(index.meta["watermark"]) if index.meta.get("watermark") else None
+    while True:
+        rows = await posts_repo.list_oldest_first(BUILD_PAGE_SIZE, after)
+        page = rows[:BUILD_PAGE_SIZE]
+        if page:
+            await _index_rows(page)
+            after = (page[-1]["created_at"], page[-1]["id"])
+            index.meta["watermark"] = list(after)
+        if len(rows) <= BUILD_PAGE_SIZE:
+            break
+
+    now = time.time()
+    dirty = await redis_client.zrangebyscore(DIRTY_KEY, f"({index.meta['dirty_since']}", now)
+    if dirty:
+        found = await posts_repo.get_many(dirty)
+        await _index_rows(found)
+        for pid in set(dirty) - {r["id"] for r in found}:
+            index.remove(pid)
+    index.meta["dirty_since"] = now
+    await redis_client.zremrangebyscore(DIRTY_KEY, "-inf", now - DIRTY_RETENTION)
+
+
+async def run_sync() -> None:
+    """Background loop keeping this worker's index current."""
+    while True:
+        try:
+            await sync_once()
+        except Exception as e:
+            logger.warning("semantic index sync failed: %s", e)
+        await asyncio.sleep(SYNC_INTERVAL)
+
+
+async def save() -> None:
+    """
+    Persists pending changes so the next start only replays newer posts.
+    A background compaction still running is let finish first.
+    """
+    if _compaction is not None:
+        await asyncio.gather(_compaction, return_exceptions=True)
+    get_index().compact()
@@ -0,0 +1,60 @@
+import asyncio
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+_registry: dict[str, "SingleFlight"] = {}
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into one in-flight operation:
+    the first caller starts it, later callers await the same result (or exception).
+    Results are shared between callers and must be treated as read-only.
+
+    The operation runs as its own task, so a caller that is cancelled (e.g. the
+    client disconnected) does not cancel it for the others.
+
+    Named instances are registered for stats(): `calls` counts every do(),
+    `executed` the upstream operations actually started, `coalesced` the calls
+    that joined one already in flight.
+    """
+
+    def __init__(self, name: str | None = None):
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.executed = 0
+        self.coalesced = 0
+        if name:
+            _registry[name] = self
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        self.calls += 1
+        task = self._inflight.get(key)
+        if task is None:
+            self.executed += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _done(self, key: Hashable, task: asyncio.Task) -> None:
+        self._inflight.pop(key, None)
+        # Mark the exception retrieved even if every waiter went away
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight),
+        }
+
+
+def stats() -> dict[str, dict]:
+    """Counters of every named SingleFlight in this worker."""
+    return {name: flight.stats() for name, flight in _registry.items()}
@@ -0,0 +1,74 @@
+import asyncio
+import importlib
+import logging
+import time
+from starlette.concurrency import run_in_threadpool
+from core import feed_cache, hot_rank
+from core.auth_middleware import jwks
+from core.config import get_anthropic_client, redis_client
+from core.db import db
+from repositories import posts as posts_repo
+
+logger = logging.getLogger(__name__)
+
+WARM_STEP_TIMEOUT = 10      # seconds each warm-up step may take before the worker reports ready without it
+
+# Set when warm-up has finished, whatever its outcome; /health/ready reports 503 until then
+ready = asyncio.Event()
+# Warm-up step -> "ok" or why it failed, reported by /health/ready
+checks: dict[str, str] = {}
+ready_at: float | None = None       # perf_counter() when the worker became ready
+
+
+async def _import_storage() -> None:
+    # Imported off the event loop so requests are served meanwhile
+    await run_in_threadpool(importlib.import_module, "storage3")
+    db.storage      # builds the client
+
+
+async def _prefetch_jwks() -> None:
+    # Waits for the refresher's first fetch, or makes it, so no request pays for it
+    await jwks.get(None)
+
+
+async def _warm_feed() -> None:
+    if await feed_cache.begin_refill():
+        await feed_cache.refill(await posts_repo.list_page(feed_cache.TIMELINE_SIZE - 1, None))
+    if await hot_rank.begin_rebuild():
+        await hot_rank.rebuild()
+
+
+_STEPS = {
+    "storage": _import_storage,
+    "jwks": _prefetch_jwks,
+    "redis": redis_client.ping,
+    "feed": _warm_feed,
+}
+
+
+async def _run(name: str, step) -> None:
+    try:
+        async with asyncio.timeout(WARM_STEP_TIMEOUT):
+            await step()
+        checks[name] = "ok"
+    except Exception as e:
+        logger.warning("warm-up step %s failed: %s", name, e)
+        checks[name] = f"failed: {e}" if str(e) else f"failed: {type(e).__name__}"
+
+
+async def warm_up() -> None:
+    """
+    Background startup, run by the lifespan once the app is serving: loads the
+    storage SDK, fetches the JWKS, opens the first Redis connection and fills the
+    feed caches, concurrently. The worker then reports ready, even if a step
+    failed (those degrade as at any other time). The Anthropic SDK is loaded last,
+    off the event loop and outside readiness, as only summaries need it.
+    """
+    global ready_at
+    await asyncio.gather(*(_run(name, step) for name, step in _STEPS.items()))
+    ready_at = time.perf_counter()
+    ready.set()
+    try:
+        await run_in_threadpool(get_anthropic_client)
+    except Exception as e:
+        logger.warning("Anthropic client load failed: %s", e)
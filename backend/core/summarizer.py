@@ -0,0 +1,146 @@
+import asyncio
+import hashlib
+import logging
+from collections.abc import AsyncIterator
+from redis.exceptions import RedisError
+from core.config import ANTHROPIC_API_KEY, get_anthropic_client, redis_client
+from core.metrics import span
+from core.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_MODEL      = "claude-3-haiku-20240307"
+SUMMARY_MAX_TOKENS = 256
+SUMMARY_PROMPT     = "Briefly summarize this crowdfunding idea/product for investors. Keep it exciting but factual: {content}"
+
+SUMMARY_KEY        = "ai:summary:{}"
+SUMMARY_CACHE_TTL  = 7 * 86_400
+MAX_CONCURRENT     = 4      # Anthropic calls in flight per worker
+MAX_QUEUED         = 32     # callers allowed to wait for a slot before we shed load
+SUMMARY_TIMEOUT    = 20     # seconds, queueing included
+
+
+class SummarizerBusy(Exception):
+    """Raised when the Anthropic queue is full; callers should retry later."""
+
+
+_slots   = asyncio.Semaphore(MAX_CONCURRENT)
+_waiting = 0
+_flights = SingleFlight("summaries")
+
+
+def content_key(content: str) -> str:
+    """Cache key for a summary: hash of model, prompt and whitespace-normalised content."""
+    normalised = " ".join(content.split())
+    digest = hashlib.sha256(f"{SUMMARY_MODEL}\0{SUMMARY_PROMPT}\0{normalised}".encode()).hexdigest()
+    return SUMMARY_KEY.format(digest)
+
+
+async def get_cached(key: str) -> str | None:
+    try:
+        return await redis_client.get(key)
+    except RedisError as e:
+        logger.warning("summary cache read failed: %s", e)
+        return None
+
+
+async def store(key: str, summary: str) -> None:
+    try:
+        await redis_client.set(key, summary, ex=SUMMARY_CACHE_TTL)
+    except RedisError as e:
+        logger.warning("summary cache write failed: %s", e)
+
+
+async def _acquire_slot() -> None:
+    global _waiting
+    if _slots.locked() and _waiting >= MAX_QUEUED:
+        raise SummarizerBusy("Summarizer is at capacity")
+    _waiting += 1
+    try:
+        await _slots.acquire()
+    finally:
+        _waiting -= 1
+
+
+def _messages(content: str) -> list[dict]:
+    return [{"role": "user", "content": SUMMARY_PROMPT.format(content=content)}]
+
+
+async def _call_model(content: str) -> str:
+    await _acquire_slot()
+    try:
+        with span("anthropic", "messages.create"):
+            response = await get_anthropic_client().messages.create(
+                max_tokens=SUMMARY_MAX_TOKENS,
+                model=SUMMARY_MODEL,
+                messages=_messages(content),
+            )
+        return response.content[0].text
+    finally:
+        _slots.release()
+
+
+async def _generate(key: str, content: str) -> str:
+    async with asyncio.timeout(SUMMARY_TIMEOUT):
+        summary = await _call_model(content)
+    await store(key, summary)
+    return summary
+
+
+async def summarize(content: str) -> str:
+    """
+    Returns an investor summary for the content.
+    Served from the Redis cache when the same content was summarised before; identical
+    concurrent requests share one Anthropic call. Raises SummarizerBusy when the queue
+    is full and TimeoutError when the call does not finish within SUMMARY_TIMEOUT.
+    """
+    # Local dev without an Anthropic key
+    if ANTHROPIC_API_KEY == "dummy_key":
+        return f"AI Summary: {content[:100]}..."
+    key = content_key(content)
+    cached = await get_cached(key)
+    if cached is not None:
+        return cached
+    return await _flights.do(key, lambda: _generate(key, content))
+
+
+async def stream(content: str) -> AsyncIterator[str]:
+    """
+    Yields the summary for the content in pieces as Anthropic generates it; a cached
+    summary comes as one piece. Admission and the SUMMARY_TIMEOUT budget are as for
+    summarize(), raising at the first piece or between pieces. The finished text is
+    cached. Closing the iterator early aborts the Anthropic call and caches nothing,
+    so a reader that goes away stops costing tokens.
+    """
+    if ANTHROPIC_API_KEY == "dummy_key":
+        yield f"AI Summary: {content[:100]}..."
+        return
+    key = content_key(content)
+    cached = await get_cached(key)
+    if cached is not None:
+        yield cached
+        return
+    deadline = asyncio.get_running_loop().time() + SUMMARY_TIMEOUT
+    async with asyncio.timeout_at(deadline):
+        await _acquire_slot()
+    parts = []
+    try:
+        with span("anthropic", "messages.stream"):
+            async with get_anthropic_client().messages.stream(
+                max_tokens=SUMMARY_MAX_TOKENS,
+                model=SUMMARY_MODEL,
+                messages=_messages(content),
+            ) as response:
+                deltas = aiter(response.text_stream)
+                while True:
+                    # The deadline covers waiting for Anthropic, not for the reader
+                    try:
+                        async with asyncio.timeout_at(deadline):
+                            text = await anext(deltas)
+                    except StopAsyncIteration:
+                        break
+                    parts.append(text)
+                    yield text
+    finally:
+        _slots.release()
+    await store(key, "".join(parts))
@@ -0,0 +1,214 @@
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from redis.exceptions import RedisError
+from core.config import redis_client
+from core import feed_cache, semantic_search, summarizer
+from repositories import posts as posts_repo
+
+logger = logging.getLogger(__name__)
+
+# Jobs are JSON {"id": post_id, "attempt": n}. Ready jobs wait in a list; claimed
+# jobs sit in INFLIGHT scored by their visibility deadline, so a worker that dies
+# mid-batch has its jobs picked up again; failed jobs wait in RETRY until due.
+# A job out of attempts whose post could not be marked failed carries
+# "exhausted": true, and only that status write is retried.
+QUEUE_KEY    = "ai:summary:queue"
+INFLIGHT_KEY = "ai:summary:inflight"
+RETRY_KEY    = "ai:summary:retry"
+SWEEP_LOCK   = "ai:summary:sweep"
+
+BATCH_SIZE         = 8      # jobs claimed, summarized and written back together
+POLL_INTERVAL      = 1      # seconds to sleep when the queue is empty
+VISIBILITY_TIMEOUT = 120    # seconds before an unacknowledged job is re-queued
+MAX_ATTEMPTS       = 5
+BACKOFF_BASE       = 2      # seconds; doubles per attempt
+BACKOFF_MAX        = 300
+SWEEP_INTERVAL     = 300    # seconds between sweeps for pending posts with no job (one worker sweeps)
+SWEEP_BATCH        = 200
+
+PENDING = "pending"
+READY   = "ready"
+FAILED  = "failed"
+
+# Requeues due retries and expired claims, then claims up to ARGV[2] jobs
+_CLAIM = redis_client.register_script("""
+local now = tonumber(ARGV[1])
+for _, key in ipairs({KEYS[2], KEYS[3]}) do
+    local due = redis.call('ZRANGEBYSCORE', key, '-inf', now)
+    for _, job in ipairs(due) do
+        redis.call('ZREM', key, job)
+        redis.call('LPUSH', KEYS[1], job)
+    end
+end
+local jobs = redis.call('RPOP', KEYS[1], ARGV[2])
+if not jobs then return {} end
+for _, job in ipairs(jobs) do
+    redis.call('ZADD', KEYS[3], now + tonumber(ARGV[3]), job)
+end
+return jobs
+""")
+
+_wake = asyncio.Event()
+
+
+def _content(row: dict) -> str:
+    return f"{row['title']} — {row['description']}"
+
+
+async def enqueue(post_id: str) -> None:
+    """Queues a summary for a freshly created post."""
+    try:
+        await redis_client.lpush(QUEUE_KEY, json.dumps({"id": post_id, "attempt": 0}))
+        _wake.set()
+    except RedisError as e:
+        logger.warning("summary enqueue failed for %s: %s", post_id, e)
+
+
+async def _claim() -> list[dict]:
+    raw = await _CLAIM(
+        keys=[QUEUE_KEY, RETRY_KEY, INFLIGHT_KEY],
+        args=[time.time(), BATCH_SIZE, VISIBILITY_TIMEOUT],
+    )
+    return [{**json.loads(job), "raw": job} for job in raw]
+
+
+async def _ack(jobs: list[dict]) -> None:
+    if jobs:
+        await redis_client.zrem(INFLIGHT_KEY, *[job["raw"] for job in jobs])
+
+
+async def _give_up(job: dict) -> bool:
+    """Marks the job's post failed; returns False if that could not be recorded."""
+    logger.warning("giving up on summary for %s after %d attempts", job["id"], MAX_ATTEMPTS)
+    try:
+        with_status = await posts_repo.update(job["id"], {"ai_summary_status": FAILED})
+    except Exception as e:
+        logger.warning("could not mark summary for %s failed: %s", job["id"], e)
+        return False
+    if with_status:
+        await feed_cache.update_post(with_status)
+    return True
+
+
+def _exhausted(job: dict) -> bool:
+    return job.get("exhausted", False) or job["attempt"] + 1 >= MAX_ATTEMPTS
+
+
+async def _retry(jobs: list[dict]) -> None:
+    """
+    Schedules failed jobs with exponential backoff; gives up after MAX_ATTEMPTS.
+    An exhausted job whose post cannot be marked failed yet is rescheduled as
+    "exhausted", so the status write is retried without summarizing again.
+    """
+    if not jobs:
+        return
+    retry = [job for job in jobs if not _exhausted(job)]
+    unmarked = [job for job in jobs if _exhausted(job) and not await _give_up(job)]
+    now = time.time()
+    pipe = redis_client.pipeline(transaction=True)
+    pipe.zrem(INFLIGHT_KEY, *[job["raw"] for job in jobs])
+    for job in retry:
+        delay = min(BACKOFF_BASE * 2 ** job["attempt"], BACKOFF_MAX)
+        pipe.zadd(RETRY_KEY, {json.dumps({"id": job["id"], "attempt": job["attempt"] + 1}): now + delay})
+    for job in unmarked:
+        delay = min(BACKOFF_BASE * 2 ** job["attempt"], BACKOFF_MAX)
+        pipe.zadd(RETRY_KEY, {json.dumps({"id": job["id"], "attempt": job["attempt"], "exhausted": True}): now + delay})
+    await pipe.execute()
+
+
+async def process_batch() -> int:
+    """
+    Claims up to BATCH_SIZE jobs, loads their posts in one query, summarizes them
+    concurrently (through the shared summarizer cache and concurrency limit) and
+    writes every summary back in one RPC. Returns the number of jobs claimed.
+    """
+    jobs = await _claim()
+    if not jobs:
+        return 0
+    rows = {row["id"]: row for row in await posts_repo.get_many(list({job["id"] for job in jobs}))}
+    # Deleted posts, or posts that got a summary some other way, need no work
+    done = [job for job in jobs if rows.get(job["id"], {}).get("ai_summary_status") != PENDING]
+    # Jobs that already gave up only need their post marked failed
+    exhausted = [job for job in jobs if job not in done and job.get("exhausted")]
+    todo = [job for job in jobs if job not in done and job not in exhausted]
+
+    results = await asyncio.gather(
+        *[summarizer.summarize(_content(rows[job["id"]])) for job in todo],
+        return_exceptions=True,
+    )
+    summaries, failed = {}, list(exhausted)
+    for job, result in zip(todo, results):
+        if isinstance(result, BaseException):
+            logger.warning("summary for %s failed (attempt %d): %r", job["id"], job["attempt"] + 1, result)
+            failed.append(job)
+        else:
+            summaries[job["id"]] = result
+            done.append(job)
+
+    if summaries:
+        try:
+            updated = await posts_repo.set_summaries(summaries)
+        except Exception as e:
+            logger.warning("summary write-back failed: %s", e)
+            failed += [job for job in done if job["id"] in summaries]
+            done = [job for job in done if job["id"] not in summaries]
+            updated = []
+        for row in updated:
+            await feed_cache.update_post(row)
+            await semantic_search.index_post(row)
+
+    await _ack(done)
+    await _retry(failed)
+    return len(jobs)
+
+
+async def _queued_ids() -> set[str]:
+    # One MULTI, so a job moving between the three while they are read is not missed
+    pipe = redis_client.pipeline(transaction=True)
+    pipe.lrange(QUEUE_KEY, 0, -1)
+    pipe.zrange(RETRY_KEY, 0, -1)
+    pipe.zrange(INFLIGHT_KEY, 0, -1)
+    return {json.loads(job)["id"] for jobs in await pipe.execute() for job in jobs}
+
+
+async def sweep() -> int:
+    """
+    Re-queues posts still pending a summary with no job anywhere in the queue:
+    their enqueue failed, or the job was lost with Redis. Only posts older than
+    VISIBILITY_TIMEOUT are considered, so jobs being enqueued are left alone.
+    Returns the number of posts re-queued.
+    """
+    if not await redis_client.set(SWEEP_LOCK, 1, nx=True, ex=SWEEP_INTERVAL):
+        return 0  # another worker swept recently
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=VISIBILITY_TIMEOUT)
+    pending = await posts_repo.list_pending_summaries(cutoff.isoformat(), SWEEP_BATCH)
+    if not pending:
+        return 0
+    queued = await _queued_ids()
+    lost = [post_id for post_id in pending if post_id not in queued]
+    if lost:
+        logger.warning("re-queueing %d pending summaries with no job", len(lost))
+        await redis_client.lpush(QUEUE_KEY, *[json.dumps({"id": post_id, "attempt": 0}) for post_id in lost])
+    return len(lost)
+
+
+async def run_worker() -> None:
+    """Background loop draining the summary queue, batch by batch, and sweeping for lost jobs."""
+    next_sweep = time.monotonic()
+    while True:
+        try:
+            if time.monotonic() >= next_sweep:
+                next_sweep = time.monotonic() + SWEEP_INTERVAL
+                await sweep()
+            if await process_batch():
+                continue
+        except Exception as e:
+            logger.warning("summary worker failed: %s", e)
+        try:
+            await asyncio.wait_for(_wake.wait(), POLL_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+        _wake.clear()
@@ -0,0 +1,107 @@
+from collections import deque
+from typing import AsyncIterator
+from fastapi import HTTPException, Request
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+# Room for multipart boundaries and part headers on top of the file itself
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class MultipartFileStream:
+    """
+    Streams one file field out of a multipart/form-data request body as it arrives,
+    instead of spooling the whole upload first like UploadFile does.
+
+        stream = MultipartFileStream(request, "file")
+        await stream.start()          # parses up to the file part's headers
+        stream.filename, stream.content_type
+        async for chunk in stream:    # file bytes, chunk by chunk
+            ...
+    """
+
+    def __init__(self, request: Request, field: str = "file"):
+        content_type, params = parse_options_header(request.headers.get("content-type", ""))
+        if content_type != b"multipart/form-data" or b"boundary" not in params:
+            raise HTTPException(status_code=400, detail="Expected a multipart/form-data upload")
+        self.field        = field
+        self.filename: str | None = None
+        self.content_type: str | None = None
+        self._source  = request.stream()
+        self._events  = deque()
+        self._eof     = False
+        self._header_name  = b""
+        self._header_value = b""
+        self._headers: dict[bytes, bytes] = {}
+        self._parser = MultipartParser(params[b"boundary"], {
+            "on_part_begin":       self._on_part_begin,
+            "on_part_data":        self._on_part_data,
+            "on_part_end":         self._on_part_end,
+            "on_header_field":     self._on_header_field,
+            "on_header_value":     self._on_header_value,
+            "on_header_end":       self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+        })
+
+    # Parser callbacks only queue events; the async side consumes them
+    def _on_part_begin(self) -> None:
+        self._headers = {}
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_name += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        self._headers[self._header_name.lower()] = self._header_value
+        self._header_name = self._header_value = b""
+
+    def _on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        self._events.append(("part", options, self._headers.get(b"content-type")))
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        self._events.append(("data", data[start:end]))
+
+    def _on_part_end(self) -> None:
+        self._events.append(("end",))
+
+    async def _next_event(self) -> tuple | None:
+        while not self._events:
+            if self._eof:
+                return None
+            try:
+                chunk = await self._source.__anext__()
+                if chunk:
+                    self._parser.write(chunk)
+            except StopAsyncIteration:
+                self._eof = True
+                self._parser.finalize()
+        return self._events.popleft()
+
+    async def start(self) -> None:
+        """Advances to the requested file field; raises 422 if the body has none."""
+        while (event := await self._next_event()) is not None:
+            if event[0] != "part":
+                continue
+            options, content_type = event[1], event[2]
+            if options.get(b"name", b"").decode("latin-1") == self.field and b"filename" in options:
+                self.filename     = options[b"filename"].decode("utf-8", "replace")
+                self.content_type = content_type.decode("latin-1") if content_type else None
+                return
+        raise HTTPException(status_code=422, detail=f"Missing file field '{self.field}'")
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        while (event := await self._next_event()) is not None:
+            if event[0] == "data":
+                yield event[1]
+            elif event[0] == "end":
+                return
+        raise HTTPException(status_code=400, detail="Upload ended before the file was complete")
+
+
+def reject_oversized(request: Request, max_bytes: int, detail: str) -> None:
+    """Fails fast with 413 when the declared body size is over the cap, before reading it."""
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > max_bytes + MULTIPART_OVERHEAD:
+        raise HTTPException(status_code=413, detail=detail)
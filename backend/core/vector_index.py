@@ -0,0 +1,205 @@
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+import numpy as np
+
+# Delta rows held in memory before they are merged into the on-disk base matrix;
+# a larger base waits for a proportionally larger delta, so building an index of
+# n posts rewrites O(n) rows in total rather than O(n^2)
+COMPACT_THRESHOLD = 1024
+COMPACT_RATIO     = 0.25
+# Versions no longer current are deleted once this old; a worker may still be
+# publishing a newer one or loading the previous one
+PRUNE_AGE = 600
+
+CURRENT = "CURRENT"     # names the current version directory
+
+
+class VectorIndex:
+    """
+    In-process, exact k-NN index over L2-normalised float32 vectors (cosine = dot).
+
+    The bulk of the vectors live in `vectors.npy`, memory-mapped read-only so that
+    workers share pages through the OS cache and start without loading it. Inserts
+    and updates go to a small in-memory delta; replaced or deleted base rows are
+    masked out. Compaction folds the delta into a new version directory (vectors
+    and meta together) and publishes it by atomically replacing the CURRENT
+    pointer, so readers and workers sharing the directory never see a mismatched
+    pair. Each id also keeps a content hash so unchanged posts are not re-embedded.
+    """
+
+    def __init__(self, path: Path, dim: int):
+        self.path = Path(path)
+        self.dim  = dim
+        self._assign({"ids": [], "hashes": []}, np.zeros((0, dim), dtype=np.float32))
+        self.meta: dict = {}
+
+    # ─── persistence ─────────────────────────────────────────────
+
+    def _read(self, version: str) -> tuple[dict, np.ndarray]:
+        """Meta and mapped vectors of a version; ValueError if they do not belong together."""
+        meta = json.loads((self.path / version / "meta.json").read_text())
+        base = np.load(self.path / version / "vectors.npy", mmap_mode="r")
+        rows = len(meta["ids"])
+        if meta.get("dim") != self.dim or base.shape != (rows, self.dim) or len(meta["hashes"]) != rows:
+            raise ValueError(f"vector index version {version} is inconsistent")
+        return meta, base
+
+    def _assign(self, meta: dict, base: np.ndarray) -> None:
+        self._base     = base
+        self._base_ids = meta["ids"]
+        self._base_ids_arr = np.asarray(self._base_ids, dtype=str)
+        self._base_pos = {pid: i for i, pid in enumerate(self._base_ids)}
+        self._alive    = np.ones(len(self._base_ids), dtype=bool)
+        self._delta: dict[str, np.ndarray] = {}
+        self._delta_matrix: tuple[np.ndarray, np.ndarray] | None = None
+        self.hashes    = dict(zip(self._base_ids, meta["hashes"]))
+
+    def load(self) -> bool:
+        """
+        Maps the current version from disk. Returns False, leaving the index empty
+        to be rebuilt, if there is none, the dim changed or its files do not match.
+        """
+        try:
+            meta, base = self._read((self.path / CURRENT).read_text().strip())
+        except (OSError, ValueError, KeyError):
+            return False
+        self._assign(meta, base)
+        self.meta = meta.get("extra", {})
+        return True
+
+    @property
+    def needs_compaction(self) -> bool:
+        return len(self._delta) >= max(COMPACT_THRESHOLD, COMPACT_RATIO * len(self._base_ids))
+
+    def snapshot(self) -> dict:
+        """The live contents as of now, for write(); cheap, so it is taken on the event loop."""
+        return {
+            "base": self._base,
+            "alive": self._alive.copy(),
+            "base_ids": self._base_ids,
+            "delta": dict(self._delta),
+            "hashes": dict(self.hashes),
+            "extra": json.loads(json.dumps(self.meta)),
+        }
+
+    def write(self, snapshot: dict) -> tuple[dict, np.ndarray]:
+        """
+        Writes a snapshot as a new version, makes it current and returns it mapped.
+        Touches nothing but the snapshot and the disk, so it can run in a thread.
+        """
+        live_ids = [pid for pid, alive in zip(snapshot["base_ids"], snapshot["alive"]) if alive]
+        delta = snapshot["delta"]
+        ids = live_ids + list(delta)
+        vectors = np.empty((len(ids), self.dim), dtype=np.float32)
+        if live_ids:
+            vectors[:len(live_ids)] = snapshot["base"][snapshot["alive"]]
+        for i, pid in enumerate(delta, start=len(live_ids)):
+            vectors[i] = delta[pid]
+
+        version = f"v{time.time_ns()}-{os.getpid()}"
+        staging = self.path / f".{version}.tmp"
+        staging.mkdir(parents=True)
+        np.save(staging / "vectors.npy", vectors)
+        (staging / "meta.json").write_text(json.dumps({
+            "dim": self.dim,
+            "ids": ids,
+            "hashes": [snapshot["hashes"][pid] for pid in ids],
+            "extra": snapshot["extra"],
+        }))
+        os.replace(staging, self.path / version)
+        pointer = self.path / f".{CURRENT}.{os.getpid()}.tmp"
+        pointer.write_text(version)
+        os.replace(pointer, self.path / CURRENT)
+        self._prune(version)
+        return self._read(version)
+
+    def _prune(self, current: str) -> None:
+        cutoff = time.time() - PRUNE_AGE
+        for entry in self.path.iterdir():
+            if entry.name in (current, CURRENT) or not entry.is_dir():
+                continue
+            try:
+                if entry.stat().st_mtime < cutoff:
+                    shutil.rmtree(entry)
+            except OSError:
+                pass
+
+    def install(self, written: tuple[dict, np.ndarray], snapshot: dict) -> None:
+        """
+        Switches to the version write() returned, keeping every change made since
+        the snapshot: upserts stay in the delta and removals stay masked.
+        """
+        delta, hashes = self._delta, self.hashes
+        self._assign(*written)
+        for pid in list(self.hashes):
+            if pid not in hashes:
+                self.remove(pid)
+        for pid, vector in delta.items():
+            if snapshot["delta"].get(pid) is not vector:
+                self.upsert([pid], [vector], [hashes[pid]])
+
+    def compact(self) -> None:
+        """Merges live base rows and the delta into a fresh version, blocking until done."""
+        snapshot = self.snapshot()
+        self.install(self.write(snapshot), snapshot)
+
+    # ─── mutation ────────────────────────────────────────────────
+
+    def upsert(self, ids: list[str], vectors: np.ndarray, hashes: list[str]) -> None:
+        for pid, vector, content_hash in zip(ids, vectors, hashes):
+            pos = self._base_pos.get(pid)
+            if pos is not None:
+                self._alive[pos] = False
+            self._delta[pid] = np.asarray(vector, dtype=np.float32)
+            self.hashes[pid] = content_hash
+        self._delta_matrix = None
+
+    def remove(self, pid: str) -> None:
+        pos = self._base_pos.get(pid)
+        if pos is not None:
+            self._alive[pos] = False
+        if self._delta.pop(pid, None) is not None:
+            self._delta_matrix = None
+        self.hashes.pop(pid, None)
+
+    def __len__(self) -> int:
+        return int(self._alive.sum()) + len(self._delta)
+
+    # ─── query ───────────────────────────────────────────────────
+
+    def search(self, query: np.ndarray, k: int, after: tuple | None = None) -> list[tuple[str, float]]:
+        """
+        Top-k (id, score) by cosine similarity, best first, ties broken by id descending.
+        `after` = (score, id) resumes strictly below a previous page's last hit.
+        """
+        ids = self._base_ids + list(self._delta)
+        if not ids:
+            return []
+        scores = np.empty(len(ids), dtype=np.float32)
+        n_base = len(self._base_ids)
+        if n_base:
+            scores[:n_base] = self._base @ query
+            scores[:n_base][~self._alive] = -np.inf
+        if self._delta:
+            if self._delta_matrix is None:
+                self._delta_matrix = (np.stack(list(self._delta.values())), np.asarray(list(self._delta), dtype=str))
+            scores[n_base:] = self._delta_matrix[0] @ query
+
+        if after is not None:
+            after_score, after_id = np.float32(after[0]), after[1]
+            delta_ids = self._delta_matrix[1] if self._delta else np.zeros(0, dtype=str)
+            ids_arr = np.concatenate([self._base_ids_arr, delta_ids])
+            scores[(scores > after_score) | ((scores == after_score) & (ids_arr >= after_id))] = -np.inf
+
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > k:
+            top = np.argpartition(-scores[candidates], k - 1)[:k]
+            # Keep every candidate tied with the k-th score so id tie-breaking is exact
+            kth = scores[candidates[top]].min()
+            candidates = candidates[scores[candidates] >= kth]
+        hits = sorted(((ids[i], float(scores[i])) for i in candidates), key=lambda h: h[0], reverse=True)
+        hits.sort(key=lambda h: h[1], reverse=True)  # stable: equal scores keep id order
+        return hits[:k]
@@ -25,7 +25,11 @@ def init_db():
             description TEXT NOT NULL,
             ai_summary TEXT,
             status VARCHAR(50) DEFAULT 'active',
-            search_vector tsvector GENERATED ALWAYS AS (to_tsvector('english', title || ' ' || description)) STORED,
+            search_vector tsvector GENERATED ALWAYS AS (
+                setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+                setweight(to_tsvector('english', coalesce(description, '')), 'B') ||
+                setweight(to_tsvector('english', coalesce(ai_summary, '')), 'D')
+            ) STORED,
             created_at TIMESTAMP WITH TIME ZONE DEFAULT timezone('utc'::text, now()) NOT NULL
         )
         """,
@@ -40,8 +44,405 @@ def init_db():
             created_at TIMESTAMP WITH TIME ZONE DEFAULT timezone('utc'::text, now()) NOT NULL
         )
         """,
+        # Media and body columns the API reads and writes; explicit projections name them
+        """
+        ALTER TABLE public.posts
+            ADD COLUMN IF NOT EXISTS content TEXT,
+            ADD COLUMN IF NOT EXISTS video_url TEXT,
+            ADD COLUMN IF NOT EXISTS deck_url TEXT,
+            ADD COLUMN IF NOT EXISTS product_url TEXT
+        """,
+        # Uploaded videos are stored as storage:// references and signed on read (core.media);
+        # rewrites the one-year signed URLs earlier uploads persisted
+        """
+        UPDATE public.posts
+        SET video_url = 'storage://pitch-videos/'
+            || substring(video_url FROM '/storage/v1/object/sign/pitch-videos/([^?]+)')
+        WHERE video_url LIKE '%/storage/v1/object/sign/pitch-videos/%'
+        """,
+        """
+        ALTER TABLE public.posts ADD COLUMN IF NOT EXISTS boost_count INTEGER NOT NULL DEFAULT 0
+        """,
+        # Ids of applied boost flushes, so a flush retried after its commit is not applied twice
+        """
+        CREATE TABLE IF NOT EXISTS public.boost_flushes (
+            id UUID PRIMARY KEY,
+            applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        )
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS boost_flushes_applied_at_idx ON public.boost_flushes (applied_at)
+        """,
+        # Read and written through the service role only
+        """
+        ALTER TABLE public.boost_flushes ENABLE ROW LEVEL SECURITY
+        """,
+        # Superseded by the flush-id variant below
+        """
+        DROP FUNCTION IF EXISTS public.increment_boost_counts(jsonb)
+        """,
+        # Write-behind boost flush: applies a {post_id: delta} batch atomically, once per
+        # flush id; returns false for a flush already applied. Ids are kept for a week.
+        """
+        CREATE OR REPLACE FUNCTION public.increment_boost_counts(flush_id uuid, deltas jsonb)
+        RETURNS boolean
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            INSERT INTO public.boost_flushes (id) VALUES (flush_id) ON CONFLICT DO NOTHING;
+            IF NOT FOUND THEN
+                RETURN false;
+            END IF;
+            UPDATE public.posts p
+            SET boost_count = COALESCE(p.boost_count, 0) + d.value::int
+            FROM jsonb_each_text(deltas) AS d
+            WHERE p.id = d.key::uuid;
+            DELETE FROM public.boost_flushes WHERE applied_at < now() - interval '7 days';
+            RETURN true;
+        END
+        $$
+        """,
+        # Older tables generated search_vector from title + description only; rebuild it
+        # with weights (title A, description B, ai_summary D) for ranked search.
+        """
+        DO $$
+        BEGIN
+            IF NOT EXISTS (
+                SELECT 1 FROM information_schema.columns
+                WHERE table_schema = 'public' AND table_name = 'posts'
+                  AND column_name = 'search_vector' AND generation_expression LIKE '%ai_summary%'
+            ) THEN
+                ALTER TABLE public.posts DROP COLUMN IF EXISTS search_vector;
+                ALTER TABLE public.posts ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+                    setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+                    setweight(to_tsvector('english', coalesce(description, '')), 'B') ||
+                    setweight(to_tsvector('english', coalesce(ai_summary, '')), 'D')
+                ) STORED;
+            END IF;
+        END
+        $$
+        """,
         """
         CREATE INDEX IF NOT EXISTS posts_search_vector_idx ON public.posts USING GIN (search_vector);
+        """,
+        # Ranked full-text search over the GIN index. Standard search matches title and
+        # description (weights A/B) only; deep search also matches ai_summary (D).
+        # Keyset paginated on (rank, id); rows come back as jsonb so the function does
+        # not have to track the posts column list.
+        """
+        CREATE OR REPLACE FUNCTION public.search_posts(
+            q text,
+            deep boolean DEFAULT false,
+            lim integer DEFAULT 20,
+            after_rank real DEFAULT NULL,
+            after_id uuid DEFAULT NULL
+        )
+        RETURNS TABLE (post jsonb, rank real)
+        LANGUAGE sql
+        STABLE
+        AS $$
+            WITH query AS (
+                SELECT websearch_to_tsquery('english', q) AS tsq
+            ),
+            ranked AS (
+                SELECT p.*,
+                       ts_rank(
+                           CASE WHEN deep THEN p.search_vector ELSE ts_filter(p.search_vector, '{a,b}') END,
+                           query.tsq
+                       ) AS rank
+                FROM public.posts p, query
+                WHERE p.search_vector @@ query.tsq
+                  AND (deep OR ts_filter(p.search_vector, '{a,b}') @@ query.tsq)
+            )
+            SELECT to_jsonb(r) - 'search_vector' - 'rank', r.rank
+            FROM ranked r
+            WHERE after_rank IS NULL OR (r.rank, r.id) < (after_rank, after_id)
+            ORDER BY r.rank DESC, r.id DESC
+            LIMIT lim
+        $$
+        """,
+        # Keyset pagination: (created_at, id) DESC backs /feed and /posts cursors
+        """
+        CREATE INDEX IF NOT EXISTS posts_created_at_id_idx ON public.posts (created_at DESC, id DESC);
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS posts_author_created_at_id_idx ON public.posts (author_id, created_at DESC, id DESC);
+        """,
+        # Background summaries (core.summary_queue): pending | ready | failed; NULL on older rows
+        """
+        ALTER TABLE public.posts ADD COLUMN IF NOT EXISTS ai_summary_status VARCHAR(20)
+        """,
+        # Pending-summary sweep: finds posts whose queue job was lost
+        """
+        CREATE INDEX IF NOT EXISTS posts_summary_pending_idx ON public.posts (created_at) WHERE ai_summary_status = 'pending'
+        """,
+        # Summary worker write-back: applies a {post_id: summary} batch, returns the rows
+        """
+        CREATE OR REPLACE FUNCTION public.set_ai_summaries(summaries jsonb)
+        RETURNS SETOF public.posts
+        LANGUAGE sql
+        AS $$
+            UPDATE public.posts p
+            SET ai_summary = s.value, ai_summary_status = 'ready'
+            FROM jsonb_each_text(summaries) AS s
+            WHERE p.id = s.key::uuid
+            RETURNING p.*
+        $$
+        """,
+        # Per-post funding aggregates, maintained by a trigger on investments so every
+        # insert (create_investment) and status change (submit_due_diligence) is counted
+        # exactly once. Kept out of posts so funding writes do not churn cached post rows.
+        """
+        CREATE OR REPLACE FUNCTION public.bump_post_funding(
+            inv_post uuid, inv_investor uuid, inv_amount numeric, inv_status text, sign integer
+        )
+        RETURNS void
+        LANGUAGE plpgsql
+        AS $$
+        DECLARE
+            st text := coalesce(inv_status, 'unknown');
+            remaining integer;
+            investor_delta integer := 0;
+        BEGIN
+            -- Distinct investors: per-(post, investor) investment counts; the investor
+            -- count moves only when one of them goes from 0 to 1 or back
+            IF inv_investor IS NOT NULL THEN
+                INSERT INTO public.post_funding_investors AS pi (post_id, investor_id, n)
+                VALUES (inv_post, inv_investor, sign)
+                ON CONFLICT (post_id, investor_id) DO UPDATE SET n = pi.n + EXCLUDED.n
+                RETURNING n INTO remaining;
+                IF sign > 0 AND remaining = 1 THEN
+                    investor_delta := 1;
+                ELSIF sign < 0 AND remaining = 0 THEN
+                    investor_delta := -1;
+                    DELETE FROM public.post_funding_investors WHERE post_id = inv_post AND investor_id = inv_investor;
+                END IF;
+            END IF;
+
+            INSERT INTO public.post_funding AS f (post_id, total_committed, investment_count, investor_count, status_counts)
+            VALUES (inv_post, sign * inv_amount, sign, investor_delta, jsonb_build_object(st, sign))
+            ON CONFLICT (post_id) DO UPDATE SET
+                total_committed  = f.total_committed + EXCLUDED.total_committed,
+                investment_count = f.investment_count + EXCLUDED.investment_count,
+                investor_count   = f.investor_count + EXCLUDED.investor_count,
+                status_counts    = CASE
+                    WHEN coalesce((f.status_counts ->> st)::int, 0) + sign = 0 THEN f.status_counts - st
+                    ELSE f.status_counts || jsonb_build_object(st, coalesce((f.status_counts ->> st)::int, 0) + sign)
+                END;
+        END
+        $$
+        """,
+        """
+        CREATE OR REPLACE FUNCTION public.apply_investment_funding()
+        RETURNS trigger
+        LANGUAGE plpgsql
+        SECURITY DEFINER
+        SET search_path = public
+        AS $$
+        BEGIN
+            -- Skipped when the post itself is being deleted and its aggregates cascade away
+            IF TG_OP IN ('UPDATE', 'DELETE') AND EXISTS (SELECT 1 FROM public.posts WHERE id = OLD.post_id) THEN
+                PERFORM public.bump_post_funding(OLD.post_id, OLD.investor_id, OLD.amount, OLD.status, -1);
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                PERFORM public.bump_post_funding(NEW.post_id, NEW.investor_id, NEW.amount, NEW.status, 1);
+            END IF;
+            RETURN NULL;
+        END
+        $$
+        """,
+        # Created and backfilled together, under a lock, so no investment is missed or counted twice
+        """
+        DO $$
+        BEGIN
+            IF to_regclass('public.post_funding') IS NULL THEN
+                LOCK TABLE public.investments IN SHARE ROW EXCLUSIVE MODE;
+                CREATE TABLE public.post_funding (
+                    post_id UUID PRIMARY KEY REFERENCES public.posts(id) ON DELETE CASCADE,
+                    total_committed NUMERIC NOT NULL DEFAULT 0,
+                    investment_count INTEGER NOT NULL DEFAULT 0,
+                    investor_count INTEGER NOT NULL DEFAULT 0,
+                    status_counts JSONB NOT NULL DEFAULT '{}'
+                );
+                CREATE TABLE public.post_funding_investors (
+                    post_id UUID REFERENCES public.posts(id) ON DELETE CASCADE,
+                    investor_id UUID,
+                    n INTEGER NOT NULL,
+                    PRIMARY KEY (post_id, investor_id)
+                );
+                -- Read and written through the service role only
+                ALTER TABLE public.post_funding ENABLE ROW LEVEL SECURITY;
+                ALTER TABLE public.post_funding_investors ENABLE ROW LEVEL SECURITY;
+                INSERT INTO public.post_funding_investors (post_id, investor_id, n)
+                SELECT post_id, investor_id, count(*)
+                FROM public.investments
+                WHERE post_id IS NOT NULL AND investor_id IS NOT NULL
+                GROUP BY post_id, investor_id;
+                INSERT INTO public.post_funding (post_id, total_committed, investment_count, investor_count, status_counts)
+                SELECT post_id, sum(amount), count(*), count(DISTINCT investor_id),
+                       (SELECT jsonb_object_agg(s.status, s.n) FROM (
+                            SELECT coalesce(i2.status, 'unknown') AS status, count(*) AS n
+                            FROM public.investments i2 WHERE i2.post_id = i.post_id
+                            GROUP BY 1
+                        ) s)
+                FROM public.investments i
+                WHERE post_id IS NOT NULL
+                GROUP BY post_id;
+                CREATE TRIGGER investments_funding
+                    AFTER INSERT OR UPDATE OF post_id, investor_id, amount, status OR DELETE ON public.investments
+                    FOR EACH ROW EXECUTE FUNCTION public.apply_investment_funding();
+            END IF;
+        END
+        $$
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS investments_post_created_at_id_idx ON public.investments (post_id, created_at DESC, id DESC);
+        """,
+        # Founder dashboard: investments into the founder's posts with the post title
+        # joined in, newest first, keyset paginated on (created_at, id)
+        """
+        CREATE OR REPLACE FUNCTION public.inbound_investments(
+            founder uuid,
+            lim integer DEFAULT 20,
+            after_created timestamptz DEFAULT NULL,
+            after_id uuid DEFAULT NULL
+        )
+        RETURNS SETOF jsonb
+        LANGUAGE sql
+        STABLE
+        AS $$
+            SELECT to_jsonb(i) || jsonb_build_object('post_title', p.title)
+            FROM public.posts p
+            JOIN public.investments i ON i.post_id = p.id
+            WHERE p.author_id = founder
+              AND (after_created IS NULL OR (i.created_at, i.id) < (after_created, after_id))
+            ORDER BY i.created_at DESC, i.id DESC
+            LIMIT lim
+        $$
+        """,
+        # Funding aggregates for each of the founder's posts (zeros where nothing is invested)
+        """
+        CREATE OR REPLACE FUNCTION public.founder_funding(founder uuid)
+        RETURNS TABLE (
+            post_id uuid, post_title text, total_committed numeric,
+            investment_count integer, investor_count integer, status_counts jsonb
+        )
+        LANGUAGE sql
+        STABLE
+        AS $$
+            SELECT p.id, p.title::text,
+                   coalesce(f.total_committed, 0), coalesce(f.investment_count, 0),
+                   coalesce(f.investor_count, 0), coalesce(f.status_counts, '{}')
+            FROM public.posts p
+            LEFT JOIN public.post_funding f ON f.post_id = p.id
+            WHERE p.author_id = founder
+            ORDER BY p.created_at DESC, p.id DESC
+        $$
+        """,
+        # Owner-checked writes: each locks the row, checks the caller owns it and writes
+        # in one transaction, so the API needs a single round trip and there is no window
+        # between the check and the write. The outcome tells 404 (not_found) from 403
+        # (forbidden). Fields absent from `changes` are left as they are.
+        """
+        CREATE OR REPLACE FUNCTION public.update_post_by_author(target uuid, author uuid, changes jsonb)
+        RETURNS jsonb
+        LANGUAGE plpgsql
+        AS $$
+        DECLARE
+            owner uuid;
+            updated public.posts;
+        BEGIN
+            SELECT p.author_id INTO owner FROM public.posts p WHERE p.id = target FOR UPDATE;
+            IF NOT FOUND THEN
+                RETURN jsonb_build_object('status', 'not_found');
+            END IF;
+            IF owner IS DISTINCT FROM author THEN
+                RETURN jsonb_build_object('status', 'forbidden');
+            END IF;
+            UPDATE public.posts p SET
+                title       = CASE WHEN changes ? 'title'       THEN changes->>'title'       ELSE p.title END,
+                description = CASE WHEN changes ? 'description' THEN changes->>'description' ELSE p.description END,
+                video_url   = CASE WHEN changes ? 'video_url'   THEN changes->>'video_url'   ELSE p.video_url END,
+                deck_url    = CASE WHEN changes ? 'deck_url'    THEN changes->>'deck_url'    ELSE p.deck_url END,
+                product_url = CASE WHEN changes ? 'product_url' THEN changes->>'product_url' ELSE p.product_url END,
+                status      = CASE WHEN changes ? 'status'      THEN changes->>'status'      ELSE p.status END
+            WHERE p.id = target
+            RETURNING p.* INTO updated;
+            RETURN jsonb_build_object('status', 'ok', 'post', to_jsonb(updated));
+        END
+        $$
+        """,
+        # Investments go with the post through ON DELETE CASCADE, in the same statement
+        """
+        CREATE OR REPLACE FUNCTION public.delete_post_by_author(target uuid, author uuid)
+        RETURNS text
+        LANGUAGE plpgsql
+        AS $$
+        DECLARE
+            owner uuid;
+        BEGIN
+            SELECT p.author_id INTO owner FROM public.posts p WHERE p.id = target FOR UPDATE;
+            IF NOT FOUND THEN
+                RETURN 'not_found';
+            END IF;
+            IF owner IS DISTINCT FROM author THEN
+                RETURN 'forbidden';
+            END IF;
+            DELETE FROM public.posts p WHERE p.id = target;
+            RETURN 'ok';
+        END
+        $$
+        """,
+        """
+        CREATE OR REPLACE FUNCTION public.submit_due_diligence(target uuid, investor uuid, notes text)
+        RETURNS text
+        LANGUAGE plpgsql
+        AS $$
+        DECLARE
+            owner uuid;
+        BEGIN
+            SELECT i.investor_id INTO owner FROM public.investments i WHERE i.id = target FOR UPDATE;
+            IF NOT FOUND THEN
+                RETURN 'not_found';
+            END IF;
+            IF owner IS DISTINCT FROM investor THEN
+                RETURN 'forbidden';
+            END IF;
+            UPDATE public.investments i
+            SET due_diligence_doc_url = notes, status = 'in_review'
+            WHERE i.id = target;
+            RETURN 'ok';
+        END
+        $$
+        """,
+        # Write and private-data RPCs are for the service role only; Supabase grants
+        # EXECUTE on new public functions to anon/authenticated by default (the
+        # owner-checked writes trust the caller-supplied user id, so this matters)
+        """
+        DO $$
+        DECLARE
+            fn text;
+            r text;
+        BEGIN
+            FOREACH fn IN ARRAY ARRAY[
+                'public.increment_boost_counts(uuid, jsonb)',
+                'public.set_ai_summaries(jsonb)',
+                'public.bump_post_funding(uuid, uuid, numeric, text, integer)',
+                'public.inbound_investments(uuid, integer, timestamptz, uuid)',
+                'public.founder_funding(uuid)',
+                'public.update_post_by_author(uuid, uuid, jsonb)',
+                'public.delete_post_by_author(uuid, uuid)',
+                'public.submit_due_diligence(uuid, uuid, text)'
+            ] LOOP
+                EXECUTE format('REVOKE EXECUTE ON FUNCTION %s FROM PUBLIC', fn);
+                FOREACH r IN ARRAY ARRAY['anon', 'authenticated'] LOOP
+                    IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = r) THEN
+                        EXECUTE format('REVOKE EXECUTE ON FUNCTION %s FROM %I', fn, r);
+                    END IF;
+                END LOOP;
+            END LOOP;
+        END
+        $$
         """
     ]
 
@@ -1,9 +1,52 @@
-from fastapi import FastAPI
+import asyncio
+import contextlib
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from routes import auth, posts, ai, feed, search, investments, uploads
+from core import boosts, hot_rank, metrics, realtime, semantic_search, singleflight, startup, summary_queue
+from core.auth_middleware import jwks
+from core.db import db
 
-app = FastAPI(title="Chipn Platform API", description="API for Chipn Crowdfunding and Idea Platform")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Shared pooled HTTP client for every PostgREST/Storage call in this worker
+    await db.connect()
+    # Loads slow SDKs and fills caches while requests are already served; sets readiness
+    warm = asyncio.create_task(startup.warm_up())
+    # Supabase signing keys, re-fetched periodically to follow key rotation
+    keys = asyncio.create_task(jwks.run_refresher())
+    # Write-behind boost counter: flushes Redis deltas to posts.boost_count
+    flusher = asyncio.create_task(boosts.run_flusher())
+    # Decays the hot feed ranking and trims posts that have cooled off
+    rebalancer = asyncio.create_task(hot_rank.run_rebalancer())
+    # Keeps this worker's semantic search index in step with Postgres
+    indexer = asyncio.create_task(semantic_search.run_sync())
+    # Generates AI summaries for posts published without one
+    summaries = asyncio.create_task(summary_queue.run_worker())
+    # Feed deltas: publishes coalesced boost counts, and fans Redis pub/sub out to /feed/stream clients
+    publisher = asyncio.create_task(realtime.run_publisher())
+    subscriber = asyncio.create_task(realtime.run_subscriber())
+    yield
+    for task in (warm, keys, flusher, rebalancer, indexer, summaries, publisher, subscriber):
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+    with contextlib.suppress(Exception):
+        await boosts.flush()
+    with contextlib.suppress(Exception):
+        await semantic_search.save()
+    await db.close()
+
+
+app = FastAPI(
+    title="Chipn Platform API",
+    description="API for Chipn Crowdfunding and Idea Platform",
+    lifespan=lifespan,
+)
 
 # CORS middleware for React frontend
 app.add_middleware(
@@ -12,7 +55,10 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # read by the inbound-investments pager
 )
+# Outermost, so its timings cover CORS and every route; adds Server-Timing to responses
+app.add_middleware(metrics.MetricsMiddleware)
 
 app.include_router(auth.router)
 app.include_router(posts.router)
@@ -23,5 +69,35 @@ app.include_router(investments.router)
 app.include_router(uploads.router)
 
 @app.get("/")
-def read_root():
+async def read_root():
     return {"message": "Welcome to the Chipn Platform API"}
+
+
+@app.get("/stats")
+async def read_stats():
+    """Per-worker counters: single-flight calls, upstream executions and coalesced hits."""
+    return {"singleflight": singleflight.stats()}
+
+
+@app.get("/health/live", include_in_schema=False)
+async def read_liveness():
+    """Liveness probe: the worker's event loop is responding."""
+    return {"status": "ok"}
+
+
+@app.get("/health/ready", include_in_schema=False)
+async def read_readiness():
+    """
+    Readiness probe: 503 until this worker's startup warm-up has finished, then 200.
+    `checks` has each warm-up step's outcome; failed steps degrade but do not block traffic.
+    """
+    if not startup.ready.is_set():
+        return JSONResponse({"status": "starting", "checks": startup.checks}, status_code=503)
+    return {"status": "ready", "checks": startup.checks}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def read_metrics():
+    """Prometheus scrape endpoint for this worker: route and dependency latency, in-flight counts."""
+    body, content_type = metrics.render()
+    return Response(content=body, media_type=content_type)
@@ -0,0 +1,71 @@
+import asyncio
+from core.db import db
+from core.projection import columns
+from repositories.posts import OK, NOT_FOUND, FORBIDDEN  # outcomes of the owner-checked RPCs
+from schemas.models import InvestmentResponse
+
+INVESTMENT_COLUMNS = ",".join(columns(InvestmentResponse))
+# Ids per `in.(...)` filter; thousands of UUIDs overflow the request-URL limit
+IN_FILTER_BATCH    = 200
+
+
+async def list_by_investor(investor_id: str) -> list[dict]:
+    if db.pg:
+        return await db.fetch_json(
+            "investments.list_by_investor",
+            f"SELECT {INVESTMENT_COLUMNS} FROM public.investments WHERE investor_id = $1::uuid ORDER BY created_at DESC",
+            investor_id,
+        )
+    response = await (
+        db.admin.table("investments")
+        .select(INVESTMENT_COLUMNS)
+        .eq("investor_id", investor_id)
+        .order("created_at", desc=True)
+        .execute()
+    )
+    return response.data
+
+
+async def list_inbound(founder_id: str, limit: int, after: tuple | None) -> list[dict]:
+    """
+    Keyset page of investments into the founder's posts, newest first, each with
+    its post_title joined in server-side (limit+1 probe rows; see core.pagination).
+    """
+    after_created, after_id = after or (None, None)
+    response = await db.admin.rpc("inbound_investments", {
+        "founder": founder_id,
+        "lim": limit + 1,
+        "after_created": after_created,
+        "after_id": after_id,
+    }).execute()
+    return response.data
+
+
+async def funding_by_post(founder_id: str) -> list[dict]:
+    """Funding aggregates (post_funding) for each of the founder's posts, newest post first."""
+    return (await db.admin.rpc("founder_funding", {"founder": founder_id}).execute()).data
+
+
+async def funding_for_posts(post_ids: list[str]) -> list[dict]:
+    """post_funding rows for whichever of the posts have investments."""
+    batches = [post_ids[i:i + IN_FILTER_BATCH] for i in range(0, len(post_ids), IN_FILTER_BATCH)]
+    responses = await asyncio.gather(*(
+        db.admin.table("post_funding").select("*").in_("post_id", batch).execute()
+        for batch in batches
+    ))
+    return [row for response in responses for row in response.data]
+
+
+async def submit_due_diligence(investment_id: str, investor_id: str, notes: str) -> str:
+    """
+    Attaches the notes and moves the investment to in_review, only if investor_id
+    made it, atomically in one round trip. Returns OK, NOT_FOUND or FORBIDDEN.
+    """
+    return (await db.admin.rpc("submit_due_diligence", {
+        "target": investment_id, "investor": investor_id, "notes": notes,
+    }).execute()).data
+
+
+async def create(data: dict) -> dict | None:
+    response = await db.admin.table("investments").insert(data).execute()
+    return response.data[0] if response.data else None
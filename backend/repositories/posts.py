@@ -0,0 +1,187 @@
+from core.db import db
+from core.pagination import paginate
+from core.projection import columns
+from core.singleflight import SingleFlight
+from schemas.models import FeedCard, IdeaProductResponse
+
+# Explicit projections: never ship the generated search_vector
+POST_COLUMNS = columns(IdeaProductResponse)
+CARD_COLUMNS = columns(FeedCard)
+
+# Identical concurrent reads (same normalised arguments) share one PostgREST call.
+# The hot reads below go straight to Postgres instead when core.db has a pool
+# (READ_BACKEND=postgres); the rows are the same either way.
+_reads = SingleFlight("posts")
+
+# Outcomes of the owner-checked write RPCs (init_db.py)
+OK, NOT_FOUND, FORBIDDEN = "ok", "not_found", "forbidden"
+
+
+def _select(cols: list[str]) -> str:
+    return ",".join(cols)
+
+
+def _sql_columns(cols: list[str]) -> str:
+    # Column names come from the response models, never from the request
+    return ", ".join(f'"{c}"' for c in cols)
+
+
+def _trim(row: dict | None) -> dict | None:
+    """Drops columns outside POST_COLUMNS from rows PostgREST returns whole (writes, RPCs)."""
+    return {k: v for k, v in row.items() if k in POST_COLUMNS} if row else None
+
+
+async def list_page(
+    limit: int,
+    after: tuple | None,
+    author_id: str | None = None,
+    cols: list[str] = POST_COLUMNS,
+) -> list[dict]:
+    """
+    Keyset page of posts, newest first (limit+1 probe rows; see core.pagination).
+    id and created_at are always selected, as the cursor is built from them.
+    """
+    cols = list(dict.fromkeys(["id", "created_at", *cols]))
+
+    async def fetch():
+        if db.pg:
+            args, where = [], []
+            if author_id:
+                args.append(author_id)
+                where.append(f"author_id = ${len(args)}::uuid")
+            if after:
+                args += after
+                # Cursor keys are the strings PostgREST takes, parsed by Postgres here too
+                where.append(f"(created_at, id) < (${len(args) - 1}::text::timestamptz, ${len(args)}::uuid)")
+            args.append(limit + 1)
+            return await db.fetch_json(
+                "posts.list_page",
+                f"SELECT {_sql_columns(cols)} FROM public.posts"
+                + (f" WHERE {' AND '.join(where)}" if where else "")
+                + f" ORDER BY created_at DESC, id DESC LIMIT ${len(args)}",
+                *args,
+            )
+        query = db.public.table("posts").select(_select(cols))
+        if author_id:
+            query = query.eq("author_id", author_id)
+        return (await paginate(query, limit, after).execute()).data
+
+    return await _reads.do(("list_page", limit, after, author_id, tuple(cols)), fetch)
+
+
+async def list_oldest_first(limit: int, after: tuple | None) -> list[dict]:
+    """Keyset page in ascending (created_at, id) order, for incremental index builds."""
+    query = db.public.table("posts").select(_select(POST_COLUMNS))
+    return (await paginate(query, limit, after, desc=False).execute()).data
+
+
+async def list_pending_summaries(created_before: str, limit: int) -> list[str]:
+    """Ids of posts created before the ISO timestamp still waiting for a summary, oldest first."""
+    response = await (
+        db.admin.table("posts")
+        .select("id")
+        .eq("ai_summary_status", "pending")
+        .lt("created_at", created_before)
+        .order("created_at")
+        .limit(limit)
+        .execute()
+    )
+    return [row["id"] for row in response.data]
+
+
+async def get_many(post_ids: list[str]) -> list[dict]:
+    if not post_ids:
+        return []
+
+    async def fetch():
+        if db.pg:
+            return await db.fetch_json(
+                "posts.get_many",
+                f"SELECT {_sql_columns(POST_COLUMNS)} FROM public.posts WHERE id = ANY($1::uuid[])",
+                post_ids,
+            )
+        return (await db.public.table("posts").select(_select(POST_COLUMNS)).in_("id", post_ids).execute()).data
+
+    return await _reads.do(("get_many", frozenset(post_ids)), fetch)
+
+
+async def get(post_id: str) -> dict | None:
+    async def fetch():
+        if db.pg:
+            rows = await db.fetch_json(
+                "posts.get", f"SELECT {_sql_columns(POST_COLUMNS)} FROM public.posts WHERE id = $1::uuid", post_id,
+            )
+            return rows[0] if rows else None
+        response = await db.public.table("posts").select(_select(POST_COLUMNS)).eq("id", post_id).execute()
+        return response.data[0] if response.data else None
+
+    return await _reads.do(("get", post_id), fetch)
+
+
+async def search(query: str, deep: bool, limit: int, after: tuple | None) -> list[dict]:
+    """
+    Ranked full-text search (search_posts RPC), best match first.
+    Returns limit+1 probe rows, each carrying its "rank" for the (rank, id) keyset cursor.
+    """
+    after_rank, after_id = after or (None, None)
+    # websearch_to_tsquery ignores case and spacing, so "Drone  Delivery" and
+    # "drone delivery" are the same query and can share one call
+    query = " ".join(query.lower().split())
+
+    async def fetch():
+        if db.pg:
+            rows = await db.fetch_json(
+                "posts.search",
+                "SELECT * FROM public.search_posts($1, $2, $3, $4::text::real, $5::uuid)",
+                query, deep, limit + 1, None if after_rank is None else str(after_rank), after_id,
+            )
+        else:
+            rows = (await db.public.rpc("search_posts", {
+                "q": query,
+                "deep": deep,
+                "lim": limit + 1,
+                "after_rank": after_rank,
+                "after_id": after_id,
+            }).execute()).data
+        return [{**item["post"], "rank": item["rank"]} for item in rows]
+
+    return await _reads.do(("search", query, deep, limit, after), fetch)
+
+
+async def create(data: dict) -> dict | None:
+    response = await db.admin.table("posts").insert(data).execute()
+    return _trim(response.data[0]) if response.data else None
+
+
+async def update(post_id: str, data: dict) -> dict | None:
+    response = await db.admin.table("posts").update(data).eq("id", post_id).execute()
+    return _trim(response.data[0]) if response.data else None
+
+
+async def update_by_author(post_id: str, author_id: str, data: dict) -> tuple[str, dict | None]:
+    """
+    Applies `data` only if author_id owns the post, atomically in one round trip.
+    Returns (outcome, updated row): OK with the row, or NOT_FOUND / FORBIDDEN with None.
+    """
+    result = (await db.admin.rpc("update_post_by_author", {
+        "target": post_id, "author": author_id, "changes": data,
+    }).execute()).data
+    return result["status"], _trim(result.get("post"))
+
+
+async def delete_by_author(post_id: str, author_id: str) -> str:
+    """Deletes the post and its investments if author_id owns it. Returns the outcome."""
+    return (await db.admin.rpc("delete_post_by_author", {"target": post_id, "author": author_id}).execute()).data
+
+
+async def increment_boosts(flush_id: str, deltas: dict[str, int]) -> bool:
+    """
+    Atomically adds {post_id: delta} to posts.boost_count in one round trip.
+    Each flush_id is applied once; returns False if it already had been.
+    """
+    return (await db.admin.rpc("increment_boost_counts", {"flush_id": flush_id, "deltas": deltas}).execute()).data
+
+
+async def set_summaries(summaries: dict[str, str]) -> list[dict]:
+    """Writes {post_id: ai_summary} in one round trip; returns the updated rows."""
+    return [_trim(row) for row in (await db.admin.rpc("set_ai_summaries", {"summaries": summaries}).execute()).data]
@@ -0,0 +1,107 @@
+import base64
+from urllib.parse import urljoin
+import httpx
+from core.db import db
+
+
+async def signed_urls(bucket: str, keys: list[str], expires_in: int) -> dict[str, str]:
+    """Mints signed URLs for many objects in one call; objects that failed are left out."""
+    signed = await db.storage.from_(bucket).create_signed_urls(keys, expires_in)
+    return {item["path"]: item["signedURL"] for item in signed if not item["error"] and item["path"]}
+
+
+async def public_url(bucket: str, key: str) -> str:
+    return await db.storage.from_(bucket).get_public_url(key)
+
+
+async def exists(bucket: str, key: str) -> bool:
+    return await db.storage.from_(bucket).exists(key)
+
+
+async def move(bucket: str, source: str, destination: str) -> None:
+    await db.storage.from_(bucket).move(source, destination)
+
+
+async def remove(bucket: str, keys: list[str]) -> None:
+    await db.storage.from_(bucket).remove(keys)
+
+
+# Supabase's TUS endpoint requires every chunk except the last to be exactly 6 MB
+RESUMABLE_CHUNK_SIZE = 6 * 1024 * 1024
+RESUMABLE_RETRIES    = 2
+TUS_VERSION          = "1.0.0"
+_CHUNK_TIMEOUT       = httpx.Timeout(60.0, connect=5.0)
+
+
+def _tus_metadata(**values: str) -> str:
+    return ",".join(f"{k} {base64.b64encode(v.encode()).decode()}" for k, v in values.items())
+
+
+class ResumableUpload:
+    """
+    A TUS resumable upload to Supabase Storage. The total length is deferred, so the
+    object can be streamed in RESUMABLE_CHUNK_SIZE pieces without knowing its size
+    up front; a failed chunk is resumed from the server-reported offset.
+    """
+
+    def __init__(self, url: str):
+        self.url    = url
+        self.offset = 0
+
+    @classmethod
+    async def create(cls, bucket: str, key: str, content_type: str | None) -> "ResumableUpload":
+        endpoint = f"{db.storage_url}/upload/resumable"
+        resp = await db.http.post(
+            endpoint,
+            headers={
+                **db.service_headers,
+                "Tus-Resumable": TUS_VERSION,
+                "Upload-Defer-Length": "1",
+                "Upload-Metadata": _tus_metadata(
+                    bucketName=bucket,
+                    objectName=key,
+                    contentType=content_type or "application/octet-stream",
+                ),
+                "x-upsert": "false",
+            },
+        )
+        resp.raise_for_status()
+        return cls(urljoin(endpoint, resp.headers["Location"]))
+
+    def _headers(self, **extra: str) -> dict:
+        return {**db.service_headers, "Tus-Resumable": TUS_VERSION, **extra}
+
+    async def _server_offset(self) -> int:
+        resp = await db.http.head(self.url, headers=self._headers())
+        resp.raise_for_status()
+        return int(resp.headers["Upload-Offset"])
+
+    async def write(self, chunk: bytes, final: bool = False) -> None:
+        """Appends a chunk; pass final=True with the last (possibly empty) chunk."""
+        start = self.offset
+        for attempt in range(RESUMABLE_RETRIES + 1):
+            data = chunk[self.offset - start:]
+            headers = self._headers(**{
+                "Upload-Offset": str(self.offset),
+                "Content-Type": "application/offset+octet-stream",
+            })
+            if final:
+                headers["Upload-Length"] = str(start + len(chunk))
+            try:
+                resp = await db.http.patch(self.url, content=data, headers=headers, timeout=_CHUNK_TIMEOUT)
+                resp.raise_for_status()
+                self.offset = int(resp.headers.get("Upload-Offset", self.offset + len(data)))
+                return
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                retryable = isinstance(e, httpx.TransportError) or e.response.status_code >= 500
+                if not retryable or attempt == RESUMABLE_RETRIES:
+                    raise
+                # Resume from whatever the server actually persisted
+                self.offset = await self._server_offset()
+
+    async def abort(self) -> None:
+        """Terminates the upload so Storage discards the partial object."""
+        try:
+            await db.http.delete(self.url, headers=self._headers())
+        except httpx.HTTPError:
+            pass
@@ -1,26 +1,78 @@
-from fastapi import APIRouter, HTTPException
-from core.config import anthropic_client
+import json
+import logging
+from collections.abc import AsyncIterator
+from contextlib import aclosing
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from core import rate_limit, summarizer
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/ai", tags=["ai"])
 
-@router.post("/summarize")
+@router.post("/summarize", dependencies=[Depends(rate_limit.per_ip("summarize"))])
 async def summarize_post(content: str) -> dict:
     """
     Uses Anthropic's Claude to summarize the submitted idea/product so investors can digest it quickly.
+    Summaries are cached by content hash and identical in-flight requests share one call;
+    returns 503 when the Anthropic queue is full and 504 when the time budget runs out.
+    Rate limited per client IP (429 with Retry-After).
+    """
+    try:
+        return {"summary": await summarizer.summarize(content)}
+    except summarizer.SummarizerBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    except TimeoutError:
+        raise HTTPException(status_code=504, detail="Summarization timed out")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def _event(event: dict) -> str:
+    return f"data: {json.dumps(event, separators=(',', ':'))}\n\n"
+
+
+async def _relay(request: Request, first: str, deltas: AsyncIterator[str]):
+    # Leaving early closes `deltas`, which aborts the Anthropic stream
+    async with aclosing(deltas):
+        try:
+            yield _event({"type": "delta", "text": first})
+            async for text in deltas:
+                if await request.is_disconnected():
+                    return
+                yield _event({"type": "delta", "text": text})
+        except TimeoutError:
+            yield _event({"type": "error", "detail": "Summarization timed out"})
+            return
+        except Exception as e:
+            logger.warning("summary stream failed: %s", e)
+            yield _event({"type": "error", "detail": str(e)})
+            return
+        yield _event({"type": "done"})
+
+
+@router.post("/summarize/stream", dependencies=[Depends(rate_limit.per_ip("summarize"))])
+async def stream_summary(content: str, request: Request) -> StreamingResponse:
+    """
+    Same summary as /summarize, relayed as Server-Sent Events while it is generated,
+    so the first words arrive in a few hundred milliseconds. Each `data:` frame is:
+      {"type": "delta", "text": "..."}   the next piece; concatenate them in order
+      {"type": "done"}                   the summary is complete
+      {"type": "error", "detail": "..."} generation failed part way
+    Failures before the first piece are returned as statuses, as by /summarize.
+    Disconnecting stops generation; only complete summaries are cached.
     """
-    # Using a dummy fallback for local dev if key is dummy
-    if anthropic_client.api_key == "dummy_key":
-         return {"summary": f"AI Summary: {content[:100]}..."}
-    
+    deltas = summarizer.stream(content)
     try:
-        response = await anthropic_client.messages.create(
-            max_tokens=256,
-            model="claude-3-haiku-20240307",
-            messages=[{
-                "role": "user", 
-                "content": f"Briefly summarize this crowdfunding idea/product for investors. Keep it exciting but factual: {content}"
-            }]
-        )
-        return {"summary": response.content[0].text}
+        first = await anext(deltas, "")
+    except summarizer.SummarizerBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    except TimeoutError:
+        raise HTTPException(status_code=504, detail="Summarization timed out")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    return StreamingResponse(
+        _relay(request, first, deltas),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,16 +1,189 @@
-from fastapi import APIRouter, HTTPException
-from schemas.models import FeedResponse, IdeaProductResponse
-from core.config import supabase
+import asyncio
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from schemas.models import FeedCard, FeedResponse
+from core.auth_middleware import get_optional_user
+from core.pagination import encode_cursor, is_timestamp, parse_cursor
+from core.projection import parse_fields, project
+from core.http_cache import FEED_CACHE_CONTROL, PRIVATE_CACHE_CONTROL, cached_json
+from core import feed_cache, hot_rank, media, realtime, seen
+from repositories import posts as posts_repo
 
 router = APIRouter(prefix="/feed", tags=["feed"])
 
+FEED_PAGE_SIZE  = 5
+SEEN_SCAN_BATCH = 20        # posts read per pass when skipping a reader's seen posts
+SEEN_MAX_SCANS  = 5         # passes before a short page is returned; its cursor continues the scan
+
+
+async def _load_page(limit: int, after: tuple | None) -> list[dict]:
+    """
+    Serves a keyset page from the Redis timeline, falling back to Postgres on a miss.
+    The first miss after the timeline expires reloads it with the newest posts.
+    """
+    rows = await feed_cache.get_page(limit, after)
+    if rows is not None:
+        return rows
+    if await feed_cache.begin_refill():
+        latest = await posts_repo.list_page(feed_cache.TIMELINE_SIZE - 1, None)
+        await feed_cache.refill(latest)
+        rows = await feed_cache.get_page(limit, after)
+        if rows is not None:
+            return rows
+    return await posts_repo.list_page(limit, after, cols=posts_repo.CARD_COLUMNS)
+
+
+async def _new_rows(limit: int, after: tuple | None) -> tuple[list[tuple[dict, tuple]], bool]:
+    rows = await _load_page(limit, after)
+    return [(row, (row["created_at"], row["id"])) for row in rows[:limit]], len(rows) > limit
+
+
+async def _hot_rows(limit: int, after: tuple | None) -> tuple[list[tuple[dict | None, tuple]], bool] | None:
+    """
+    A page of the Redis hot ranking, building it on first use.
+    Returns None if the ranking is unavailable; the caller falls back to newest-first.
+    """
+    entries = await hot_rank.get_page(limit, after)
+    if entries is None and await hot_rank.begin_rebuild():
+        await hot_rank.rebuild()
+        entries = await hot_rank.get_page(limit, after)
+    if entries is None:
+        return None
+    more, entries = len(entries) > limit, entries[:limit]
+    ids = [pid for pid, _ in entries]
+    found = await feed_cache.get_posts(ids)
+    missing = [pid for pid in ids if pid not in found]
+    for row in await posts_repo.get_many(missing):
+        found[row["id"]] = row
+        await feed_cache.update_post(row)
+    # Posts deleted since they were ranked come back as None and are skipped
+    return [(found.get(pid), (key, pid)) for pid, key in entries], more
+
+
+async def _collect(source, limit: int, after: tuple | None, reader: str | None) -> tuple[list[dict], str | None] | None:
+    """
+    Reads a page of `limit` posts from `source` (_new_rows or _hot_rows) after `after`.
+    With a reader, posts already served to them are skipped and the source is read
+    further, SEEN_SCAN_BATCH at a time for up to SEEN_MAX_SCANS reads, to fill the
+    page; the posts returned are then added to their seen-set. The first read is
+    one page, so a reader scrolling into posts they have not seen costs no extra.
+    Returns (rows, next cursor), or None if the source is unavailable.
+    """
+    rows, position, more = [], after, False
+    for scan in range(SEEN_MAX_SCANS if reader else 1):
+        page = await source(limit if scan == 0 else SEEN_SCAN_BATCH, position)
+        if page is None:
+            if scan == 0:
+                return None
+            break
+        entries, more = page
+        ids = [pid for _, (_, pid) in entries]
+        seen_before = await seen.contains(reader, ids) if reader else [False] * len(ids)
+        for i, ((row, key), was_seen) in enumerate(zip(entries, seen_before)):
+            position = key
+            if row is not None and not was_seen:
+                rows.append(row)
+                if len(rows) == limit:
+                    more = more or i < len(entries) - 1
+                    break
+        if len(rows) == limit or not more:
+            break
+    if reader:
+        await seen.add(reader, [row["id"] for row in rows])
+    return rows, encode_cursor(*position) if more and position else None
+
+
 @router.get("/", response_model=FeedResponse)
-def get_feed(cursor: int = 0) -> FeedResponse:
+async def get_feed(
+    request: Request,
+    cursor: Optional[str] = Query(None),
+    sort: Literal["new", "hot"] = Query("new"),
+    fields: Optional[str] = Query(None, description="Comma-separated FeedCard fields to return"),
+    skip_seen: bool = Query(True, description="For signed-in callers, leave out posts already served to them"),
+    user_id: str | None = Depends(get_optional_user),
+) -> FeedResponse:
+    """
+    Feed page. sort=new (default) is newest first, using (created_at, id) keyset
+    pagination so deep pages cost the same as the first and do not shift when new
+    posts arrive mid-scroll; pages come from the Redis timeline kept in sync by the
+    posts routes. sort=hot ranks by time-decayed boosts, investments and recency,
+    kept incrementally in a Redis sorted set (core.hot_rank) and paged by (score, id).
+    If the hot ranking is unavailable the feed falls back to newest first.
+    Signed-in callers are not served the same post twice: each user has a seen-set
+    in Redis (core.seen) and the page is filled from further down instead. Their
+    pages are private to them; anonymous pages are shared by every caller.
+    Items are FeedCards (no `content` body); `fields` narrows them further.
+    Pages carry an ETag; If-None-Match answers 304 straight from the Redis cache.
+    """
+    # Newest-first cursors carry created_at, hot ones score@epoch
+    after = parse_cursor(cursor, lambda key: is_timestamp(key) or hot_rank.is_hot_position(key))
+    selected = parse_fields(fields, FeedCard)
+    reader = user_id if skip_seen else None
+    hot_cursor = after is not None and hot_rank.is_hot_position(after[0])
+    if hot_cursor:
+        if sort != "hot":
+            raise HTTPException(status_code=400, detail="Cursor does not match sort order")
+        try:
+            hot_rank.parse_position(after[0])
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
     try:
-        limit = 5
-        response = supabase.table("posts").select("*").order("created_at", desc=True).range(cursor, cursor + limit - 1).execute()
-        items = [IdeaProductResponse(**item) for item in response.data]
-        next_cursor = cursor + limit if len(items) == limit else None
-        return FeedResponse(items=items, next_cursor=next_cursor)
+        page = None
+        # A newest-first cursor under sort=hot continues a page served while the ranking was down
+        if sort == "hot" and (after is None or hot_cursor):
+            page = await _collect(_hot_rows, FEED_PAGE_SIZE, after, reader)
+            if page is None and hot_cursor:
+                raise HTTPException(status_code=503, detail="Hot ranking unavailable", headers={"Retry-After": "5"})
+        if page is None:
+            page = await _collect(_new_rows, FEED_PAGE_SIZE, after, reader)
+        rows, next_cursor = page
+        rows = await media.sign_rows(rows)
+        return cached_json(
+            request,
+            {"items": project(rows, selected), "next_cursor": next_cursor},
+            PRIVATE_CACHE_CONTROL if reader else FEED_CACHE_CONTROL,
+            {"Vary": "Authorization"},
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+async def _events():
+    # The queue is registered when the response starts and dropped when the client goes
+    with realtime.hub.connect() as queue:
+        yield realtime.RETRY_FRAME
+        while True:
+            try:
+                async with asyncio.timeout(realtime.KEEPALIVE):
+                    frames = [await queue.get()]
+            except TimeoutError:
+                frames = [realtime.KEEPALIVE_FRAME]
+            # Whatever else queued up meanwhile goes out in the same write
+            while not queue.empty():
+                frames.append(queue.get_nowait())
+            yield "".join(frames)
+
+
+@router.get("/stream")
+async def stream_feed() -> StreamingResponse:
+    """
+    Server-Sent Events stream of feed deltas, so open feeds stay live without polling.
+    Each `data:` frame is one JSON event:
+      {"type": "activity",                   coalesced, at most twice a second per worker:
+       "posts": [FeedCard, ...],               posts published since the last one, oldest first
+       "boosts": {post_id: boost_count},       live counts of posts boosted since the last one
+       "investments": {post_id: count}}        new investments per post (amounts are not sent)
+      {"type": "resync"}                     events were dropped; refetch the feed
+    Events reach every worker through Redis pub/sub (core.realtime). An idle
+    connection costs one small queue and a keepalive comment every 15 seconds.
+    """
+    if len(realtime.hub) >= realtime.MAX_CONNECTIONS:
+        raise HTTPException(status_code=503, detail="Too many stream clients", headers={"Retry-After": "5"})
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
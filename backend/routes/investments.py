@@ -1,14 +1,17 @@
-from typing import List
+from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
-from schemas.models import InvestmentCreate, InvestmentResponse, DueDiligenceSubmit
-from core.config import supabase, supabase_admin
+from schemas.models import InvestmentCreate, InvestmentResponse, DueDiligenceSubmit, FundingSummary, PostFunding
 from core.auth_middleware import get_current_user
+from core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, next_page, parse_cursor
+from core.projection import json_response
+from core import hot_rank, rate_limit, realtime
+from repositories import investments as investments_repo
 
 router = APIRouter(prefix="/investments", tags=["investments"])
 
 
 @router.get("/", response_model=List[InvestmentResponse])
-def get_investments_by_investor(
+async def get_investments_by_investor(
     investor_id: str = Query(...),
     user_id: str = Depends(get_current_user),
 ) -> List[InvestmentResponse]:
@@ -19,69 +22,82 @@ def get_investments_by_investor(
     if investor_id != user_id:
         raise HTTPException(status_code=403, detail="Access denied")
     try:
-        response = (
-            supabase_admin.table("investments")
-            .select("*")
-            .eq("investor_id", user_id)
-            .order("created_at", desc=True)
-            .execute()
-        )
-        return [InvestmentResponse(**item) for item in response.data]
+        rows = await investments_repo.list_by_investor(user_id)
+        return [InvestmentResponse(**item) for item in rows]
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/inbound", response_model=List[dict])
-def get_inbound_investments(
+async def get_inbound_investments(
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     user_id: str = Depends(get_current_user),
 ) -> List[dict]:
     """
-    Return all investments made into the authenticated user's posts.
-    Groups by post: returns each investment with the post title.
+    Return a page of investments made into the authenticated user's posts, newest
+    first, each with its post_title. The join runs in Postgres (inbound_investments);
+    the cursor for the following page is returned in the X-Next-Cursor header.
     """
+    after = parse_cursor(cursor)
     try:
-        # Get all posts by this user
-        posts_resp = supabase_admin.table("posts").select("id, title").eq("author_id", user_id).execute()
-        if not posts_resp.data:
-            return []
+        rows, next_cursor = next_page(await investments_repo.list_inbound(user_id, limit, after), limit)
+        headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+        return json_response(rows, headers)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-        post_ids = [p["id"] for p in posts_resp.data]
-        post_map = {p["id"]: p["title"] for p in posts_resp.data}
 
-        # Get all investments for those posts
-        inv_resp = (
-            supabase_admin.table("investments")
-            .select("*")
-            .in_("post_id", post_ids)
-            .order("created_at", desc=True)
-            .execute()
+@router.get("/inbound/summary", response_model=FundingSummary)
+async def get_inbound_summary(
+    user_id: str = Depends(get_current_user),
+) -> FundingSummary:
+    """
+    Funding totals across the authenticated user's posts, plus a per-post breakdown.
+    Read from the post_funding aggregates, which a trigger keeps current as
+    investments are created and move through due diligence.
+    """
+    try:
+        posts = [PostFunding(**row) for row in await investments_repo.funding_by_post(user_id)]
+        status_counts: dict[str, int] = {}
+        for post in posts:
+            for status, n in post.status_counts.items():
+                status_counts[status] = status_counts.get(status, 0) + n
+        return FundingSummary(
+            total_committed=sum(p.total_committed for p in posts),
+            investment_count=sum(p.investment_count for p in posts),
+            status_counts=status_counts,
+            posts=posts,
         )
-
-        result = []
-        for inv in inv_resp.data:
-            result.append({**inv, "post_title": post_map.get(inv["post_id"], "Unknown")})
-        return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/", response_model=InvestmentResponse)
-def create_investment(
+@router.post(
+    "/",
+    response_model=InvestmentResponse,
+    dependencies=[Depends(rate_limit.per_user("invest", shed_on=("supabase_admin",)))],
+)
+async def create_investment(
     inv: InvestmentCreate,
     user_id: str = Depends(get_current_user),
 ) -> InvestmentResponse:
     """
     Create an investment. investor_id is taken from the verified JWT.
-    Uses supabase_admin to bypass RLS on INSERT.
+    Uses the admin (service role) client to bypass RLS on INSERT.
+    Rate limited per user; shed with 503 while the admin connection pool is saturated.
+    Feed streams are told about the activity, without the amount.
     """
     try:
         data = inv.model_dump(exclude_none=True)
         data["investor_id"] = user_id
         data["status"] = "pending_diligence" if inv.amount > 10000 else "approved"
-        response = supabase_admin.table("investments").insert(data).execute()
-        if not response.data:
+        created = await investments_repo.create(data)
+        if not created:
             raise HTTPException(status_code=400, detail="Failed to create investment")
-        return InvestmentResponse(**response.data[0])
+        await hot_rank.record(created["post_id"], hot_rank.investment_weight(float(created["amount"])))
+        realtime.investment_recorded(created["post_id"])
+        return InvestmentResponse(**created)
     except HTTPException:
         raise
     except Exception as e:
@@ -89,32 +105,21 @@ def create_investment(
 
 
 @router.post("/due-diligence")
-def submit_due_diligence(
+async def submit_due_diligence(
     diligence: DueDiligenceSubmit,
     user_id: str = Depends(get_current_user),
 ):
     """
     Attach due diligence notes to an investment.
-    Verifies ownership before updating.
+    Ownership is checked and the update applied in one atomic call.
     """
     try:
-        # Verify the investment belongs to this user
-        check = (
-            supabase_admin.table("investments")
-            .select("investor_id")
-            .eq("id", diligence.investment_id)
-            .execute()
-        )
-        if not check.data:
+        outcome = await investments_repo.submit_due_diligence(diligence.investment_id, user_id, diligence.notes)
+        if outcome == investments_repo.NOT_FOUND:
             raise HTTPException(status_code=404, detail="Investment not found")
-        if check.data[0]["investor_id"] != user_id:
+        if outcome == investments_repo.FORBIDDEN:
             raise HTTPException(status_code=403, detail="Access denied")
 
-        supabase_admin.table("investments").update({
-            "due_diligence_doc_url": diligence.notes,
-            "status": "in_review",
-        }).eq("id", diligence.investment_id).execute()
-
         return {"investment_id": diligence.investment_id, "status": "in_review"}
     except HTTPException:
         raise
@@ -1,25 +1,55 @@
+import uuid
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from redis.exceptions import RedisError
 from schemas.models import IdeaProductCreate, IdeaProductResponse
-from core.config import supabase, supabase_admin
 from core.auth_middleware import get_current_user, get_optional_user
+from core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, next_page, parse_cursor
+from core.projection import parse_fields, project
+from core.http_cache import LIST_CACHE_CONTROL, POST_CACHE_CONTROL, cached_json
+from core import feed_cache, boosts, hot_rank, media, rate_limit, realtime, semantic_search, summary_queue
+from repositories import posts as posts_repo
 
 router = APIRouter(prefix="/posts", tags=["posts"])
 
 
+def _normalize_media(data: dict, user_id: str) -> None:
+    # Stored media columns hold storage references, never the expiring URLs clients see
+    for column in media.MEDIA_COLUMNS:
+        if column in data:
+            try:
+                data[column] = media.normalize(data[column], user_id)
+            except ValueError as e:
+                raise HTTPException(status_code=422, detail=str(e))
+
+
 @router.post("/", response_model=IdeaProductResponse)
-def create_post(
+async def create_post(
     post: IdeaProductCreate,
     user_id: str = Depends(get_current_user),
 ) -> IdeaProductResponse:
-    """Create a new post. author_id is taken from the verified JWT — not the request body."""
+    """
+    Create a new post. author_id is taken from the verified JWT — not the request body.
+    Without an ai_summary the post is published straight away with ai_summary_status
+    "pending" and the summary is generated in the background (core.summary_queue).
+    Open feed streams are sent the new card.
+    """
+    data = post.model_dump(exclude_none=True)
+    data["author_id"] = user_id  # override any body-supplied author_id
+    _normalize_media(data, user_id)
     try:
-        data = post.model_dump(exclude_none=True)
-        data["author_id"] = user_id  # override any body-supplied author_id
-        response = supabase_admin.table("posts").insert(data).execute()
-        if not response.data:
+        data["ai_summary_status"] = summary_queue.READY if data.get("ai_summary") else summary_queue.PENDING
+        created = await posts_repo.create(data)
+        if not created:
             raise HTTPException(status_code=400, detail="Failed to create post")
-        return IdeaProductResponse(**response.data[0])
+        await feed_cache.add_post(created)
+        await hot_rank.add_post(created)
+        await semantic_search.index_post(created)
+        if created["ai_summary_status"] == summary_queue.PENDING:
+            await summary_queue.enqueue(created["id"])
+        created = (await media.sign_rows([created]))[0]
+        realtime.post_created(project([created], posts_repo.CARD_COLUMNS)[0])
+        return IdeaProductResponse(**created)
     except HTTPException:
         raise
     except Exception as e:
@@ -27,49 +57,89 @@ def create_post(
 
 
 @router.get("/", response_model=List[IdeaProductResponse])
-def get_posts(author_id: Optional[str] = Query(None)) -> List[IdeaProductResponse]:
-    """Return posts, optionally filtered by author_id. Public endpoint."""
+async def get_posts(
+    request: Request,
+    author_id: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(None, description="Comma-separated post fields to return"),
+) -> List[IdeaProductResponse]:
+    """
+    Return a page of posts, newest first, optionally filtered by author_id. Public endpoint.
+    `fields` selects a subset of columns, which is also all Postgres sends back.
+    The cursor for the following page is returned in the X-Next-Cursor header.
+    """
+    after = parse_cursor(cursor)
+    selected = parse_fields(fields, IdeaProductResponse)
     try:
-        query = supabase.table("posts").select("*").order("created_at", desc=True)
-        if author_id:
-            query = query.eq("author_id", author_id)
-        response = query.execute()
-        return [IdeaProductResponse(**item) for item in response.data]
+        rows = await posts_repo.list_page(limit, after, author_id, cols=selected)
+        rows, next_cursor = next_page(rows, limit)
+        rows = await media.sign_rows(rows)
+        headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+        return cached_json(request, project(rows, selected), LIST_CACHE_CONTROL, headers)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/{post_id}", response_model=IdeaProductResponse)
-def get_post(post_id: str) -> IdeaProductResponse:
+async def get_post(request: Request, post_id: str) -> IdeaProductResponse:
+    """
+    Single post, read through the Redis post cache (with its live boost count).
+    Carries an ETag, so a client or CDN revalidating an unchanged post gets a 304
+    without a Postgres round trip.
+    """
     try:
-        response = supabase.table("posts").select("*").eq("id", post_id).execute()
-        if not response.data:
-            raise HTTPException(status_code=404, detail="Post not found")
-        return IdeaProductResponse(**response.data[0])
+        row = await feed_cache.get_post(post_id)
+        if row is None:
+            row = await posts_repo.get(post_id)
+            if not row:
+                raise HTTPException(status_code=404, detail="Post not found")
+            await feed_cache.update_post(row)
+        row = (await media.sign_rows([row]))[0]
+        return cached_json(request, project([row], posts_repo.POST_COLUMNS)[0], POST_CACHE_CONTROL)
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.patch("/{post_id}/boost", response_model=IdeaProductResponse)
-def boost_post(
+@router.patch(
+    "/{post_id}/boost",
+    response_model=IdeaProductResponse,
+    dependencies=[Depends(rate_limit.per_user("boost"))],
+)
+async def boost_post(
     post_id: str,
     _: str = Depends(get_current_user),
 ) -> IdeaProductResponse:
     """
     Increment boost_count for a post. Requires authentication.
-    Uses supabase_admin (service role) so the UPDATE passes RLS regardless of author.
+    The boost is counted atomically in Redis and written to Postgres in batches by
+    the background flusher (core.boosts); the response carries the live count.
+    Postgres is only read when the post is not cached yet. Rate limited per user.
+    Feed streams receive the new count in the next coalesced "activity" event.
     """
     try:
-        current = supabase_admin.table("posts").select("boost_count").eq("id", post_id).execute()
-        if not current.data:
-            raise HTTPException(status_code=404, detail="Post not found")
-        count = (current.data[0].get("boost_count") or 0) + 1
-        updated = supabase_admin.table("posts").update({"boost_count": count}).eq("id", post_id).execute()
-        if not updated.data:
-            raise HTTPException(status_code=400, detail="Boost failed")
-        return IdeaProductResponse(**updated.data[0])
+        try:
+            row = await boosts.record_boost(post_id)
+            if row is None:
+                current = await posts_repo.get(post_id)
+                if not current:
+                    raise HTTPException(status_code=404, detail="Post not found")
+                await feed_cache.update_post(current)
+                row = await boosts.record_boost(post_id)
+        except RedisError:
+            row = None
+        if row is None:
+            # Redis unavailable: apply the boost directly with the same atomic increment,
+            # as a one-boost flush of its own
+            await posts_repo.increment_boosts(str(uuid.uuid4()), {post_id: 1})
+            row = await posts_repo.get(post_id)
+            if not row:
+                raise HTTPException(status_code=404, detail="Post not found")
+        await hot_rank.record(post_id, hot_rank.BOOST_WEIGHT)
+        realtime.boost_recorded(post_id, row.get("boost_count") or 0)
+        return IdeaProductResponse(**(await media.sign_rows([row]))[0])
     except HTTPException:
         raise
     except Exception as e:
@@ -77,7 +147,7 @@ def boost_post(
 
 
 @router.patch("/{post_id}", response_model=IdeaProductResponse)
-def update_post(
+async def update_post(
     post_id: str,
     body: dict,
     user_id: str = Depends(get_current_user),
@@ -90,17 +160,17 @@ def update_post(
     update_data = {k: v for k, v in body.items() if k in ALLOWED}
     if not update_data:
         raise HTTPException(status_code=422, detail="No valid fields to update")
+    _normalize_media(update_data, user_id)
     try:
-        # Verify ownership
-        check = supabase_admin.table("posts").select("author_id").eq("id", post_id).execute()
-        if not check.data:
+        # Ownership check and update in one atomic call
+        outcome, updated = await posts_repo.update_by_author(post_id, user_id, update_data)
+        if outcome == posts_repo.NOT_FOUND:
             raise HTTPException(status_code=404, detail="Post not found")
-        if check.data[0]["author_id"] != user_id:
+        if outcome == posts_repo.FORBIDDEN:
             raise HTTPException(status_code=403, detail="Only the author may edit this post")
-        updated = supabase_admin.table("posts").update(update_data).eq("id", post_id).execute()
-        if not updated.data:
-            raise HTTPException(status_code=400, detail="Update failed")
-        return IdeaProductResponse(**updated.data[0])
+        await feed_cache.update_post(updated)
+        await semantic_search.index_post(updated)
+        return IdeaProductResponse(**(await media.sign_rows([updated]))[0])
     except HTTPException:
         raise
     except Exception as e:
@@ -108,26 +178,25 @@ def update_post(
 
 
 @router.delete("/{post_id}")
-def delete_post(
+async def delete_post(
     post_id: str,
     user_id: str = Depends(get_current_user),
 ):
     """
     Delete a post. Only the author may delete.
-    Also removes any related investments.
+    Also removes any related investments, in the same transaction.
     """
     try:
-        check = supabase_admin.table("posts").select("author_id").eq("id", post_id).execute()
-        if not check.data:
+        outcome = await posts_repo.delete_by_author(post_id, user_id)
+        if outcome == posts_repo.NOT_FOUND:
             raise HTTPException(status_code=404, detail="Post not found")
-        if check.data[0]["author_id"] != user_id:
+        if outcome == posts_repo.FORBIDDEN:
             raise HTTPException(status_code=403, detail="Only the author may delete this post")
-        # Delete related investments first
-        supabase_admin.table("investments").delete().eq("post_id", post_id).execute()
-        supabase_admin.table("posts").delete().eq("id", post_id).execute()
+        await feed_cache.remove_post(post_id)
+        await hot_rank.remove_post(post_id)
+        await semantic_search.remove_post(post_id)
         return {"status": "deleted", "post_id": post_id}
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-
@@ -1,30 +1,56 @@
-from typing import List
-from fastapi import APIRouter, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Query
 from schemas.models import IdeaProductResponse
-from core.config import supabase
+from core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, is_rank, next_page, parse_cursor
+from core.projection import json_response, parse_fields, project
+from core import feed_cache, media, semantic_search
+from repositories import posts as posts_repo
 
 router = APIRouter(prefix="/search", tags=["search"])
 
+
+async def _semantic_rows(query: str, limit: int, after: tuple | None) -> list[dict]:
+    """k-NN over the local vector index, hydrated from the post cache (then Postgres by id)."""
+    hits = await semantic_search.search(query, limit + 1, after)
+    ids = [pid for pid, _ in hits]
+    rows = await feed_cache.get_posts(ids)
+    missing = [pid for pid in ids if pid not in rows]
+    rows.update({r["id"]: r for r in await posts_repo.get_many(missing)})
+    # Posts deleted since they were indexed simply drop out of the page
+    return [{**rows[pid], "rank": score} for pid, score in hits if pid in rows]
+
+
 @router.get("/", response_model=List[IdeaProductResponse])
-def search_posts(query: str, deep: bool = False) -> List[IdeaProductResponse]:
+async def search_posts(
+    query: str,
+    deep: bool = False,
+    mode: str = Query("text", pattern="^(text|semantic)$"),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(None, description="Comma-separated post fields to return"),
+) -> List[IdeaProductResponse]:
     """
-    Search ideas/products against real Supabase data.
-    Standard search: ilike match on title + description.
-    Deep search: also searches ai_summary field for broader semantic coverage.
+    Ranked full-text search (websearch syntax: quotes, OR, -exclusions) over the
+    search_vector GIN index, best match first.
+    Standard search: title + description.
+    Deep search: also matches ai_summary, weighted below title and description.
+    mode=semantic: nearest neighbours by embedding of title, description and
+    ai_summary from the in-process vector index — finds related ideas that share
+    no exact words, with no LLM call or table scan per query.
+    The cursor for the following page is returned in the X-Next-Cursor header.
     """
+    after = parse_cursor(cursor, is_rank)
+    selected = parse_fields(fields, IdeaProductResponse)
+    if not query.strip():
+        return []
     try:
-        q = f"%{query}%"
-        if deep:
-            # Deep search: match title, description, OR ai_summary
-            response = supabase.table("posts").select("*").or_(
-                f"title.ilike.{q},description.ilike.{q},ai_summary.ilike.{q}"
-            ).order("created_at", desc=True).execute()
+        if mode == "semantic":
+            rows = await _semantic_rows(query, limit, after)
         else:
-            # Standard text search on title + description
-            response = supabase.table("posts").select("*").or_(
-                f"title.ilike.{q},description.ilike.{q}"
-            ).order("created_at", desc=True).execute()
-
-        return [IdeaProductResponse(**item) for item in response.data]
+            rows = await posts_repo.search(query, deep, limit, after)
+        rows, next_cursor = next_page(rows, limit, column="rank")
+        rows = await media.sign_rows(rows)
+        headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+        return json_response(project(rows, selected), headers)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
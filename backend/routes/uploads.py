@@ -1,8 +1,13 @@
+import hashlib
+import re
 import uuid
 from pathlib import Path
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
-from core.config import supabase_admin
+from typing import Literal
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from core import media, rate_limit
 from core.auth_middleware import get_current_user
+from core.upload_stream import MultipartFileStream, reject_oversized
+from repositories import storage as storage_repo
 
 router = APIRouter(prefix="/uploads", tags=["uploads"])
 
@@ -18,48 +23,133 @@ DECK_MAX_BYTES  =  20 * 1024 * 1024   #  20 MB
 
 BUCKET_VIDEO = "pitch-videos"
 BUCKET_DECK  = "pitch-decks"
+BUCKETS      = {"video": BUCKET_VIDEO, "deck": BUCKET_DECK}
 
+# Objects live at <user_id>/<sha256 of content><ext>; uploads land here until hashed
+STAGING_DIR  = "staging"
+_EXTENSION   = re.compile(r"\.[a-z0-9]{1,8}")
 
-def _upload(bucket: str, user_id: str, file: UploadFile, content: bytes) -> str:
-    """Upload bytes to a Supabase Storage bucket and return the public or signed URL."""
-    ext  = Path(file.filename or "file").suffix or ".bin"
-    key  = f"{user_id}/{uuid.uuid4().hex}{ext}"
-    resp = supabase_admin.storage.from_(bucket).upload(
-        key,
-        content,
-        {"content-type": file.content_type, "upsert": "false"},
-    )
-    # pitch-videos is private → signed URL (1 year)
+# Both routes share one per-user budget, and stop accepting bodies while Storage is backed up
+_admit = rate_limit.per_user("upload", shed_on=("storage",))
+
+# The body is parsed by MultipartFileStream, so describe the form for OpenAPI by hand
+_FILE_FORM = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                    "required": ["file"],
+                },
+            },
+        },
+    },
+}
+
+
+def _extension(filename: str | None) -> str:
+    ext = Path(filename or "file").suffix.lower()
+    return ext if _EXTENSION.fullmatch(ext) else ".bin"
+
+
+def _content_key(user_id: str, sha256: str, ext: str) -> str:
+    return f"{user_id}/{sha256}{ext}"
+
+
+async def _url(bucket: str, key: str) -> str:
+    # pitch-videos is private: posts store a reference, signed for each reader (core.media)
     if bucket == BUCKET_VIDEO:
-        signed = supabase_admin.storage.from_(bucket).create_signed_url(key, 31_536_000)
-        return signed["signedURL"]
-    # pitch-decks is public
-    return supabase_admin.storage.from_(bucket).get_public_url(key)
+        return media.storage_ref(bucket, key)
+    # pitch-decks is public, and a content-addressed URL never changes
+    return await storage_repo.public_url(bucket, key)
+
+
+async def _upload(bucket: str, user_id: str, stream: MultipartFileStream, max_bytes: int, too_large: str) -> str:
+    """
+    Stream a file part to a Supabase Storage bucket and return the URL to store on the post.
+    Data is forwarded in resumable-upload chunks as it arrives, so at most one chunk is
+    held in memory, and the upload is aborted as soon as it passes max_bytes.
+    The content is hashed on the way through; the staged object is then moved to its
+    content address, or dropped if the user already has an identical file there.
+    """
+    ext     = _extension(stream.filename)
+    staging = f"{user_id}/{STAGING_DIR}/{uuid.uuid4().hex}{ext}"
+    upload  = await storage_repo.ResumableUpload.create(bucket, staging, stream.content_type)
+    digest  = hashlib.sha256()
+    try:
+        size   = 0
+        buffer = bytearray()
+        async for data in stream:
+            size += len(data)
+            if size > max_bytes:
+                raise HTTPException(status_code=413, detail=too_large)
+            digest.update(data)
+            buffer += data
+            while len(buffer) >= storage_repo.RESUMABLE_CHUNK_SIZE:
+                await upload.write(bytes(buffer[:storage_repo.RESUMABLE_CHUNK_SIZE]))
+                del buffer[:storage_repo.RESUMABLE_CHUNK_SIZE]
+        await upload.write(bytes(buffer), final=True)
+    except BaseException:
+        await upload.abort()
+        raise
+
+    key = _content_key(user_id, digest.hexdigest(), ext)
+    try:
+        if not await storage_repo.exists(bucket, key):
+            await storage_repo.move(bucket, staging, key)
+            return await _url(bucket, key)
+    except Exception:
+        # A concurrent identical upload may have taken the key first
+        if not await storage_repo.exists(bucket, key):
+            raise
+    await storage_repo.remove(bucket, [staging])
+    return await _url(bucket, key)
+
+
+@router.get("/existing")
+async def find_upload(
+    kind: Literal["video", "deck"] = Query(...),
+    sha256: str = Query(..., pattern="^[0-9a-f]{64}$", description="Hex SHA-256 of the file"),
+    filename: str = Query(..., description="The file's name; its extension is part of the address"),
+    user_id: str = Depends(get_current_user),
+):
+    """
+    Content-address lookup for clients to call before uploading: if the caller has
+    already uploaded a file with this SHA-256 and extension, returns the same `url`
+    the upload route would, so the bytes need not be sent again. 404 otherwise.
+    """
+    bucket = BUCKETS[kind]
+    key = _content_key(user_id, sha256, _extension(filename))
+    if not await storage_repo.exists(bucket, key):
+        raise HTTPException(status_code=404, detail="No upload with this content")
+    return {"url": await _url(bucket, key)}
 
 
-@router.post("/video")
+@router.post("/video", openapi_extra=_FILE_FORM, dependencies=[Depends(_admit)])
 async def upload_video(
-    file: UploadFile = File(...),
+    request: Request,
     user_id: str = Depends(get_current_user),
 ):
-    if file.content_type not in ALLOWED_VIDEO:
-        raise HTTPException(status_code=415, detail=f"Unsupported video type: {file.content_type}")
-    content = await file.read()
-    if len(content) > VIDEO_MAX_BYTES:
-        raise HTTPException(status_code=413, detail="Video exceeds 150 MB limit")
-    url = _upload(BUCKET_VIDEO, user_id, file, content)
+    reject_oversized(request, VIDEO_MAX_BYTES, "Video exceeds 150 MB limit")
+    stream = MultipartFileStream(request, "file")
+    await stream.start()
+    if stream.content_type not in ALLOWED_VIDEO:
+        raise HTTPException(status_code=415, detail=f"Unsupported video type: {stream.content_type}")
+    url = await _upload(BUCKET_VIDEO, user_id, stream, VIDEO_MAX_BYTES, "Video exceeds 150 MB limit")
     return {"url": url}
 
 
-@router.post("/deck")
+@router.post("/deck", openapi_extra=_FILE_FORM, dependencies=[Depends(_admit)])
 async def upload_deck(
-    file: UploadFile = File(...),
+    request: Request,
     user_id: str = Depends(get_current_user),
 ):
-    if file.content_type not in ALLOWED_DECK:
-        raise HTTPException(status_code=415, detail=f"Unsupported deck type: {file.content_type}")
-    content = await file.read()
-    if len(content) > DECK_MAX_BYTES:
-        raise HTTPException(status_code=413, detail="Deck exceeds 20 MB limit")
-    url = _upload(BUCKET_DECK, user_id, file, content)
+    reject_oversized(request, DECK_MAX_BYTES, "Deck exceeds 20 MB limit")
+    stream = MultipartFileStream(request, "file")
+    await stream.start()
+    if stream.content_type not in ALLOWED_DECK:
+        raise HTTPException(status_code=415, detail=f"Unsupported deck type: {stream.content_type}")
+    url = await _upload(BUCKET_DECK, user_id, stream, DECK_MAX_BYTES, "Deck exceeds 20 MB limit")
     return {"url": url}
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Dict, Optional, List
 from datetime import datetime
 
 
@@ -18,7 +18,7 @@ class IdeaProductCreate(BaseModel):
     description: str
     content: Optional[str] = None
     ai_summary: Optional[str] = None
-    video_url: Optional[str] = None       # YouTube embed or direct MP4 URL
+    video_url: Optional[str] = None       # YouTube embed, direct MP4 URL or storage:// upload (core.media)
     deck_url: Optional[str] = None        # Pitch deck PDF or link
     product_url: Optional[str] = None     # Product/landing page URL
 
@@ -27,6 +27,24 @@ class IdeaProductResponse(IdeaProductCreate):
     id: str
     status: str
     boost_count: int = 0
+    ai_summary_status: Optional[str] = None   # pending | ready | failed while the summary is generated
+    created_at: datetime
+
+
+class FeedCard(BaseModel):
+    """What a feed card renders: no `content` body and no search internals."""
+    id: str
+    author_id: str
+    type: str
+    title: str
+    description: str
+    ai_summary: Optional[str] = None
+    ai_summary_status: Optional[str] = None
+    video_url: Optional[str] = None
+    deck_url: Optional[str] = None
+    product_url: Optional[str] = None
+    status: str
+    boost_count: int = 0
     created_at: datetime
 
 
@@ -43,11 +61,27 @@ class InvestmentResponse(InvestmentCreate):
     created_at: datetime
 
 
+class PostFunding(BaseModel):
+    post_id: str
+    post_title: str
+    total_committed: float = 0
+    investment_count: int = 0
+    investor_count: int = 0
+    status_counts: Dict[str, int] = {}
+
+
+class FundingSummary(BaseModel):
+    total_committed: float
+    investment_count: int
+    status_counts: Dict[str, int]
+    posts: List[PostFunding]
+
+
 class DueDiligenceSubmit(BaseModel):
     investment_id: str
     notes: str
 
 
 class FeedResponse(BaseModel):
-    items: List[IdeaProductResponse]
-    next_cursor: Optional[int] = None
+    items: List[FeedCard]
+    next_cursor: Optional[str] = None     # opaque keyset cursor; None on the last page
@@ -3,7 +3,6 @@ import React, {
 } from 'react';
 import { useAuth } from '../../contexts/AuthContext';
 import { useNavigate } from 'react-router-dom';
-import { supabase } from '../../lib/supabase';
 import { API_URL } from '../../lib/config';
 import {
     ArrowUp, DollarSign, FileText, X, Check,
@@ -657,13 +656,13 @@ export default function Feed() {
     const navigate = useNavigate();
 
     const [items, setItems] = useState([]);
-    const [cursor, setCursor] = useState(0);
+    const [cursor, setCursor] = useState(null);
     const [hasMore, setHasMore] = useState(true);
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState(null);
     const [activeIndex, setActiveIndex] = useState(0);
     const [activePost, setActivePost] = useState(null);
-    const [pendingNew, setPendingNew] = useState(0); // new posts arrived via Realtime
+    const [pendingNew, setPendingNew] = useState(0); // new posts announced on the feed stream
     const sentinelRef = useRef(null);
     const containerRef = useRef(null);
 
@@ -687,13 +686,20 @@ export default function Feed() {
         return () => obs.disconnect();
     }, [items]);
 
+    // Signed-in pages skip posts already served to this user, so send the token when there is one
+    const authHeadersRef = useRef(getAuthHeaders);
+    authHeadersRef.current = getAuthHeaders;
+
     const loadPage = useCallback(async (cur) => {
         setLoading(true);
         try {
-            const res = await fetch(`${API}/feed/?cursor=${cur}`);
+            const res = await fetch(
+                cur ? `${API}/feed/?cursor=${encodeURIComponent(cur)}` : `${API}/feed/`,
+                { headers: authHeadersRef.current() },
+            );
             if (!res.ok) throw new Error('Failed to load feed.');
             const data = await res.json();
-            setItems(prev => cur === 0 ? data.items : [...prev, ...data.items]);
+            setItems(prev => cur === null ? data.items : [...prev, ...data.items]);
             setCursor(data.next_cursor ?? cur);
             setHasMore(data.next_cursor !== null && data.next_cursor !== undefined);
         } catch (err) {
@@ -703,7 +709,7 @@ export default function Feed() {
         }
     }, []);
 
-    useEffect(() => { loadPage(0); }, [loadPage]);
+    useEffect(() => { loadPage(null); }, [loadPage]);
 
     /* Infinite scroll sentinel */
     useEffect(() => {
@@ -715,17 +721,21 @@ export default function Feed() {
         return () => obs.disconnect();
     }, [loadPage, hasMore, loading, cursor]);
 
-    /* Supabase Realtime — notify on new posts without disrupting scroll */
+    /* Feed stream (SSE) — live boost counts, and a notice for new posts without disrupting scroll */
     useEffect(() => {
-        const channel = supabase
-            .channel('public:posts')
-            .on(
-                'postgres_changes',
-                { event: 'INSERT', schema: 'public', table: 'posts' },
-                () => setPendingNew(n => n + 1),
-            )
-            .subscribe();
-        return () => supabase.removeChannel(channel);
+        const source = new EventSource(`${API}/feed/stream`);
+        source.onmessage = (e) => {
+            const event = JSON.parse(e.data);
+            if (event.type !== 'activity') return;
+            if (event.posts.length) setPendingNew(n => n + event.posts.length);
+            if (Object.keys(event.boosts).length) {
+                // Counts are absolute; keep the highest seen (our own optimistic +1 included)
+                setItems(prev => prev.map(p => p.id in event.boosts
+                    ? { ...p, boost_count: Math.max(p.boost_count || 0, event.boosts[p.id]) }
+                    : p));
+            }
+        };
+        return () => source.close();
     }, []);
 
     const handleInvest = (item) => {
@@ -778,7 +788,7 @@ export default function Feed() {
             {/* ── New posts Realtime banner ── */}
             {pendingNew > 0 && (
                 <button
-                    onClick={() => { loadPage(0); setPendingNew(0); window.scrollTo({ top: 64, behavior: 'smooth' }); }}
+                    onClick={() => { loadPage(null); setPendingNew(0); window.scrollTo({ top: 64, behavior: 'smooth' }); }}
                     style={{
                         position: 'fixed', top: 64, left: '50%', transform: 'translateX(-50%)',
                         zIndex: 200, background: 'var(--black)', color: 'var(--white)',
@@ -15,6 +15,13 @@ const INITIAL = { type: 'idea', title: '', description: '', product_url: '' };
 const API = API_URL;
 
 /* ─── File Drop Zone ─────────────────────────────────────────────── */
+/** Hex SHA-256 of a file, or null where Web Crypto is unavailable (non-HTTPS origins). */
+async function sha256Hex(file) {
+    if (!window.crypto?.subtle) return null;
+    const digest = await window.crypto.subtle.digest('SHA-256', await file.arrayBuffer());
+    return Array.from(new Uint8Array(digest), b => b.toString(16).padStart(2, '0')).join('');
+}
+
 function FileDropZone({ label, accept, maxMB, uploadPath, getAuthHeaders, onUploaded, Icon: IconC }) {
     const [dragOver, setDragOver] = useState(false);
     const [uploading, setUploading] = useState(false);
@@ -27,11 +34,21 @@ function FileDropZone({ label, accept, maxMB, uploadPath, getAuthHeaders, onUplo
         setProgress(10);
         setError('');
         try {
+            // Uploads are stored by content hash: skip sending a file this account already uploaded
+            const sha256 = await sha256Hex(file).catch(() => null);
+            let existing = null;
+            if (sha256) {
+                const kind = uploadPath.split('/').pop();
+                const params = new URLSearchParams({ kind, sha256, filename: file.name });
+                const found = await fetch(`${API}/uploads/existing?${params}`, { headers: getAuthHeaders() });
+                if (found.ok) existing = (await found.json()).url;
+            }
+
             const fd = new FormData();
             fd.append('file', file);
 
             // XHR for real progress events
-            const url = await new Promise((res, rej) => {
+            const url = existing ?? await new Promise((res, rej) => {
                 const xhr = new XMLHttpRequest();
                 xhr.open('POST', `${API}${uploadPath}`);
                 const headers = getAuthHeaders();
@@ -135,8 +152,7 @@ export default function Submit() {
     const [videoUrl, setVideoUrl] = useState('');
     const [deckUrl, setDeckUrl] = useState('');
     const [loading, setLoading] = useState(false);
-    const [stage, setStage] = useState('idle'); // idle | summarizing | saving | done | error
-    const [aiSummary, setAiSummary] = useState('');
+    const [stage, setStage] = useState('idle'); // idle | saving | done | error
     const [errMsg, setErrMsg] = useState('');
     const MAX = 1500;
 
@@ -145,17 +161,10 @@ export default function Submit() {
     const handleSubmit = async (e) => {
         e.preventDefault();
         if (!user) { navigate('/auth'); return; }
-        setLoading(true); setStage('summarizing');
+        setLoading(true); setStage('saving');
         try {
-            const sumRes = await fetch(
-                `${API}/ai/summarize?content=${encodeURIComponent(form.title + ' — ' + form.description)}`,
-                { method: 'POST', headers: getAuthHeaders() }
-            );
-            if (!sumRes.ok) throw new Error('AI summarization failed.');
-            const { summary } = await sumRes.json();
-            setAiSummary(summary); setStage('saving');
-
-            const body = { ai_summary: summary };
+            // The AI summary is generated in the background once the post is live
+            const body = {};
             for (const k of ['type', 'title', 'description']) {
                 if (form[k]) body[k] = form[k];
             }
@@ -284,7 +293,7 @@ export default function Submit() {
                                 <div className="accent-left-blue" style={{ marginBottom: 20 }}>
                                     <div className="label" style={{ color: 'var(--blue)', display: 'flex', alignItems: 'center', gap: 10 }}>
                                         <span className="spinner" style={{ borderTopColor: 'var(--blue)', borderColor: 'rgba(26,82,255,0.2)' }} />
-                                        {stage === 'summarizing' ? 'Generating AI summary…' : 'Saving to database…'}
+                                        Saving to database…
                                     </div>
                                 </div>
                             )}
@@ -305,15 +314,13 @@ export default function Submit() {
                             </div>
                             <h3 style={{ fontWeight: 900, letterSpacing: '-0.02em', marginBottom: 8 }}>Pitch submitted.</h3>
                             <p style={{ fontWeight: 300, marginBottom: 'calc(var(--sp) * 4)' }}>Your idea is live on the feed.</p>
-                            {aiSummary && (
-                                <div className="accent-left-blue" style={{ marginBottom: 'calc(var(--sp) * 5)' }}>
-                                    <div className="form-label" style={{ color: 'var(--blue)', marginBottom: 6 }}>AI Investor Summary</div>
-                                    <p style={{ margin: 0, fontSize: 'var(--text-sm)', lineHeight: 1.75, fontStyle: 'italic', fontWeight: 300 }}>{aiSummary}</p>
-                                </div>
-                            )}
+                            <div className="accent-left-blue" style={{ marginBottom: 'calc(var(--sp) * 5)' }}>
+                                <div className="form-label" style={{ color: 'var(--blue)', marginBottom: 6 }}>AI Investor Summary</div>
+                                <p style={{ margin: 0, fontSize: 'var(--text-sm)', lineHeight: 1.75, fontStyle: 'italic', fontWeight: 300 }}>Being written now — it will appear on your pitch in a moment.</p>
+                            </div>
                             <div style={{ display: 'flex', gap: 12 }}>
                                 <button className="btn-primary" style={{ padding: '12px 28px', fontSize: 'var(--text-xs)' }} onClick={() => navigate('/feed')}>View in Feed →</button>
-                                <button className="btn-outline" style={{ padding: '12px 28px', fontSize: 'var(--text-xs)' }} onClick={() => { setStage('idle'); setForm(INITIAL); setVideoUrl(''); setDeckUrl(''); setAiSummary(''); setErrMsg(''); }}>Submit Another</button>
+                                <button className="btn-outline" style={{ padding: '12px 28px', fontSize: 'var(--text-xs)' }} onClick={() => { setStage('idle'); setForm(INITIAL); setVideoUrl(''); setDeckUrl(''); setErrMsg(''); }}>Submit Another</button>
                             </div>
                         </div>
                     )}
@@ -149,6 +149,8 @@ export default function Profile() {
     const [pitches, setPitches] = useState([]);
     const [investments, setInvestments] = useState([]);
     const [inbound, setInbound] = useState([]);
+    const [inboundCursor, setInboundCursor] = useState(null);
+    const [funding, setFunding] = useState(null);
     const [loadingP, setLoadingP] = useState(false);
     const [loadingI, setLoadingI] = useState(false);
     const [loadingIb, setLoadingIb] = useState(false);
@@ -180,9 +182,19 @@ export default function Profile() {
     useEffect(() => {
         if (!user || tab !== 'pitches' || pitches.length > 0) return;
         setLoadingP(true);
-        fetch(`${API}/posts/?author_id=${user.id}`)
-            .then(r => r.ok ? r.json() : [])
-            .then(d => setPitches(Array.isArray(d) ? d : []))
+        (async () => {
+            // Follows X-Next-Cursor so authors with more than one page see every pitch
+            const all = [];
+            let cur = null;
+            do {
+                const res = await fetch(`${API}/posts/?author_id=${user.id}&limit=100${cur ? `&cursor=${encodeURIComponent(cur)}` : ''}`);
+                if (!res.ok) break;
+                const d = await res.json();
+                if (Array.isArray(d)) all.push(...d);
+                cur = res.headers.get('X-Next-Cursor');
+            } while (cur);
+            setPitches(all);
+        })()
             .catch(() => setPitches([]))
             .finally(() => setLoadingP(false));
     }, [user, tab]);
@@ -198,17 +210,37 @@ export default function Profile() {
             .finally(() => setLoadingI(false));
     }, [user, tab]);
 
-    /* Inbound investments into founder's posts */
+    /* Inbound investments into founder's posts — paginated; totals come from the summary */
+    const loadInbound = useCallback(async (cur) => {
+        setLoadingIb(true);
+        try {
+            const res = await fetch(
+                `${API}/investments/inbound?limit=20${cur ? `&cursor=${encodeURIComponent(cur)}` : ''}`,
+                { headers: getAuthHeaders() }
+            );
+            const d = res.ok ? await res.json() : [];
+            setInbound(prev => cur ? [...prev, ...d] : (Array.isArray(d) ? d : []));
+            setInboundCursor(res.ok ? res.headers.get('X-Next-Cursor') : null);
+        } catch {
+            if (!cur) setInbound([]);
+        } finally {
+            setLoadingIb(false);
+        }
+    }, [getAuthHeaders]);
+
     useEffect(() => {
         if (!user || tab !== 'inbound' || inbound.length > 0) return;
-        setLoadingIb(true);
-        fetch(`${API}/investments/inbound`, { headers: getAuthHeaders() })
-            .then(r => r.ok ? r.json() : [])
-            .then(d => setInbound(Array.isArray(d) ? d : []))
-            .catch(() => setInbound([]))
-            .finally(() => setLoadingIb(false));
+        loadInbound(null);
     }, [user, tab]);
 
+    useEffect(() => {
+        if (!user || funding) return;
+        fetch(`${API}/investments/inbound/summary`, { headers: getAuthHeaders() })
+            .then(r => r.ok ? r.json() : null)
+            .then(setFunding)
+            .catch(() => setFunding(null));
+    }, [user]);
+
     const handlePitchSave = useCallback((updated) => {
         setPitches(prev => prev.map(p => p.id === updated.id ? updated : p));
         setEditingId(null);
@@ -224,7 +256,7 @@ export default function Profile() {
     }
 
     const totalInvested = investments.reduce((s, i) => s + (i.amount || 0), 0);
-    const totalRaised = inbound.reduce((s, i) => s + (i.amount || 0), 0);
+    const totalRaised = funding?.total_committed || 0;
     const initial = user.email[0].toUpperCase();
 
     return (
@@ -253,7 +285,7 @@ export default function Profile() {
                 <div className="stats-row" style={{ display: 'grid', gridTemplateColumns: 'repeat(4, 1fr)', gap: 'calc(var(--sp) * 3)', marginBottom: 'calc(var(--sp) * 6)', borderBottom: '1px solid var(--gray-200)', paddingBottom: 'calc(var(--sp) * 6)' }}>
                     {[
                         { num: pitches.length || '—', label: 'Pitches' },
-                        { num: inbound.length ? `$${totalRaised.toLocaleString()}` : '$—', label: 'Total Raised' },
+                        { num: totalRaised ? `$${totalRaised.toLocaleString()}` : '$—', label: 'Total Raised' },
                         { num: totalInvested ? `$${totalInvested.toLocaleString()}` : '$—', label: 'Total Invested' },
                         { num: new Date(user.created_at || Date.now()).getFullYear(), label: 'Member Since' },
                     ].map(s => (
@@ -379,6 +411,11 @@ export default function Profile() {
                                 </div>
                             );
                         })}
+                        {inboundCursor && !loadingIb && (
+                            <button className="btn-outline" style={{ marginTop: 'calc(var(--sp) * 3)', padding: '9px 20px', fontSize: 'var(--text-xs)' }} onClick={() => loadInbound(inboundCursor)}>
+                                Load more
+                            </button>
+                        )}
                         {inbound.length > 0 && (
                             <div className="accent-left-blue" style={{ marginTop: 'calc(var(--sp) * 5)' }}>
                                 <div className="label" style={{ color: 'var(--blue)' }}>Total Raised</div>
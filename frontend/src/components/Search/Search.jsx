@@ -15,20 +15,42 @@ export default function Search() {
     const [loading, setLoading] = useState(false);
     const [searched, setSearched] = useState(false);
     const [error, setError] = useState('');
+    // Cursor for the next page, and the search it belongs to (the input may have changed since)
+    const [nextCursor, setNextCursor] = useState(null);
+    const [lastSearch, setLastSearch] = useState(null);
+    const [loadingMore, setLoadingMore] = useState(false);
+
+    const fetchPage = async ({ q, deep }, cursor) => {
+        const res = await fetch(`${API_URL}/search/?query=${encodeURIComponent(q)}&deep=${deep}${cursor ? `&cursor=${encodeURIComponent(cursor)}` : ''}`);
+        if (!res.ok) throw new Error('Search failed.');
+        return { items: await res.json(), cursor: res.headers.get('X-Next-Cursor') };
+    };
 
     const handleSearch = async (e) => {
         e?.preventDefault();
         if (!query.trim()) return;
-        setLoading(true); setError(''); setSearched(true);
+        const search = { q: query, deep: isDeep };
+        setLoading(true); setError(''); setSearched(true); setNextCursor(null);
         try {
-            const res = await fetch(`${API_URL}/search/?query=${encodeURIComponent(query)}&deep=${isDeep}`);
-            if (!res.ok) throw new Error('Search failed.');
-            setResults(await res.json());
+            const page = await fetchPage(search);
+            setResults(page.items);
+            setNextCursor(page.cursor);
+            setLastSearch(search);
         } catch (err) { setError(err.message); }
         finally { setLoading(false); }
     };
 
-    const clear = () => { setQuery(''); setResults([]); setSearched(false); setError(''); };
+    const loadMore = async () => {
+        setLoadingMore(true); setError('');
+        try {
+            const page = await fetchPage(lastSearch, nextCursor);
+            setResults(prev => [...prev, ...page.items]);
+            setNextCursor(page.cursor);
+        } catch (err) { setError(err.message); }
+        finally { setLoadingMore(false); }
+    };
+
+    const clear = () => { setQuery(''); setResults([]); setSearched(false); setError(''); setNextCursor(null); };
 
     return (
         <div style={{ paddingTop: 64, minHeight: '100vh' }}>
@@ -115,7 +137,7 @@ export default function Search() {
                 {results.length > 0 && (
                     <div>
                         <div className="label" style={{ marginBottom: 'calc(var(--sp) * 3)', color: 'var(--gray-400)' }}>
-                            {results.length} result{results.length !== 1 ? 's' : ''}
+                            {results.length}{nextCursor ? '+' : ''} result{results.length !== 1 || nextCursor ? 's' : ''}
                         </div>
                         <div style={{ display: 'flex', flexDirection: 'column' }}>
                             {results.map((r, i) => {
@@ -147,6 +169,11 @@ export default function Search() {
                                 );
                             })}
                         </div>
+                        {nextCursor && (
+                            <button className="btn-outline" disabled={loadingMore} style={{ marginTop: 'calc(var(--sp) * 3)', padding: '9px 20px', fontSize: 'var(--text-xs)' }} onClick={loadMore}>
+                                {loadingMore ? <span className="spinner" /> : 'Load more'}
+                            </button>
+                        )}
                     </div>
                 )}
             </div>